@@ -0,0 +1,29 @@
+"""Модуль доступа к служебным страницам /admin.
+
+Счетчики допуска, предохранителя, сроков и профили памяти раскрывают
+пути файлов, имена функций и нагрузку воркера, поэтому страницы /admin
+подключаются, только если задан ADMIN_TOKEN, и отвечают лишь на запросы
+с заголовком ``Authorization: Bearer <ADMIN_TOKEN>``.
+"""
+import hmac
+from types import MappingProxyType
+
+import config
+
+BEARER = 'Bearer '
+CHALLENGE = MappingProxyType({'WWW-Authenticate': 'Bearer'})
+
+
+def authorized(authorization: str | None) -> bool:
+    """Проверить токен служебных страниц в заголовке Authorization.
+
+    Args:
+        authorization (str | None): значение заголовка Authorization
+
+    Returns:
+        bool: True, если токен задан и совпадает
+    """
+    if not config.ADMIN_TOKEN or not authorization or not authorization.startswith(BEARER):
+        return False
+    token = authorization.removeprefix(BEARER)
+    return hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode())
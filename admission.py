@@ -0,0 +1,209 @@
+"""Модуль контроля допуска запросов (admission control).
+
+Запросы делятся на бюджеты: чтение, запись и добавление команд через внешнее
+апи, а маршруты из config.ADMISSION_ROUTES (прокси изображений) получают свой
+бюджет. У каждого бюджета свой предел одновременных запросов и ограниченная
+очередь. Если очередь заполнена или место не освободилось за время ожидания,
+запрос сразу отклоняется (503 с Retry-After), а не копится в воркере.
+Счетчики допущенных, поставленных в очередь и отклоненных запросов ведутся
+для каждого воркера отдельно.
+"""
+import asyncio
+import math
+import threading
+from collections import Counter
+
+import config
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+REQUEST_KEY = 'admission.budget'
+
+
+class Overloaded(Exception):
+    """Исключение: бюджет исчерпан, запрос отклонен."""
+
+    def __init__(self, budget: 'Budget') -> None:
+        """Инициализация исключения.
+
+        Args:
+            budget (Budget): бюджет, отклонивший запрос
+        """
+        super().__init__(budget.name)
+        self.retry_after = math.ceil(budget.queue_timeout)
+
+
+class Budget:
+    """Бюджет одновременных запросов с ограниченной очередью (для потоков воркера)."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float) -> None:
+        """Инициализация бюджета.
+
+        Args:
+            name (str): название бюджета
+            limit (int): число одновременно выполняемых запросов
+            queue_size (int): число мест в очереди
+            queue_timeout (float): сколько секунд запрос ждет в очереди
+        """
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.counts = Counter(active=0, waiting=0, admitted=0, queued=0, shed=0)
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Занять место в бюджете, при необходимости подождав в очереди.
+
+        Если очередь заполнена или место не освободилось вовремя, выбрасывает Overloaded.
+        """
+        with self._condition:
+            if not self.has_slot():
+                self._enqueue()
+                has_slot = self._condition.wait_for(self.has_slot, self.queue_timeout)
+                self._dequeue(has_slot)
+            self.counts['active'] += 1
+            self.counts['admitted'] += 1
+
+    def release(self) -> None:
+        """Освободить место в бюджете."""
+        with self._condition:
+            self.counts['active'] -= 1
+            self._condition.notify()
+
+    def has_slot(self) -> bool:
+        """Проверить, есть ли свободное место.
+
+        Returns:
+            bool: True, если запрос можно выполнять сразу
+        """
+        return self.counts['active'] < self.limit
+
+    def counters(self) -> dict:
+        """Получить счетчики бюджета.
+
+        Returns:
+            dict: пределы, текущая загрузка и счетчики запросов
+        """
+        return {'limit': self.limit, 'queue_size': self.queue_size, **self.counts}
+
+    def _enqueue(self) -> None:
+        """Встать в очередь или отклонить запрос, если очередь заполнена.
+
+        Raises:
+            Overloaded: очередь заполнена
+        """
+        if self.counts['waiting'] >= self.queue_size:
+            self.counts['shed'] += 1
+            raise Overloaded(self)
+        self.counts['waiting'] += 1
+        self.counts['queued'] += 1
+
+    def _dequeue(self, has_slot: bool) -> None:
+        """Выйти из очереди.
+
+        Args:
+            has_slot (bool): освободилось ли место за время ожидания
+
+        Raises:
+            Overloaded: место не освободилось за время ожидания
+        """
+        self.counts['waiting'] -= 1
+        if not has_slot:
+            self.counts['shed'] += 1
+            raise Overloaded(self)
+
+
+class AsyncBudget(Budget):
+    """Бюджет для цикла событий асинхронного воркера."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float) -> None:
+        """Инициализация бюджета.
+
+        Args:
+            name (str): название бюджета
+            limit (int): число одновременно выполняемых запросов
+            queue_size (int): число мест в очереди
+            queue_timeout (float): сколько секунд запрос ждет в очереди
+        """
+        super().__init__(name, limit, queue_size, queue_timeout)
+        self._async_condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Занять место в бюджете, при необходимости подождав в очереди.
+
+        Если очередь заполнена или место не освободилось вовремя, выбрасывает Overloaded.
+        """
+        async with self._async_condition:
+            if not self.has_slot():
+                self._enqueue()
+                try:
+                    await asyncio.wait_for(
+                        self._async_condition.wait_for(self.has_slot), self.queue_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    has_slot = self.has_slot()
+                else:
+                    has_slot = True
+                self._dequeue(has_slot)
+            self.counts['active'] += 1
+            self.counts['admitted'] += 1
+
+    async def release(self) -> None:
+        """Освободить место в бюджете.
+
+        Будятся все ожидающие: разбуженный запрос, у которого в тот же момент
+        истекло время ожидания, не займет место и не передаст уведомление дальше.
+        """
+        async with self._async_condition:
+            self.counts['active'] -= 1
+            self._async_condition.notify_all()
+
+
+def create_budgets(budget_class: type[Budget] = Budget) -> dict[str, Budget]:
+    """Создать бюджеты воркера из настроек config.ADMISSION_BUDGETS.
+
+    Args:
+        budget_class (type[Budget]): Budget для потоков или AsyncBudget для asyncio
+
+    Returns:
+        dict[str, Budget]: бюджеты по названиям
+    """
+    return {
+        name: budget_class(name, *settings)
+        for name, settings in config.ADMISSION_BUDGETS.items()
+    }
+
+
+def budget_name(endpoint: str | None, method: str) -> str | None:
+    """Выбрать бюджет запроса по обработчику и методу.
+
+    Args:
+        endpoint (str | None): название обработчика (с префиксом blueprint или без)
+        method (str): http метод
+
+    Returns:
+        str | None: название бюджета или ничего, если запрос не ограничивается
+    """
+    view = (endpoint or '').rsplit('.', 1)[-1]
+    if not view or view in config.ADMISSION_EXEMPT:
+        return None
+    if method in READ_METHODS:
+        name = 'read'
+    elif view in config.ADMISSION_INGEST:
+        name = 'ingest'
+    else:
+        name = 'write'
+    return config.ADMISSION_ROUTES.get(view, name)
+
+
+def worker_threads() -> int:
+    """Число потоков воркера: все места бюджетов и их очередей плюс запас.
+
+    Ожидание в очереди должно происходить в бюджете, а не в очереди gunicorn,
+    поэтому потоков не меньше, чем мест.
+
+    Returns:
+        int: число потоков
+    """
+    slots = sum(limit + queue_size for limit, queue_size, _ in config.ADMISSION_BUDGETS.values())
+    return slots + config.ADMISSION_SPARE_THREADS
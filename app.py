@@ -1,22 +1,35 @@
 """Фласк модуль."""
-from os import environ
+from functools import partial
+from os import environ, getpid
 from uuid import UUID
 
-from dotenv import load_dotenv
-from flask import Flask, jsonify, redirect, render_template, request
+import click
+from flask import Blueprint, Flask, jsonify, redirect, render_template, request, send_file, url_for
 from flask_wtf import FlaskForm
-from wtforms import StringField, SubmitField
-
+from werkzeug.exceptions import NotFound
+from werkzeug.wrappers import Response
+from wtforms import IntegerField, StringField, SubmitField
+
+import admin
+import admission
+import catalog
+import changes
+import compression
 import config
 import db
+import deadlines
+import documents
+import football_api
+import images
+import profiling
+import seasons
+import stats
+from breaker import CircuitOpen
 
-load_dotenv()
-
-
-app = Flask(__name__)
-app.json.ensure_ascii = False
-app.config['SECRET_KEY'] = environ.get('SECRET_KEY')
-engine = db.engine
+pages = Blueprint('pages', __name__, cli_group=None)
+admin_pages = Blueprint('admin', __name__, url_prefix='/admin')
+budgets = admission.create_budgets()
+profiler = profiling.create_profiler()
 
 
 class AddTeamForm(FlaskForm):
@@ -25,46 +38,299 @@ class AddTeamForm(FlaskForm):
     name = StringField('Введите название команды: ')
     league = StringField('Введите название лиги: ')
     country = StringField('Введите название страны: ')
+    season = IntegerField('Сезон: ', default=config.SEASON)
     submit = SubmitField('Submit')
 
 
-@app.route('/')
+def get_season() -> int:
+    """Сезон из параметра запроса season (по умолчанию текущий).
+
+    Returns:
+        int: сезон
+    """
+    return request.args.get('season', config.SEASON, type=int)
+
+
+@pages.before_request
+def start_deadline():
+    """Начать крайний срок запроса (до ожидания в очереди допуска)."""
+    deadlines.start(request.endpoint, request.method)
+
+
+@pages.before_request
+def admit():
+    """Допустить запрос в его бюджет (чтение, запись или добавление через внешнее апи)."""
+    name = admission.budget_name(request.endpoint, request.method)
+    if name:
+        budgets[name].acquire()
+        request.environ[admission.REQUEST_KEY] = budgets[name]
+
+
+@pages.teardown_request
+def release(error: BaseException | None):
+    """Освободить место в бюджете запроса.
+
+    Args:
+        error (BaseException | None): исключение обработчика
+    """
+    budget = request.environ.pop(admission.REQUEST_KEY, None)
+    if budget:
+        budget.release()
+    deadlines.finish()
+
+
+@admin_pages.before_request
+def require_admin_token():
+    """Пускать на служебные страницы только с токеном ADMIN_TOKEN.
+
+    Returns:
+        _type_: _description_
+    """
+    if not admin.authorized(request.headers.get('Authorization')):
+        return '', config.UNAUTHORIZED, dict(admin.CHALLENGE)
+    return None
+
+
+@pages.errorhandler(admission.Overloaded)
+def overloaded(error: admission.Overloaded):
+    """Быстрый отказ, когда бюджет запроса исчерпан.
+
+    Args:
+        error (admission.Overloaded): исключение бюджета
+
+    Returns:
+        _type_: _description_
+    """
+    return '', config.SERVICE_UNAVAILABLE, {'Retry-After': str(error.retry_after)}
+
+
+@admin_pages.get('/admission')
+def admission_counters():
+    """Счетчики допуска запросов этого воркера.
+
+    Returns:
+        _type_: _description_
+    """
+    counters = {name: budget.counters() for name, budget in budgets.items()}
+    return jsonify({'pid': getpid(), 'budgets': counters}), config.OK
+
+
+@pages.errorhandler(CircuitOpen)
+def football_unavailable(error: CircuitOpen):
+    """Быстрый отказ, когда предохранитель внешнего апи разомкнут.
+
+    Args:
+        error (CircuitOpen): исключение предохранителя
+
+    Returns:
+        _type_: _description_
+    """
+    return '', config.SERVICE_UNAVAILABLE, {'Retry-After': str(error.retry_after)}
+
+
+@admin_pages.get('/football')
+def football_counters():
+    """Состояние предохранителя внешнего апи и кэша последних ответов этого воркера.
+
+    Returns:
+        _type_: _description_
+    """
+    counters = {
+        'breaker': football_api.breaker.counters(),
+        'last_good': football_api.last_good.counters(),
+    }
+    return jsonify({'pid': getpid(), **counters}), config.OK
+
+
+@pages.errorhandler(deadlines.DeadlineExceeded)
+def deadline_exceeded(error: deadlines.DeadlineExceeded):
+    """Ответ 504, когда крайний срок запроса истек.
+
+    Args:
+        error (deadlines.DeadlineExceeded): исключение срока
+
+    Returns:
+        _type_: _description_
+    """
+    deadlines.record(error)
+    return jsonify({'error': str(error), 'stage': error.stage}), config.GATEWAY_TIMEOUT
+
+
+@admin_pages.get('/deadlines')
+def deadline_counters():
+    """Счетчики запросов со сроком и прерванных по сроку этого воркера.
+
+    Returns:
+        _type_: _description_
+    """
+    return jsonify({'pid': getpid(), **deadlines.metrics.counters()}), config.OK
+
+
+@admin_pages.get('/profile')
+def profile_summary():
+    """Профили памяти маршрутов этого воркера (при включенном PROFILE_EVERY).
+
+    Returns:
+        _type_: _description_
+    """
+    if not profiler.every:
+        return '', config.NOT_FOUND
+    return jsonify({'pid': getpid(), 'routes': profiler.summary()}), config.OK
+
+
+@admin_pages.get('/profile/stacks')
+def profile_stacks():
+    """Стеки маршрутов этого воркера в формате collapsed stacks (для flame graph).
+
+    Returns:
+        _type_: _description_
+    """
+    if not profiler.every:
+        return '', config.NOT_FOUND
+    return profiler.collapsed_stacks(), config.OK, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+def start_profile():
+    """Начать профилирование запроса, если он попал в выборку."""
+    if request.url_rule and profiler.start():
+        request.environ[profiling.REQUEST_KEY] = True
+
+
+def finish_profile(error: BaseException | None):
+    """Закончить профилирование запроса и сохранить замер маршрута.
+
+    Args:
+        error (BaseException | None): исключение обработчика
+    """
+    if request.environ.pop(profiling.REQUEST_KEY, False):
+        rule = request.url_rule.rule.replace('<model>', request.view_args.get('model', 'model'))
+        profiler.finish(f'{request.method} {rule}')
+
+
+def compress_response(response: Response) -> Response:
+    """Сжать ответ в кодировке, которую принимает клиент, или ответить 304.
+
+    Args:
+        response (Response): ответ
+
+    Returns:
+        Response: сжатый ответ, 304 или исходный ответ
+    """
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    if not compression.is_compressible(response, request.endpoint):
+        return response
+    body = response.get_data()
+    if len(body) < config.COMPRESS_MIN_SIZE:
+        return response
+    if compression.not_modified(response, body, request.if_none_match):
+        return response
+    encoding = compression.negotiate(request.accept_encodings)
+    if encoding:
+        etag = response.get_etag()[0]
+        compression.set_payload(
+            response, compression.encode(body, encoding, etag, streaming=True), encoding,
+        )
+    return response
+
+
+@pages.app_template_filter('thumb')
+def thumb(url: str | None, size: int = config.THUMBNAIL_SIZE) -> str | None:
+    """Фильтр шаблонов: ссылка на миниатюру изображения через прокси.
+
+    Args:
+        url (str | None): ссылка на изображение
+        size (int): размер миниатюры
+
+    Returns:
+        str | None: ссылка на миниатюру или исходная ссылка, если хост не проксируется
+    """
+    if not url or not images.is_allowed(url):
+        return url
+    return url_for('pages.image', url=url, size=size)
+
+
+@pages.get('/image')
+def image():
+    """Миниатюра изображения из кэша на диске.
+
+    Returns:
+        _type_: _description_
+    """
+    url = request.args.get('url', '')
+    size = request.args.get('size', config.THUMBNAIL_SIZE, type=int)
+    if size not in config.THUMBNAIL_SIZES:
+        return '', config.BAD_REQUEST
+    if not images.is_allowed(url):
+        return '', config.FORBIDDEN
+    try:
+        path = images.get_thumbnail(url, size)
+    except images.ImageError:
+        return redirect(url)
+    response = send_file(path, mimetype='image/webp', max_age=config.IMAGE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@pages.route('/')
 def homepage():
     """Домашняя страница.
 
     Returns:
         _type_: _description_
     """
-    with db.Session(engine) as session:
-        context = {'content': db.get_all_teams(session)}
+    season = get_season()
+    with db.get_session() as session:
+        context = {'content': db.get_all_teams(session, season=season), 'season': season}
     return render_template('index.html', **context), config.OK
 
 
-@app.route('/team/<team_id>')
+@pages.route('/team/<uuid:team_id>')
 def team(team_id: UUID):
-    """Страница команды.
+    """Страница команды (из документа команды: команда, лига, стадион и игроки).
 
     Args:
         team_id (UUID): id команды
 
     Returns:
         _type_: _description_
+
+    Raises:
+        NotFound: команда не найдена
     """
-    with db.Session(engine) as session:
-        team_data = db.get_team(team_id, session)
-        stadium = db.get_stadium(team_data['stadium_id'], session)
-        league = db.get_league(team_data['league_id'], session)
-        players = db.get_players_of_team(team_data['id'], session)
-    context = {
-        'team': team_data,
-        'stadium': stadium,
-        'league': league,
-        'players': players,
-    }
+    with db.get_session() as session:
+        context = db.get_team_document(team_id, session)
+    if not context:
+        raise NotFound()
     return render_template('team.html', **context), config.OK
 
 
-@app.route('/add_team', methods=['GET', 'POST'])
+@pages.get('/<model>/<uuid:obj_id>/stats')
+def get_model_stats(model: str, obj_id: UUID):
+    """Предрассчитанная статистика команды или лиги.
+
+    Args:
+        model (str): модель
+        obj_id (UUID): id записи
+
+    Returns:
+        _type_: _description_
+    """
+    functions = {
+        'team': stats.get_team_stats,
+        'league': partial(stats.get_league_stats, season=get_season()),
+    }
+    res = None
+    if model in functions.keys():
+        with db.get_session() as session:
+            res = functions[model](obj_id, session)
+    if res:
+        return jsonify(res), config.OK
+    return '', config.NOT_FOUND
+
+
+@pages.route('/add_team', methods=['GET', 'POST'])
 def add_team():
     """Страница - добавить команду.
 
@@ -75,19 +341,155 @@ def add_team():
     msg = ''
     flag = False
     team_id = None
+    suggestions = []
     if form.validate_on_submit():
-        with db.Session(engine) as session:
-            team_id = db.add_team_api(form.name.data, form.league.data, form.country.data, session)
+        season = form.season.data
+        with db.get_session() as session:
+            team_id = db.add_team_api(
+                form.name.data, form.league.data, form.country.data, session, season,
+            )
+            if not team_id:
+                suggestions = catalog.suggest_teams(form.name.data, session, season)
         flag = True
     if team_id:
         return redirect(f'/team/{team_id}')
     if flag:
         msg = 'Команда не найдена, проверьте введенные данные'
-    context = {'msg': msg}
+    context = {'msg': msg, 'suggestions': suggestions}
     return render_template('add_team.html', **context, form=form), config.OK
 
 
-@app.post('/<model>/create')
+@pages.get('/catalog/<any(leagues, teams):kind>')
+def catalog_suggestions(kind: str):
+    """Подсказки названий лиг или команд из каталога внешнего апи (автодополнение).
+
+    Args:
+        kind (str): leagues или teams
+
+    Returns:
+        _type_: _description_
+    """
+    functions = {
+        'leagues': catalog.suggest_leagues,
+        'teams': catalog.suggest_teams,
+    }
+    with db.get_session() as session:
+        res = functions[kind](request.args.get('q', ''), session, get_season())
+    return jsonify(res), config.OK
+
+
+@pages.get('/changes')
+def change_feed():
+    """Изменения команд, игроков, лиг и стадионов после курсора since.
+
+    Returns:
+        _type_: _description_
+    """
+    since = request.args.get('since')
+    limit = request.args.get('limit', config.CHANGES_PAGE, type=int)
+    try:
+        with db.get_session() as session:
+            res = changes.get_changes(since, session, limit)
+    except ValueError:
+        return '', config.BAD_REQUEST
+    except changes.StaleCursor:
+        return '', config.GONE
+    return jsonify(res), config.OK
+
+
+@pages.cli.command('refresh-catalog')
+@click.option(
+    '--country', 'countries', multiple=True, help='Загрузить команды только лиг этой страны',
+)
+@click.option(
+    '--all-countries', is_flag=True, help='Загрузить команды лиг всех стран (по частям)',
+)
+@click.option(
+    '--max-calls', default=config.CATALOG_MAX_CALLS, help='Запросов команд к апи за запуск',
+)
+@click.option('--season', default=config.SEASON, help='Сезон (по умолчанию текущий)')
+def refresh_catalog(countries: tuple[str, ...], all_countries: bool, max_calls: int, season: int):
+    """Обновить каталог лиг и команд внешнего апи за сезон.
+
+    Args:
+        countries (tuple[str, ...]): страны, команды лиг которых загружаются
+        all_countries (bool): загружать команды лиг всех стран
+        max_calls (int): наибольшее число запросов команд к внешнему апи
+        season (int): сезон
+
+    Raises:
+        UsageError: не выбраны страны
+    """
+    if not countries and not all_countries:
+        raise click.UsageError('укажите --country или --all-countries')
+    with db.get_session() as session:
+        leagues_count, teams_count, deferred = catalog.refresh(
+            session, countries, season, max_calls,
+        )
+    click.echo(f'Лиг: {leagues_count}, команд: {teams_count}, лиг отложено: {deferred}')
+
+
+@pages.cli.command('add-season')
+@click.argument('season', type=int)
+def add_season(season: int):
+    """Создать секцию игроков сезона.
+
+    Args:
+        season (int): сезон
+    """
+    with db.get_session() as session:
+        created = seasons.add_season(season, session)
+        season_list = seasons.get_seasons(session)
+    click.echo(f'Сезоны: {season_list}, секция создана: {created}')
+
+
+@pages.cli.command('archive-season')
+@click.argument('season', type=int)
+@click.option('--drop', is_flag=True, help='Удалить игроков сезона, а не переносить в архив')
+def archive_season(season: int, drop: bool):
+    """Убрать прошедший сезон из рабочих таблиц без массового удаления строк.
+
+    Args:
+        season (int): сезон
+        drop (bool): удалить секцию игроков, а не переносить в схему archive
+
+    Raises:
+        BadParameter: попытка архивировать текущий сезон
+    """
+    if season == config.SEASON:
+        raise click.BadParameter('текущий сезон нельзя архивировать', param_hint='SEASON')
+    autocommit = db.get_engine().execution_options(isolation_level='AUTOCOMMIT')
+    with autocommit.connect() as connection:
+        team_ids = seasons.archive_season(season, connection, drop)
+    with db.get_session() as session:
+        teams_count = db.archive_teams(team_ids, session) or 0
+    click.echo(f'Сезон {season}: секция отключена, команд убрано: {teams_count}')
+
+
+@pages.cli.command('rebuild-documents')
+def rebuild_documents():
+    """Пересчитать документы всех команд."""
+    with db.get_session() as session:
+        documents_count = documents.rebuild(session)
+    click.echo(f'Документов команд: {documents_count}')
+
+
+@pages.cli.command('compact-changes')
+@click.option(
+    '--retention', default=config.CHANGES_RETENTION, help='Срок хранения, например 7 days',
+)
+def compact_changes(retention: str):
+    """Сжать журнал изменений.
+
+    Args:
+        retention (str): срок хранения (интервал Postgres)
+    """
+    with db.get_session() as session:
+        superseded, expired = changes.compact(session, retention)
+    click.echo(f'Удалено замененных изменений: {superseded}, устаревших: {expired}')
+
+
+@pages.post('/<model>/create')
 def create_model(model: str):
     """Создание записи модели.
 
@@ -105,7 +507,7 @@ def create_model(model: str):
         'player': db.create_player,
     }
     if model in functions.keys():
-        with db.Session(engine) as session:
+        with db.get_session() as session:
             res = functions[model](body, session)
     else:
         return '', config.NOT_FOUND
@@ -114,7 +516,7 @@ def create_model(model: str):
     return '', config.BAD_REQUEST
 
 
-@app.put('/<model>/update')
+@pages.put('/<model>/update')
 def update_model(model: str):
     """Обновление записи модели.
 
@@ -132,7 +534,7 @@ def update_model(model: str):
         'player': db.update_player,
     }
     if model in functions.keys():
-        with db.Session(engine) as session:
+        with db.get_session() as session:
             res = functions[model](body, session)
     else:
         return '', config.NOT_FOUND
@@ -141,7 +543,7 @@ def update_model(model: str):
     return '', config.BAD_REQUEST
 
 
-@app.delete('/<model>/delete')
+@pages.delete('/<model>/delete')
 def delete_model(model: str):
     """Удалить запись модели.
 
@@ -159,7 +561,7 @@ def delete_model(model: str):
         'player': db.delete_player,
     }
     if model in functions.keys():
-        with db.Session(engine) as session:
+        with db.get_session() as session:
             res = functions[model](body['id'], session)
     else:
         return '', config.NOT_FOUND
@@ -168,7 +570,33 @@ def delete_model(model: str):
     return '', config.BAD_REQUEST
 
 
-@app.get('/<model>')
+@pages.delete('/<any(team, league, stadium, player):model>/bulk_delete')
+def bulk_delete_model(model: str):
+    """Удалить несколько записей модели.
+
+    Args:
+        model (str): модель
+
+    Returns:
+        _type_: _description_
+    """
+    body = request.json
+    functions = {
+        'team': db.bulk_delete_team,
+        'league': db.bulk_delete_league,
+        'stadium': db.bulk_delete_stadium,
+        'player': db.bulk_delete_player,
+    }
+    res = None
+    if isinstance(body, dict) and isinstance(body.get('ids'), list):
+        with db.get_session() as session:
+            res = functions[model](body['ids'], session)
+    if res:
+        return str(res), config.OK
+    return '', config.BAD_REQUEST
+
+
+@pages.get('/<model>')
 def get_model_all(model: str):
     """Получить все записи модели.
 
@@ -185,8 +613,8 @@ def get_model_all(model: str):
         'players': db.get_all_player,
     }
     if model in functions.keys():
-        with db.Session(engine) as session:
-            res = {f'{model}': functions[model](session)}
+        with db.get_session() as session:
+            res = {f'{model}': functions[model](session, season=get_season())}
     else:
         return '', config.NOT_FOUND
     if res:
@@ -194,5 +622,29 @@ def get_model_all(model: str):
     return '', config.BAD_REQUEST
 
 
+def create_app() -> Flask:
+    """Создать приложение.
+
+    Движок базы данных и клиенты внешних сервисов создаются при первом запросе,
+    поэтому приложение можно загрузить в мастер-процессе gunicorn (--preload).
+
+    Returns:
+        Flask: приложение
+    """
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+    app.config['SECRET_KEY'] = environ.get('SECRET_KEY')
+    app.add_template_global(config.THUMBNAIL_SIZE_LARGE, 'THUMBNAIL_SIZE_LARGE')
+    app.register_blueprint(pages)
+    if config.ADMIN_TOKEN:
+        app.register_blueprint(admin_pages)
+    if profiler.every:
+        app.before_request(start_profile)
+        app.teardown_request(finish_profile)
+    if config.COMPRESS:
+        app.after_request(compress_response)
+    return app
+
+
 if __name__ == '__main__':
-    app.run(debug=False)
+    create_app().run(debug=False)
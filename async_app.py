@@ -0,0 +1,462 @@
+"""ASGI модуль: асинхронный JSON api поверх asyncio движка базы данных."""
+import asyncio
+from functools import partial
+from os import getpid
+from uuid import UUID
+
+import httpx
+from quart import Blueprint, Quart, Response, jsonify, request
+
+import admin
+import admission
+import async_db
+import changes
+import compression
+import config
+import deadlines
+import football_api
+from breaker import CircuitOpen
+
+TEAM_FIELDS = ('name', 'league', 'country')
+
+app = Quart(__name__)
+admin_pages = Blueprint('admin', __name__, url_prefix='/admin')
+app.json.ensure_ascii = False
+budgets = admission.create_budgets(admission.AsyncBudget)
+
+
+def get_season() -> int:
+    """Сезон из параметра запроса season (по умолчанию текущий).
+
+    Returns:
+        int: сезон
+    """
+    return request.args.get('season', config.SEASON, type=int)
+
+
+def to_json(model_values: dict | None) -> dict | None:
+    """Подготовить словарь с данными записи к сериализации.
+
+    Args:
+        model_values (dict | None): словарь атрибутов объекта модели
+
+    Returns:
+        dict | None: словарь без служебных полей SQLAlchemy
+    """
+    if model_values is None:
+        return None
+    return {
+        key: field for key, field in model_values.items() if key != '_sa_instance_state'
+    }
+
+
+@app.before_request
+async def start_deadline():
+    """Начать крайний срок запроса (до ожидания в очереди допуска)."""
+    deadlines.start(request.endpoint, request.method)
+
+
+@app.before_request
+async def admit():
+    """Допустить запрос в его бюджет (чтение, запись или добавление через внешнее апи)."""
+    name = admission.budget_name(request.endpoint, request.method)
+    if name:
+        await budgets[name].acquire()
+        request.scope[admission.REQUEST_KEY] = budgets[name]
+
+
+@app.teardown_request
+async def release(error: BaseException | None):
+    """Освободить место в бюджете запроса.
+
+    Args:
+        error (BaseException | None): исключение обработчика
+    """
+    budget = request.scope.pop(admission.REQUEST_KEY, None)
+    if budget:
+        await budget.release()
+    deadlines.finish()
+
+
+async def compress_response(response: Response) -> Response:
+    """Сжать ответ в кодировке, которую принимает клиент, или ответить 304.
+
+    Большие тела сжимаются в потоке, чтобы не занимать цикл событий.
+
+    Args:
+        response (Response): ответ
+
+    Returns:
+        Response: сжатый ответ, 304 или исходный ответ
+    """
+    if not compression.is_compressible(response, request.endpoint):
+        return response
+    body = await response.get_data()
+    if len(body) < config.COMPRESS_MIN_SIZE:
+        return response
+    if compression.not_modified(response, body, request.if_none_match):
+        return response
+    encoding = compression.negotiate(request.accept_encodings)
+    if encoding:
+        encode = partial(
+            compression.encode, body, encoding, response.get_etag()[0], streaming=False,
+        )
+        if len(body) >= config.COMPRESS_STREAM_SIZE:
+            payload = await asyncio.to_thread(encode)
+        else:
+            payload = encode()
+        compression.set_payload(response, payload, encoding)
+    return response
+
+
+if config.COMPRESS:
+    app.after_request(compress_response)
+
+
+@app.errorhandler(admission.Overloaded)
+async def overloaded(error: admission.Overloaded):
+    """Быстрый отказ, когда бюджет запроса исчерпан.
+
+    Args:
+        error (admission.Overloaded): исключение бюджета
+
+    Returns:
+        _type_: _description_
+    """
+    return '', config.SERVICE_UNAVAILABLE, {'Retry-After': str(error.retry_after)}
+
+
+@admin_pages.before_request
+async def require_admin_token():
+    """Пускать на служебные страницы только с токеном ADMIN_TOKEN.
+
+    Returns:
+        _type_: _description_
+    """
+    if not admin.authorized(request.headers.get('Authorization')):
+        return '', config.UNAUTHORIZED, dict(admin.CHALLENGE)
+    return None
+
+
+@admin_pages.get('/admission')
+async def admission_counters():
+    """Счетчики допуска запросов этого воркера.
+
+    Returns:
+        _type_: _description_
+    """
+    counters = {name: budget.counters() for name, budget in budgets.items()}
+    return jsonify({'pid': getpid(), 'budgets': counters}), config.OK
+
+
+@app.errorhandler(CircuitOpen)
+async def football_unavailable(error: CircuitOpen):
+    """Быстрый отказ, когда предохранитель внешнего апи разомкнут.
+
+    Args:
+        error (CircuitOpen): исключение предохранителя
+
+    Returns:
+        _type_: _description_
+    """
+    return '', config.SERVICE_UNAVAILABLE, {'Retry-After': str(error.retry_after)}
+
+
+@admin_pages.get('/football')
+async def football_counters():
+    """Состояние предохранителя внешнего апи и кэша последних ответов этого воркера.
+
+    Returns:
+        _type_: _description_
+    """
+    counters = {
+        'breaker': football_api.breaker.counters(),
+        'last_good': football_api.last_good.counters(),
+    }
+    return jsonify({'pid': getpid(), **counters}), config.OK
+
+
+@app.errorhandler(deadlines.DeadlineExceeded)
+async def deadline_exceeded(error: deadlines.DeadlineExceeded):
+    """Ответ 504, когда крайний срок запроса истек.
+
+    Args:
+        error (deadlines.DeadlineExceeded): исключение срока
+
+    Returns:
+        _type_: _description_
+    """
+    deadlines.record(error)
+    return jsonify({'error': str(error), 'stage': error.stage}), config.GATEWAY_TIMEOUT
+
+
+@admin_pages.get('/deadlines')
+async def deadline_counters():
+    """Счетчики запросов со сроком и прерванных по сроку этого воркера.
+
+    Returns:
+        _type_: _description_
+    """
+    return jsonify({'pid': getpid(), **deadlines.metrics.counters()}), config.OK
+
+
+@app.get('/team/<uuid:team_id>')
+async def team(team_id: UUID):
+    """Данные команды вместе с лигой, стадионом и игроками (готовый JSON документа команды).
+
+    Args:
+        team_id (UUID): id команды
+
+    Returns:
+        _type_: _description_
+    """
+    async with async_db.get_session() as session:
+        document = await async_db.get_team_document_json(team_id, session)
+    if not document:
+        return '', config.NOT_FOUND
+    return document, config.OK, {'Content-Type': 'application/json'}
+
+
+@app.get('/<model>/<uuid:obj_id>/stats')
+async def get_model_stats(model: str, obj_id: UUID):
+    """Предрассчитанная статистика команды или лиги.
+
+    Args:
+        model (str): модель
+        obj_id (UUID): id записи
+
+    Returns:
+        _type_: _description_
+    """
+    functions = {
+        'team': async_db.get_team_stats,
+        'league': partial(async_db.get_league_stats, season=get_season()),
+    }
+    res = None
+    if model in functions.keys():
+        async with async_db.get_session() as session:
+            res = await functions[model](obj_id, session)
+    if res:
+        return jsonify(res), config.OK
+    return '', config.NOT_FOUND
+
+
+def parse_team_request(body) -> tuple[str, str, str, int] | None:
+    """Проверить тело запроса добавления команды.
+
+    Args:
+        body (_type_): JSON тело запроса (None, если тело не JSON)
+
+    Returns:
+        tuple[str, str, str, int] | None: команда, лига, страна и сезон или ничего,
+            если поля не заполнены строками или сезон не число
+    """
+    if not isinstance(body, dict):
+        return None
+    if not all(body.get(field) and isinstance(body[field], str) for field in TEAM_FIELDS):
+        return None
+    try:
+        season = int(body.get('season', config.SEASON))
+    except (TypeError, ValueError):
+        return None
+    return body['name'], body['league'], body['country'], season
+
+
+@app.post('/add_team')
+async def add_team():
+    """Добавить команду с использованием внешнего апи.
+
+    Returns:
+        _type_: _description_
+    """
+    team_request = parse_team_request(await request.get_json(silent=True))
+    if team_request is None:
+        return '', config.BAD_REQUEST
+    name, league, country, season = team_request
+    try:
+        async with async_db.get_session() as session:
+            team_id = await async_db.add_team_api(name, league, country, session, season=season)
+    except (football_api.ForeignApiError, httpx.HTTPError):
+        return '', config.SERVER_ERROR
+    if team_id:
+        return str(team_id), config.CREATED
+    return '', config.NOT_FOUND
+
+
+@app.get('/catalog/<any(leagues, teams):kind>')
+async def catalog_suggestions(kind: str):
+    """Подсказки названий лиг или команд из каталога внешнего апи (автодополнение).
+
+    Args:
+        kind (str): leagues или teams
+
+    Returns:
+        _type_: _description_
+    """
+    functions = {
+        'leagues': async_db.suggest_leagues,
+        'teams': async_db.suggest_teams,
+    }
+    async with async_db.get_session() as session:
+        res = await functions[kind](request.args.get('q', ''), session, season=get_season())
+    return jsonify(res), config.OK
+
+
+@app.get('/changes')
+async def change_feed():
+    """Изменения команд, игроков, лиг и стадионов после курсора since.
+
+    Returns:
+        _type_: _description_
+    """
+    since = request.args.get('since')
+    limit = request.args.get('limit', config.CHANGES_PAGE, type=int)
+    try:
+        async with async_db.get_session() as session:
+            res = await async_db.get_changes(since, session, limit=limit)
+    except ValueError:
+        return '', config.BAD_REQUEST
+    except changes.StaleCursor:
+        return '', config.GONE
+    return jsonify(res), config.OK
+
+
+@app.post('/<model>/create')
+async def create_model(model: str):
+    """Создание записи модели.
+
+    Args:
+        model (str): модель
+
+    Returns:
+        _type_: _description_
+    """
+    body = await request.get_json()
+    functions = {
+        'team': async_db.create_team,
+        'league': async_db.create_league,
+        'stadium': async_db.create_stadium,
+        'player': async_db.create_player,
+    }
+    if model in functions.keys():
+        async with async_db.get_session() as session:
+            res = await functions[model](body, session)
+    else:
+        return '', config.NOT_FOUND
+    if res:
+        return str(res), config.CREATED
+    return '', config.BAD_REQUEST
+
+
+@app.put('/<model>/update')
+async def update_model(model: str):
+    """Обновление записи модели.
+
+    Args:
+        model (str): модель
+
+    Returns:
+        _type_: _description_
+    """
+    body = await request.get_json()
+    functions = {
+        'team': async_db.update_team,
+        'league': async_db.update_league,
+        'stadium': async_db.update_stadium,
+        'player': async_db.update_player,
+    }
+    if model in functions.keys():
+        async with async_db.get_session() as session:
+            res = await functions[model](body, session)
+    else:
+        return '', config.NOT_FOUND
+    if res:
+        return str(res), config.OK
+    return '', config.BAD_REQUEST
+
+
+@app.delete('/<model>/delete')
+async def delete_model(model: str):
+    """Удалить запись модели.
+
+    Args:
+        model (str): модель
+
+    Returns:
+        _type_: _description_
+    """
+    body = await request.get_json()
+    functions = {
+        'team': async_db.delete_team,
+        'league': async_db.delete_league,
+        'stadium': async_db.delete_stadium,
+        'player': async_db.delete_player,
+    }
+    if model in functions.keys():
+        async with async_db.get_session() as session:
+            res = await functions[model](body['id'], session)
+    else:
+        return '', config.NOT_FOUND
+    if res:
+        return '', config.NO_CONTENT
+    return '', config.BAD_REQUEST
+
+
+@app.delete('/<any(team, league, stadium, player):model>/bulk_delete')
+async def bulk_delete_model(model: str):
+    """Удалить несколько записей модели.
+
+    Args:
+        model (str): модель
+
+    Returns:
+        _type_: _description_
+    """
+    body = await request.get_json()
+    functions = {
+        'team': async_db.bulk_delete_team,
+        'league': async_db.bulk_delete_league,
+        'stadium': async_db.bulk_delete_stadium,
+        'player': async_db.bulk_delete_player,
+    }
+    res = None
+    if isinstance(body, dict) and isinstance(body.get('ids'), list):
+        async with async_db.get_session() as session:
+            res = await functions[model](body['ids'], session)
+    if res:
+        return str(res), config.OK
+    return '', config.BAD_REQUEST
+
+
+@app.get('/<model>')
+async def get_model_all(model: str):
+    """Получить все записи модели.
+
+    Args:
+        model (str): модель
+
+    Returns:
+        _type_: _description_
+    """
+    functions = {
+        'teams': async_db.get_all_teams,
+        'leagues': async_db.get_all_league,
+        'stadiums': async_db.get_all_stadium,
+        'players': async_db.get_all_player,
+    }
+    if model in functions.keys():
+        async with async_db.get_session() as session:
+            res = {f'{model}': await functions[model](session, season=get_season())}
+    else:
+        return '', config.NOT_FOUND
+    if res:
+        return jsonify(res), config.OK
+    return '', config.BAD_REQUEST
+
+
+if config.ADMIN_TOKEN:
+    app.register_blueprint(admin_pages)
+
+
+if __name__ == '__main__':
+    app.run(debug=False)
@@ -0,0 +1,264 @@
+"""Модуль для асинхронной работы с базой данных.
+
+Функции модуля db выполняются через asyncio движок SQLAlchemy
+(AsyncSession.run_sync), поэтому логика запросов общая для обоих режимов.
+"""
+from functools import cache
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import async_football_api as football
+import catalog
+import changes
+import config
+import db
+import seasons
+import stats
+from models import League, Player, Stadium, Team
+
+
+def get_async_db_url() -> str:
+    """Получить данные для асинхронного подключения к базе данных.
+
+    Returns:
+        str: данные для подключения к базе данных
+    """
+    return db.get_db_url().replace('postgresql+psycopg2', 'postgresql+asyncpg', 1)
+
+
+@cache
+def get_sessionmaker() -> async_sessionmaker:
+    """Получить фабрику асинхронных сессий, создав asyncio движок при первом обращении.
+
+    Соединения движка привязаны к циклу событий, поэтому он создается уже
+    в воркере, а не при импорте.
+
+    Returns:
+        async_sessionmaker: фабрика асинхронных сессий
+    """
+    engine = create_async_engine(get_async_db_url(), echo=False)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def get_session() -> AsyncSession:
+    """Открыть асинхронную сессию базы данных.
+
+    Returns:
+        AsyncSession: сессия
+    """
+    return get_sessionmaker()()
+
+
+def create_async(func: Callable) -> Callable:
+    """Создать асинхронную версию функции модуля db.
+
+    Args:
+        func (Callable): функция модуля db, последний позиционный аргумент которой - сессия
+
+    Returns:
+        Callable: корутина с той же сигнатурой, принимающая AsyncSession
+    """
+    async def async_func(*args, **kwargs):
+        """Выполнить функцию в асинхронной сессии.
+
+        Args:
+            args: аргументы функции, последний - AsyncSession
+            kwargs: именованные аргументы функции после сессии (например, season)
+
+        Returns:
+            _type_: результат функции
+        """
+        *func_args, session = args
+        return await session.run_sync(
+            lambda sync_session: func(*func_args, sync_session, **kwargs),
+        )
+    return async_func
+
+
+# группировка вставок ждет в потоках, поэтому в цикле событий записи вставляются по одной
+create_league = create_async(db.create_add(League))
+create_stadium = create_async(db.create_add(Stadium))
+create_player = create_async(db.create_add(Player))
+create_team = create_async(db.create_add(Team))
+
+update_league = create_async(db.update_league)
+update_stadium = create_async(db.update_stadium)
+update_player = create_async(db.update_player)
+update_team = create_async(db.update_team)
+
+delete_league = create_async(db.delete_league)
+delete_stadium = create_async(db.delete_stadium)
+delete_player = create_async(db.delete_player)
+delete_team = create_async(db.delete_team)
+
+bulk_delete_league = create_async(db.bulk_delete_league)
+bulk_delete_stadium = create_async(db.bulk_delete_stadium)
+bulk_delete_player = create_async(db.bulk_delete_player)
+bulk_delete_team = create_async(db.bulk_delete_team)
+
+get_league = create_async(db.get_league)
+get_stadium = create_async(db.get_stadium)
+get_team = create_async(db.get_team)
+get_players_of_team = create_async(db.get_players_of_team)
+
+get_all_teams = create_async(db.get_all_teams)
+get_all_stadium = create_async(db.get_all_stadium)
+get_all_league = create_async(db.get_all_league)
+get_all_player = create_async(db.get_all_player)
+
+get_team_stats = create_async(stats.get_team_stats)
+get_league_stats = create_async(stats.get_league_stats)
+
+get_team_document_json = create_async(db.get_team_document_json)
+
+catalog_is_filled = create_async(catalog.is_filled)
+catalog_is_league_filled = create_async(catalog.is_league_filled)
+catalog_find_league = create_async(catalog.find_league)
+catalog_find_team = create_async(catalog.find_team)
+suggest_leagues = create_async(catalog.suggest_leagues)
+suggest_teams = create_async(catalog.suggest_teams)
+
+add_season = create_async(seasons.add_season)
+
+get_changes = create_async(changes.get_changes)
+
+find_league = create_async(db.find_league)
+save_league = create_async(db.save_league)
+find_team = create_async(db.find_team)
+save_team = create_async(db.save_team)
+save_players = create_async(db.save_players)
+
+
+async def resolve_league(
+    name: str, country: str, session: AsyncSession, season: int = config.SEASON,
+) -> dict | None:
+    """Найти лигу в каталоге, а если каталог еще не загружен - через асинхронный клиент апи.
+
+    Args:
+        name (str): название лиги
+        country (str): страна
+        session (AsyncSession): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными о лиге или ничего, если лига не найдена
+    """
+    if await catalog_is_filled(session, season=season):
+        return await catalog_find_league(name, country, session, season=season)
+    data_league = await football.get_data_league(name, country, season)
+    if not data_league:
+        return None
+    return {'api_id': data_league[0], 'name': name, 'country': country, 'logo': data_league[1]}
+
+
+async def resolve_team(
+    name: str, league_api_id: int, session: AsyncSession, season: int = config.SEASON,
+) -> dict | None:
+    """Найти команду в каталоге, а если команды лиги не загружены - через асинхронный клиент апи.
+
+    Args:
+        name (str): название команды
+        league_api_id (int): api id лиги
+        session (AsyncSession): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: данные команды в формате внешнего апи или ничего, если команда не найдена
+    """
+    if await catalog_is_league_filled(league_api_id, session, season=season):
+        return await catalog_find_team(name, league_api_id, session, season=season)
+    return await football.get_data_team(name, league_api_id, season)
+
+
+async def add_league_api(
+    name: str, country: str, session: AsyncSession, season: int = config.SEASON,
+) -> dict | None:
+    """Добавить лигу, найденную в каталоге (или через асинхронный клиент апи).
+
+    Args:
+        name (str): название лиги
+        country (str): страна
+        session (AsyncSession): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными о лиге или ничего, если не получилось добавить.
+    """
+    league = await find_league(name, country, session)
+    if league:
+        return league
+    found = await resolve_league(name, country, session, season)
+    if not found:
+        return None
+    league = await find_league(found['name'], found['country'], session)
+    if league:
+        return league
+    data_league = found['api_id'], found['logo']
+    return await save_league(found['name'], found['country'], data_league, session)
+
+
+async def add_players_api(
+    team_id: UUID, api_id: int, session: AsyncSession, season: int = config.SEASON,
+):
+    """Добавить игроков с использованием асинхронного клиента внешнего апи.
+
+    Args:
+        team_id (UUID): id команды
+        api_id (int): api id команды
+        session (AsyncSession): сессия
+        season (int): сезон команды
+    """
+    roster = await football.get_team_roster(api_id, season)
+    await save_players(team_id, roster, session, season=season)
+
+
+async def add_found_team(
+    team_json: dict, league_id: UUID, session: AsyncSession, season: int = config.SEASON,
+) -> UUID:
+    """Добавить найденную команду с составом, если ее еще нет в базе.
+
+    Args:
+        team_json (dict): данные команды в формате внешнего апи
+        league_id (UUID): id лиги
+        session (AsyncSession): сессия
+        season (int): сезон
+
+    Returns:
+        UUID: id команды
+    """
+    team_id = await find_team(team_json['team']['name'], league_id, session, season=season)
+    if team_id:
+        return team_id
+    await add_season(season, session)
+    team_id = await save_team(team_json, league_id, session, season=season)
+    await add_players_api(team_id, team_json['team']['id'], session, season)
+    return team_id
+
+
+async def add_team_api(
+    name: str, league: str, country: str, session: AsyncSession, season: int = config.SEASON,
+) -> UUID | None:
+    """Добавить команду: лига и команда ищутся в каталоге, из внешнего апи берется только состав.
+
+    Args:
+        name (str): название команды
+        league (str): название лиги
+        country (str): страна
+        session (AsyncSession): сессия
+        season (int): сезон
+
+    Returns:
+        UUID | None: id команды или ничего, если не получилось добавить
+    """
+    league = await add_league_api(league, country, session, season)
+    if not league:
+        return None
+    team_id = await find_team(name, league['id'], session, season=season)
+    if team_id:
+        return team_id
+    team_json = await resolve_team(name, league['api_id'], session, season)
+    if team_json:
+        return await add_found_team(team_json, league['id'], session, season)
+    return None
@@ -0,0 +1,155 @@
+"""Модуль для асинхронной работы с внешним api."""
+from functools import cache
+from os import environ
+
+import httpx
+
+import config
+import deadlines
+import football_api
+from breaker import CircuitOpen
+
+
+@cache
+def get_client() -> httpx.AsyncClient:
+    """Получить http клиент, общий для всех запросов процесса.
+
+    Returns:
+        httpx.AsyncClient: асинхронный http клиент
+    """
+    return httpx.AsyncClient(
+        base_url=config.FOOTBALL_URL,
+        headers={config.FOOTBALL_HEADER: environ.get('FOOTBAll_KEY', '')},
+        timeout=config.FOOTBALL_TIMEOUT,
+    )
+
+
+async def fetch(path: str, options: dict) -> dict:
+    """Запросить данные у внешнего api.
+
+    Args:
+        path (str): путь
+        options (dict): параметры
+
+    Raises:
+        ForeignApiError: ошибка внешнего api
+        httpx.TimeoutException: таймаут соединения, а срок запроса еще не истек
+
+    Returns:
+        dict: словарь с данными
+    """
+    timeout = deadlines.timeout(config.FOOTBALL_TIMEOUT, football_api.FOOTBALL)
+    try:
+        response = await get_client().get(path, params=options, timeout=timeout)
+    except httpx.TimeoutException:
+        deadlines.check(football_api.FOOTBALL)
+        raise
+    if response.status_code != config.OK:
+        raise football_api.ForeignApiError(response.status_code)
+    return response.json()
+
+
+async def get_data(path: str, options: dict, stale_ok: bool = False) -> dict:
+    """Получить данные через предохранитель football_api.breaker.
+
+    Args:
+        path (str): путь
+        options (dict): параметры
+        stale_ok (bool): при сбое отдать последний успешный ответ на этот запрос
+
+    Raises:
+        football_api.ForeignApiError: ошибка внешнего api
+        CircuitOpen: предохранитель разомкнут, а последнего ответа нет
+        httpx.HTTPError: ошибка соединения или таймаут, а последнего ответа нет
+
+    Returns:
+        dict: словарь с данными
+    """
+    deadlines.check(football_api.FOOTBALL)
+    key = football_api.stale_key(path, options)
+    try:
+        with football_api.breaker.call():
+            response_data = await fetch(path, options)
+    except (football_api.ForeignApiError, CircuitOpen, httpx.HTTPError):
+        stale = football_api.last_good.get(key) if stale_ok else None
+        if stale is None:
+            raise
+        return stale
+    if stale_ok:
+        football_api.last_good.put(key, response_data)
+    return response_data
+
+
+async def get_data_league(
+    name: str, country: str, season: int = config.SEASON,
+) -> tuple[str] | None:
+    """Получить данные лиги.
+
+    Args:
+        name (str): название
+        country (str): страна
+        season (int): сезон
+
+    Returns:
+        tuple[str] | None: кортеж с данными или ничего, если совпадений не найдено
+    """
+    league_data = await get_data('/leagues', {'season': season}, stale_ok=True)
+    return football_api.find_league(league_data, name, country)
+
+
+async def get_data_team(
+    name: str, league_api_id: int, season: int = config.SEASON,
+) -> dict | None:
+    """Получить данные команды.
+
+    Args:
+        name (str): название
+        league_api_id (int): api id лиги
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными или ничего, если совпадений не найдено
+    """
+    team_data = await get_data(
+        '/teams', {'league': league_api_id, 'season': season}, stale_ok=True,
+    )
+    return football_api.find_team(team_data, name)
+
+
+async def get_season_roster(team_api_id: int, season: int) -> list[dict]:
+    """Получить игроков команды за прошедший сезон (постранично).
+
+    Args:
+        team_api_id (int): api id команды
+        season (int): сезон
+
+    Returns:
+        list[dict]: список словарей с данными об игроках
+    """
+    res = []
+    page = 1
+    while True:
+        options = {'team': team_api_id, 'season': season, 'page': page}
+        players_data = await get_data('/players', options, stale_ok=True)
+        res.extend(football_api.parse_season_players(players_data))
+        if page >= players_data['paging']['total']:
+            return res
+        page += 1
+
+
+async def get_team_roster(team_api_id: int, season: int = config.SEASON) -> list[dict]:
+    """Получить состав команды.
+
+    Текущий состав отдает /players/squads, а игроков прошедших сезонов - /players.
+
+    Args:
+        team_api_id (int): api id команды
+        season (int): сезон
+
+    Returns:
+        list[dict]: список словарей с данными об игроках
+    """
+    if season != config.SEASON:
+        return await get_season_roster(team_api_id, season)
+    roster_data = await get_data('/players/squads', {'team': team_api_id}, stale_ok=True)
+    return football_api.parse_roster(roster_data)
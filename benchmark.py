@@ -0,0 +1,364 @@
+"""Модуль бенчмарков.
+
+Пример: python benchmark.py concurrency --url http://127.0.0.1:5000 --path /teams
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import requests
+from sqlalchemy import MetaData, Table, delete, insert, text
+
+import compression
+import config
+import db
+from models import League, uuid7
+
+PERCENTILES = (50, 95, 99)
+MS_IN_SECOND = 1000
+DEFAULT_REQUESTS = 500
+FAILED = 0
+DEFAULT_ROWS = 100000
+ROSTER_SIZE = 30
+BYTES_IN_MB = 1024 * 1024
+ID_GENERATORS = (('uuid4', uuid4), ('uuid7', uuid7))
+CREATE_BENCH_TABLE = text('CREATE TABLE bench_players (LIKE players INCLUDING ALL)')
+DROP_BENCH_TABLE = text('DROP TABLE IF EXISTS bench_players')
+BENCH_LEAGUE = 'bench league '
+IDENTITY = 'identity'
+CPU_REPEAT = 20
+BYTES_IN_KB = 1024
+BENCH_INDEX_SIZES = text(
+    "SELECT pg_relation_size('bench_players_pkey'), pg_indexes_size('bench_players')",
+)
+
+
+def timed_get(http: requests.Session, url: str) -> tuple[float, int]:
+    """Выполнить запрос и замерить время ответа.
+
+    Args:
+        http (requests.Session): http сессия
+        url (str): ссылка
+
+    Returns:
+        tuple[float, int]: время ответа в секундах и статус код (0 - нет ответа)
+    """
+    start = time.perf_counter()
+    try:
+        status_code = http.get(url, timeout=60).status_code
+    except requests.RequestException:
+        status_code = FAILED
+    return time.perf_counter() - start, status_code
+
+
+def timed_create(http: requests.Session, url: str) -> tuple[float, int]:
+    """Создать одну лигу и замерить время ответа.
+
+    Args:
+        http (requests.Session): http сессия
+        url (str): ссылка на создание лиги
+
+    Returns:
+        tuple[float, int]: время ответа в секундах и статус код (0 - нет ответа)
+    """
+    league = {'name': f'{BENCH_LEAGUE}{uuid4()}', 'country': 'bench'}
+    start = time.perf_counter()
+    try:
+        status_code = http.post(url, json=league, timeout=60).status_code
+    except requests.RequestException:
+        status_code = FAILED
+    return time.perf_counter() - start, status_code
+
+
+def summarize(responses: list[tuple[float, int]], elapsed: float) -> dict:
+    """Посчитать пропускную способность, перцентили задержки и число ошибок.
+
+    Args:
+        responses (list[tuple[float, int]]): время ответа и статус код каждого запроса
+        elapsed (float): общее время в секундах
+
+    Returns:
+        dict: сводка по запросам
+    """
+    latencies = sorted(latency for latency, _ in responses)
+    cuts = statistics.quantiles(latencies, n=100)
+    report = {'rps': round(len(responses) / elapsed, 1)}
+    for percentile in PERCENTILES:
+        report[f'p{percentile}_ms'] = round(cuts[percentile - 1] * MS_IN_SECOND, 1)
+    report['errors'] = sum(
+        1 for _, status in responses if status < config.OK or status >= config.BAD_REQUEST
+    )
+    return report
+
+
+def run_level(url: str, concurrency: int, total: int, send=timed_get) -> dict:
+    """Выполнить запросы с заданным числом одновременных клиентов.
+
+    Args:
+        url (str): ссылка
+        concurrency (int): число одновременных клиентов
+        total (int): общее число запросов
+        send (_type_): функция одного запроса (timed_get или timed_create)
+
+    Returns:
+        dict: сводка по запросам
+    """
+    sessions = [requests.Session() for _ in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        responses = list(pool.map(
+            lambda index: send(sessions[index % concurrency], url), range(total),
+        ))
+    return {'concurrency': concurrency, **summarize(responses, time.perf_counter() - start)}
+
+
+def concurrency(args: argparse.Namespace):
+    """Бенчмарк задержки и пропускной способности при разной конкурентности.
+
+    Args:
+        args (argparse.Namespace): аргументы командной строки
+    """
+    for path in args.path or ['/teams']:
+        for level in args.levels:
+            report = run_level(f'{args.url}{path}', level, args.requests)
+            print(path, report)
+
+
+def creates(args: argparse.Namespace):
+    """Бенчмарк одиночных вставок (POST /league/create) при разной конкурентности.
+
+    Сравнивает режимы сервера с WRITE_COALESCE=1 и без него. Созданные лиги удаляются.
+
+    Args:
+        args (argparse.Namespace): аргументы командной строки
+    """
+    for level in args.levels:
+        print(run_level(f'{args.url}/league/create', level, args.requests, timed_create))
+    with db.get_session() as session:
+        session.execute(delete(League).where(League.name.startswith(BENCH_LEAGUE)))
+        session.commit()
+
+
+def timed_encoded_get(http: requests.Session, url: str, encoding: str) -> tuple[float, int, str]:
+    """Выполнить запрос с Accept-Encoding и замерить время и размер тела на проводе.
+
+    Args:
+        http (requests.Session): http сессия
+        url (str): ссылка
+        encoding (str): кодировка в Accept-Encoding
+
+    Returns:
+        tuple[float, int, str]: время ответа в секундах, байт тела и кодировка ответа
+    """
+    start = time.perf_counter()
+    response = http.get(url, headers={'Accept-Encoding': encoding}, stream=True, timeout=60)
+    wire_bytes = len(response.raw.read(decode_content=False))
+    return (
+        time.perf_counter() - start,
+        wire_bytes,
+        response.headers.get('Content-Encoding', IDENTITY),
+    )
+
+
+def cpu_ms(func, *args) -> float:
+    """Замерить процессорное время одного вызова (среднее по CPU_REPEAT вызовам).
+
+    Args:
+        func (_type_): функция
+        args (_type_): аргументы функции
+
+    Returns:
+        float: миллисекунды процессорного времени
+    """
+    start = time.process_time()
+    for _ in range(CPU_REPEAT):
+        func(*args)
+    return round((time.process_time() - start) / CPU_REPEAT * MS_IN_SECOND, 2)
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Сжать тело целиком, без кэша.
+
+    Args:
+        body (bytes): несжатое тело
+        encoding (str): кодировка
+
+    Returns:
+        bytes: сжатое тело
+    """
+    return b''.join(compression.compress_chunks(body, encoding))
+
+
+def encoding_report(http: requests.Session, url: str, body: bytes, args: argparse.Namespace):
+    """Замерить ответы сервера в каждой кодировке.
+
+    Args:
+        http (requests.Session): http сессия
+        url (str): ссылка
+        body (bytes): несжатое тело ответа
+        args (argparse.Namespace): аргументы командной строки
+
+    Yields:
+        dict: кодировка ответа, килобайт на проводе, степень сжатия, задержка и процессорное время
+    """
+    for encoding in (IDENTITY, *compression.COMPRESSORS):
+        timings = [timed_encoded_get(http, url, encoding) for _ in range(args.requests)]
+        _, wire_bytes, response_encoding = timings[-1]
+        report = {
+            'encoding': response_encoding,
+            'wire_kb': round(wire_bytes / BYTES_IN_KB, 1),
+            'ratio': round(len(body) / wire_bytes, 1),
+            'p50_ms': round(statistics.median(timing[0] for timing in timings) * MS_IN_SECOND, 1),
+        }
+        if encoding in compression.COMPRESSORS:
+            report['compress_cpu_ms'] = cpu_ms(compress_body, body, encoding)
+        yield report
+
+
+def compress(args: argparse.Namespace):
+    """Бенчмарк сжатия ответов: байты на проводе, задержка и процессорное время сжатия.
+
+    Задержка меряется на сервере (после первого запроса воркера сжатые байты
+    берутся из кэша), процессорное время сжатия без кэша и ETag - в этом процессе.
+
+    Args:
+        args (argparse.Namespace): аргументы командной строки
+    """
+    http = requests.Session()
+    for path in args.path or ['/players']:
+        url = f'{args.url}{path}'
+        body = http.get(url, headers={'Accept-Encoding': IDENTITY}, timeout=60).content
+        print(path, {
+            'body_kb': round(len(body) / BYTES_IN_KB, 1),
+            'etag_cpu_ms': cpu_ms(compression.etag_of, body),
+        })
+        for report in encoding_report(http, url, body, args):
+            print(path, report)
+
+
+def make_roster(make_id, start: int) -> list[dict]:
+    """Сгенерировать состав команды, как при добавлении игроков из внешнего апи.
+
+    Args:
+        make_id (_type_): функция генерации id
+        start (int): номер первого игрока
+
+    Returns:
+        list[dict]: список словарей с данными об игроках
+    """
+    team_id = make_id()
+    return [
+        {
+            'id': make_id(),
+            'name': f'bench player {index}',
+            'age': index % ROSTER_SIZE + 1,
+            'number': index % ROSTER_SIZE + 1,
+            'position': 'Defender',
+            'photo': None,
+            'team_id': team_id,
+            'season': config.SEASON,
+        }
+        for index in range(start, start + ROSTER_SIZE)
+    ]
+
+
+def ingest(make_id, rows: int) -> dict:
+    """Загрузить игроков составами по ROSTER_SIZE строк, каждый состав - своя транзакция.
+
+    Args:
+        make_id (_type_): функция генерации id
+        rows (int): число строк
+
+    Returns:
+        dict: скорость вставки и размер индексов
+    """
+    with db.get_engine().connect() as connection:
+        connection.execute(DROP_BENCH_TABLE)
+        connection.execute(CREATE_BENCH_TABLE)
+        connection.commit()
+        bench_players = Table('bench_players', MetaData(), autoload_with=connection)
+        start = time.perf_counter()
+        for first in range(0, rows, ROSTER_SIZE):
+            connection.execute(insert(bench_players), make_roster(make_id, first))
+            connection.commit()
+        elapsed = time.perf_counter() - start
+        pkey_size, indexes_size = connection.execute(BENCH_INDEX_SIZES).one()
+        connection.execute(DROP_BENCH_TABLE)
+        connection.commit()
+    return {
+        'rows_per_s': round(rows / elapsed),
+        'pkey_mb': round(pkey_size / BYTES_IN_MB, 1),
+        'indexes_mb': round(indexes_size / BYTES_IN_MB, 1),
+    }
+
+
+def ids(args: argparse.Namespace):
+    """Бенчмарк вставки игроков и размера индексов с uuid4 и uuid7 ключами.
+
+    Args:
+        args (argparse.Namespace): аргументы командной строки
+    """
+    for name, make_id in ID_GENERATORS:
+        print(name, ingest(make_id, args.rows))
+
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Добавить аргументы нагрузочных бенчмарков: адрес, уровни конкурентности и число запросов.
+
+    Args:
+        parser (argparse.ArgumentParser): парсер команды
+
+    Returns:
+        argparse.ArgumentParser: тот же парсер
+    """
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS)
+    return parser
+
+
+def add_compress_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Добавить аргументы бенчмарка сжатия: адрес, пути и число запросов в каждой кодировке.
+
+    Args:
+        parser (argparse.ArgumentParser): парсер команды
+
+    Returns:
+        argparse.ArgumentParser: тот же парсер
+    """
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--path', action='append')
+    parser.add_argument('--requests', type=int, default=CPU_REPEAT)
+    return parser
+
+
+def main():
+    """Запустить бенчмарк, выбранный в командной строке."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(required=True)
+
+    parser_concurrency = add_load_arguments(commands.add_parser(
+        'concurrency', help=concurrency.__doc__,
+    ))
+    parser_concurrency.add_argument('--path', action='append')
+    parser_concurrency.set_defaults(func=concurrency)
+
+    parser_creates = add_load_arguments(commands.add_parser('creates', help=creates.__doc__))
+    parser_creates.set_defaults(func=creates)
+
+    add_compress_arguments(commands.add_parser(
+        'compress', help=compress.__doc__,
+    )).set_defaults(func=compress)
+
+    parser_ids = commands.add_parser('ids', help=ids.__doc__)
+    parser_ids.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser_ids.set_defaults(func=ids)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Модуль предохранителя (circuit breaker) и кэша последних успешных ответов.
+
+Предохранитель считает подряд идущие сбои внешнего сервиса. После
+порогового числа сбоев он размыкается: запросы сразу получают CircuitOpen,
+не дожидаясь таймаута. Через reset_timeout секунд предохранитель пропускает
+пробные запросы (half-open): успешная проба замыкает его, сбой снова
+размыкает. Вызов, прерванный самим клиентом (истек крайний срок запроса),
+не считается ни сбоем, ни успехом. Состояние меняется без ожидания, поэтому
+один предохранитель подходит и для потоков, и для цикла событий.
+"""
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterator
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Исключение: предохранитель разомкнут, запрос к внешнему сервису не выполнялся."""
+
+    def __init__(self, breaker: 'CircuitBreaker') -> None:
+        """Инициализация исключения.
+
+        Args:
+            breaker (CircuitBreaker): разомкнутый предохранитель
+        """
+        super().__init__('circuit open')
+        self.retry_after = max(1, math.ceil(breaker.remaining()))
+
+
+class CircuitBreaker:
+    """Предохранитель вызовов внешнего сервиса."""
+
+    def __init__(
+        self, failures: int, reset_timeout: float, probes: int,
+        is_failure: Callable[[Exception], bool | None],
+    ) -> None:
+        """Инициализация предохранителя.
+
+        Args:
+            failures (int): число сбоев подряд, после которого предохранитель размыкается
+            reset_timeout (float): сколько секунд предохранитель разомкнут до пробных запросов
+            probes (int): число одновременных пробных запросов
+            is_failure (Callable): сбой ли исключение (None - вызов прерван клиентом)
+        """
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.counts = Counter(
+            consecutive_failures=0, failures=0, successes=0, abandoned=0, rejected=0, opened=0,
+            probing=0,
+        )
+        self._opened_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Выполнить вызов сервиса под защитой предохранителя.
+
+        Если предохранитель разомкнут, выбрасывает CircuitOpen до вызова.
+        Прерванный вызов (BaseException: отмена задачи, выход воркера) не считается
+        ни сбоем, ни успехом, но освобождает пробное место.
+
+        Yields:
+            Iterator[None]: блок с вызовом сервиса
+
+        Raises:
+            Exception: исключение вызова (пробрасывается дальше)
+        """
+        is_probe = self._admit()
+        failed = None
+        try:
+            yield
+            failed = False
+        except Exception as error:
+            failed = self.is_failure(error)
+            raise
+        finally:
+            self._record(is_probe, failed=failed)
+
+    def remaining(self) -> float:
+        """Сколько секунд осталось до пробных запросов.
+
+        Returns:
+            float: секунды (0, если пробы уже разрешены)
+        """
+        return max(0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def counters(self) -> dict:
+        """Получить состояние и счетчики предохранителя.
+
+        Returns:
+            dict: состояние, секунды до пробы и счетчики вызовов
+        """
+        with self._lock:
+            return {
+                'state': self.state,
+                'retry_in': 0 if self.state == CLOSED else round(self.remaining(), 1),
+                **self.counts,
+            }
+
+    def _admit(self) -> bool:
+        """Допустить вызов или отклонить его, если предохранитель разомкнут.
+
+        Returns:
+            bool: True, если вызов пробный
+
+        Raises:
+            CircuitOpen: предохранитель разомкнут или пробные места заняты
+        """
+        with self._lock:
+            if self.state == OPEN and not self.remaining():
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN and self.counts['probing'] < self.probes:
+                self.counts['probing'] += 1
+                return True
+            self.counts['rejected'] += 1
+            raise CircuitOpen(self)
+
+    def _record(self, is_probe: bool, failed: bool | None) -> None:
+        """Учесть результат вызова.
+
+        Args:
+            is_probe (bool): вызов был пробным
+            failed (bool | None): вызов закончился сбоем сервиса (None - прерван клиентом)
+        """
+        with self._lock:
+            if is_probe:
+                self.counts['probing'] -= 1
+            if failed is None:
+                self.counts['abandoned'] += 1
+                return
+            if not failed:
+                self.counts['successes'] += 1
+                self.counts['consecutive_failures'] = 0
+                if is_probe:
+                    self.state = CLOSED
+                return
+            self.counts['failures'] += 1
+            self.counts['consecutive_failures'] += 1
+            if is_probe or self.counts['consecutive_failures'] >= self.failures:
+                self._open()
+
+    def _open(self) -> None:
+        """Разомкнуть предохранитель."""
+        if self.state != OPEN:
+            self.counts['opened'] += 1
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+
+class LastGood:
+    """Последние успешные ответы (LRU), которые отдаются, пока сервис недоступен."""
+
+    def __init__(self, max_entries: int) -> None:
+        """Инициализация кэша.
+
+        Args:
+            max_entries (int): наибольшее число ответов
+        """
+        self.max_entries = max_entries
+        self.counts = Counter(stored=0, served=0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, response_data) -> None:
+        """Запомнить успешный ответ.
+
+        Args:
+            key (Hashable): ключ запроса
+            response_data (_type_): ответ
+        """
+        with self._lock:
+            self._entries[key] = response_data
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.counts['stored'] += 1
+
+    def get(self, key: Hashable):
+        """Получить последний успешный ответ вместо недоступного сервиса.
+
+        Args:
+            key (Hashable): ключ запроса
+
+        Returns:
+            _type_: ответ или ничего, если запрос раньше не выполнялся
+        """
+        with self._lock:
+            response_data = self._entries.get(key)
+            if response_data is not None:
+                self.counts['served'] += 1
+            return response_data
+
+    def counters(self) -> dict:
+        """Получить счетчики кэша.
+
+        Returns:
+            dict: число ответов в кэше и счетчики
+        """
+        with self._lock:
+            return {'entries': len(self._entries), **self.counts}
@@ -0,0 +1,225 @@
+"""Модуль кэша справочных таблиц (лиги и стадионы) в памяти воркера.
+
+Записи кэшируются при первом обращении. Триггеры на таблицах leagues и stadiums
+отправляют уведомления Postgres (NOTIFY) при каждом изменении, а фоновый поток
+каждого воркера слушает канал (LISTEN) и сбрасывает измененные записи.
+"""
+import os
+import threading
+import time
+from select import select as wait_readable
+from types import MappingProxyType
+from uuid import UUID
+
+import psycopg2
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+import config
+from models import League, Stadium
+
+ALL_ROWS = '*'
+
+
+class ReferenceCache:
+    """Кэш одной справочной таблицы: по id и по уникальному ключу."""
+
+    def __init__(self, model_class, key_fields: tuple[str, ...]) -> None:
+        """Инициализация кэша.
+
+        Args:
+            model_class (_type_): класс модели
+            key_fields (tuple[str, ...]): поля уникального ключа модели
+        """
+        self.model_class = model_class
+        self.key_fields = key_fields
+        self._columns = [column.key for column in inspect(model_class).column_attrs]
+        self._rows: dict[UUID, dict] = {}
+        self._keys: dict[tuple, UUID] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, obj_id: UUID | str, session: Session) -> dict | None:
+        """Получить запись по id.
+
+        Args:
+            obj_id (UUID | str): id записи
+            session (Session): сессия
+
+        Returns:
+            dict | None: словарь с данными о записи или ничего, если запись не найдена
+        """
+        if not obj_id:
+            return None
+        start_listener(session)
+        obj_id = obj_id if isinstance(obj_id, UUID) else UUID(obj_id)
+        row = self._rows.get(obj_id)
+        if row is None:
+            row = self._load([self.model_class.id == obj_id], session)
+        return dict(row) if row else None
+
+    def find(self, key: tuple, session: Session) -> dict | None:
+        """Найти запись по уникальному ключу.
+
+        Args:
+            key (tuple): значения полей уникального ключа
+            session (Session): сессия
+
+        Returns:
+            dict | None: словарь с данными о записи или ничего, если запись не найдена
+        """
+        start_listener(session)
+        row = self._rows.get(self._keys.get(key))
+        if row is None:
+            fields = [getattr(self.model_class, field) for field in self.key_fields]
+            conditions = [field == key_value for field, key_value in zip(fields, key)]
+            row = self._load(conditions, session)
+        return dict(row) if row else None
+
+    def invalidate(self, obj_id: UUID | str) -> None:
+        """Сбросить запись или весь кэш.
+
+        Args:
+            obj_id (UUID | str): id записи или '*', чтобы сбросить весь кэш
+        """
+        with self._lock:
+            self._generation += 1
+            if obj_id == ALL_ROWS:
+                self._rows.clear()
+                self._keys.clear()
+                return
+            row = self._rows.pop(obj_id if isinstance(obj_id, UUID) else UUID(obj_id), None)
+            if row:
+                self._keys.pop(self._key(row), None)
+
+    def _key(self, row: dict) -> tuple:
+        return tuple(row[field] for field in self.key_fields)
+
+    def _load(self, conditions: list, session: Session) -> dict | None:
+        generation = self._generation
+        record = session.scalar(select(self.model_class).where(*conditions))
+        if record is None:
+            return None
+        row = {column: getattr(record, column) for column in self._columns}
+        with self._lock:
+            # запись, изменившаяся во время запроса, и записи без слушателя не кэшируются
+            if generation == self._generation and listening.is_set():
+                self._rows[row['id']] = row
+                self._keys[self._key(row)] = row['id']
+        return row
+
+
+leagues = ReferenceCache(League, ('name', 'country'))
+stadiums = ReferenceCache(Stadium, ('name', 'address'))
+CACHES = MappingProxyType({
+    League.__tablename__: leagues,
+    Stadium.__tablename__: stadiums,
+})
+listening = threading.Event()
+
+
+def invalidate_row(table: str, obj_id: UUID | str) -> None:
+    """Сбросить запись кэша таблицы, если таблица кэшируется.
+
+    Args:
+        table (str): название таблицы
+        obj_id (UUID | str): id записи или '*', чтобы сбросить весь кэш таблицы
+    """
+    reference_cache = CACHES.get(table)
+    if reference_cache and obj_id:
+        reference_cache.invalidate(obj_id)
+
+
+def invalidate(model_class, obj_id: UUID | str) -> None:
+    """Сбросить запись кэша после изменения в текущем воркере.
+
+    Args:
+        model_class (_type_): класс модели
+        obj_id (UUID | str): id записи
+    """
+    invalidate_row(model_class.__tablename__, obj_id)
+
+
+def handle_notify(payload: str) -> None:
+    """Обработать уведомление об изменении справочной таблицы.
+
+    Args:
+        payload (str): строка вида ``<таблица>:<id>`` или ``<таблица>:*``
+    """
+    table, _, obj_id = payload.partition(':')
+    invalidate_row(table, obj_id)
+
+
+def clear() -> None:
+    """Сбросить все кэши."""
+    for reference_cache in CACHES.values():
+        reference_cache.invalidate(ALL_ROWS)
+
+
+def listen(connect_args: dict) -> None:
+    """Слушать канал уведомлений и сбрасывать измененные записи.
+
+    При потере соединения кэш очищается целиком, так как уведомления
+    за время переподключения могли быть пропущены.
+
+    Args:
+        connect_args (dict): параметры подключения к базе данных
+    """
+    while True:
+        try:
+            connection = psycopg2.connect(**connect_args)
+        except psycopg2.Error:
+            time.sleep(config.CACHE_RECONNECT_DELAY)
+            continue
+        try:
+            receive_notifies(connection)
+        except psycopg2.Error:
+            time.sleep(config.CACHE_RECONNECT_DELAY)
+        finally:
+            listening.clear()
+            clear()
+            connection.close()
+
+
+def receive_notifies(connection) -> None:
+    """Подписаться на канал и обрабатывать уведомления, пока соединение живо.
+
+    Args:
+        connection (_type_): соединение psycopg2
+    """
+    connection.autocommit = True
+    connection.cursor().execute(f'LISTEN {config.CACHE_CHANNEL}')
+    clear()
+    listening.set()
+    while not connection.closed:
+        wait_readable([connection], [], [], config.CACHE_LISTEN_TIMEOUT)
+        connection.poll()
+        while connection.notifies:
+            handle_notify(connection.notifies.pop(0).payload)
+
+
+_listener = {'pid': None}
+_listener_lock = threading.Lock()
+
+
+def start_listener(session: Session) -> None:
+    """Запустить поток-слушатель в текущем процессе, если он еще не запущен.
+
+    Проверка pid нужна, потому что потоки не переживают fork воркеров gunicorn.
+
+    Args:
+        session (Session): сессия, по движку которой определяется база данных
+    """
+    if _listener['pid'] == os.getpid():
+        return
+    with _listener_lock:
+        if _listener['pid'] == os.getpid():
+            return
+        clear()
+        connect_args = session.get_bind().url.translate_connect_args(
+            username='user', database='dbname',
+        )
+        threading.Thread(
+            target=listen, args=(connect_args,), daemon=True, name='cache-listener',
+        ).start()
+        _listener['pid'] = os.getpid()
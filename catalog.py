@@ -0,0 +1,332 @@
+"""Модуль локального каталога лиг и команд внешнего апи.
+
+Каталог сезона загружается командой ``flask --app app refresh-catalog``
+(например, раз в сутки по cron): лиги сезона одним запросом, команды - отдельным
+запросом на каждую лигу, поэтому за один запуск загружается не больше
+CATALOG_MAX_CALLS лиг с паузой CATALOG_CALL_INTERVAL между запросами (лимиты
+тарифа внешнего апи). Лиги без команд в каталоге загружаются первыми, и
+следующие запуски продолжают с оставшихся. Названия из формы добавления команды ищутся
+в Postgres: точное совпадение без учета регистра, а для подсказок и автодополнения -
+триграммный GiST индекс (pg_trgm), который отдает ближайшие названия сразу
+в порядке похожести. Внешнее апи при добавлении команды нужно только
+для состава.
+"""
+import time
+
+from sqlalchemy import and_, delete, exists, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+import config
+import football_api
+from models import CatalogLeague, CatalogTeam
+
+LIKE_ESCAPE = '\\'
+IS_LOCAL = True
+
+
+def refresh_leagues(session: Session, season: int) -> list[dict]:
+    """Заменить каталог лиг сезона данными внешнего апи.
+
+    Args:
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        list[dict]: лиги сезона
+    """
+    leagues = {
+        league['league']['id']: {
+            'season': season,
+            'api_id': league['league']['id'],
+            'name': league['league']['name'],
+            'country': league['country']['name'],
+            'logo': league['league']['logo'],
+        }
+        for league in football_api.get_leagues(season)
+    }
+    session.execute(delete(CatalogLeague).where(CatalogLeague.season == season))
+    if leagues:
+        session.execute(insert(CatalogLeague), list(leagues.values()))
+    session.commit()
+    return list(leagues.values())
+
+
+def refresh_teams(league_api_id: int, session: Session, season: int) -> int:
+    """Заменить каталог команд лиги данными внешнего апи.
+
+    Args:
+        league_api_id (int): api id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        int: число команд лиги
+    """
+    teams = {
+        team_json['team']['id']: {
+            'season': season,
+            'league_api_id': league_api_id,
+            'api_id': team_json['team']['id'],
+            'name': team_json['team']['name'],
+            'team_json': team_json,
+        }
+        for team_json in football_api.get_teams(league_api_id, season)
+    }
+    session.execute(delete(CatalogTeam).where(
+        CatalogTeam.season == season, CatalogTeam.league_api_id == league_api_id,
+    ))
+    if teams:
+        session.execute(insert(CatalogTeam), list(teams.values()))
+    session.commit()
+    return len(teams)
+
+
+def loaded_leagues(session: Session, season: int) -> set[int]:
+    """Получить лиги, команды которых уже есть в каталоге.
+
+    Args:
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        set[int]: api id лиг
+    """
+    return set(session.scalars(
+        select(CatalogTeam.league_api_id).where(CatalogTeam.season == season).distinct(),
+    ))
+
+
+def refresh(
+    session: Session, countries: tuple[str, ...] = (), season: int = config.SEASON,
+    max_calls: int = config.CATALOG_MAX_CALLS,
+) -> tuple[int, int, int]:
+    """Обновить каталог сезона: все лиги и команды выбранных лиг.
+
+    Каждая лига обновляется в своей транзакции, поэтому ошибка внешнего апи
+    посередине не откатывает уже загруженные лиги. Команды загружаются не больше
+    чем для max_calls лиг: сначала для лиг, которых еще нет в каталоге.
+
+    Args:
+        session (Session): сессия
+        countries (tuple[str, ...]): страны, команды лиг которых загружаются (все, если пусто)
+        season (int): сезон
+        max_calls (int): наибольшее число запросов команд к внешнему апи
+
+    Returns:
+        tuple[int, int, int]: число лиг, число команд и число лиг, отложенных до следующего запуска
+    """
+    leagues = refresh_leagues(session, season)
+    loaded = loaded_leagues(session, season)
+    selected = sorted(
+        (found for found in leagues if not countries or found['country'] in countries),
+        key=lambda found: found['api_id'] in loaded,
+    )
+    teams_count = 0
+    for league in selected[:max_calls]:
+        time.sleep(config.CATALOG_CALL_INTERVAL)
+        teams_count += refresh_teams(league['api_id'], session, season)
+    return len(leagues), teams_count, max(0, len(selected) - max_calls)
+
+
+def is_filled(session: Session, season: int = config.SEASON) -> bool:
+    """Проверить, что каталог лиг сезона загружен.
+
+    Args:
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        bool: True, если в каталоге есть лиги сезона
+    """
+    return session.scalar(select(exists().where(CatalogLeague.season == season)))
+
+
+def is_league_filled(league_api_id: int, session: Session, season: int = config.SEASON) -> bool:
+    """Проверить, что команды лиги загружены в каталог.
+
+    Args:
+        league_api_id (int): api id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        bool: True, если в каталоге есть команды лиги
+    """
+    return session.scalar(select(exists().where(
+        CatalogTeam.season == season, CatalogTeam.league_api_id == league_api_id,
+    )))
+
+
+def find_league(
+    name: str, country: str, session: Session, season: int = config.SEASON,
+) -> dict | None:
+    """Найти лигу в каталоге по названию и стране без учета регистра.
+
+    Args:
+        name (str): название лиги
+        country (str): страна
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными о лиге или ничего, если лига не найдена
+    """
+    statement = select(CatalogLeague).where(
+        CatalogLeague.season == season,
+        func.lower(CatalogLeague.name) == name.strip().lower(),
+        func.lower(CatalogLeague.country) == country.strip().lower(),
+    )
+    league = session.scalar(statement.limit(1))
+    if not league:
+        return None
+    return {
+        'api_id': league.api_id, 'name': league.name,
+        'country': league.country, 'logo': league.logo,
+    }
+
+
+def find_team(
+    name: str, league_api_id: int, session: Session, season: int = config.SEASON,
+) -> dict | None:
+    """Найти команду лиги в каталоге по названию без учета регистра.
+
+    Args:
+        name (str): название команды
+        league_api_id (int): api id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: данные команды в формате внешнего апи или ничего, если команда не найдена
+    """
+    statement = select(CatalogTeam.team_json).where(
+        CatalogTeam.season == season,
+        CatalogTeam.league_api_id == league_api_id,
+        func.lower(CatalogTeam.name) == name.strip().lower(),
+    )
+    return session.scalar(statement.limit(1))
+
+
+def set_similarity_threshold(session: Session) -> None:
+    """Задать порог похожести CATALOG_SIMILARITY для оператора <% в текущей транзакции.
+
+    Args:
+        session (Session): сессия
+    """
+    session.execute(select(func.set_config(
+        'pg_trgm.word_similarity_threshold', str(config.CATALOG_SIMILARITY), IS_LOCAL,
+    )))
+
+
+def matches(column, query: str):
+    """Условие поиска: похожее слово в названии (pg_trgm) или название, содержащее строку.
+
+    Оба условия используют триграммный GiST индекс.
+
+    Args:
+        column (_type_): столбец с названием
+        query (str): строка поиска
+
+    Returns:
+        _type_: условие для where
+    """
+    escaped = query
+    for special in (LIKE_ESCAPE, '%', '_'):
+        escaped = escaped.replace(special, f'{LIKE_ESCAPE}{special}')
+    similar = literal(query).op('<%')(column)
+    return or_(similar, column.ilike(f'%{escaped}%', escape=LIKE_ESCAPE))
+
+
+def suggest_leagues(query: str, session: Session, season: int = config.SEASON) -> list[dict]:
+    """Подсказки лиг для автодополнения и исправления опечаток.
+
+    Args:
+        query (str): строка поиска
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        list[dict]: названия и страны лиг, самые похожие первыми
+    """
+    query = query.strip()
+    if not query:
+        return []
+    set_similarity_threshold(session)
+    statement = select(CatalogLeague.name, CatalogLeague.country).where(
+        CatalogLeague.season == season, matches(CatalogLeague.name, query),
+    )
+    statement = statement.order_by(literal(query).op('<<->')(CatalogLeague.name))
+    rows = session.execute(statement.limit(config.CATALOG_SUGGESTIONS))
+    return [{'name': row.name, 'country': row.country} for row in rows]
+
+
+def suggest_teams(query: str, session: Session, season: int = config.SEASON) -> list[dict]:
+    """Подсказки команд (вместе с лигой и страной) для автодополнения и исправления опечаток.
+
+    Args:
+        query (str): строка поиска
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        list[dict]: названия команд, лиг и страны, самые похожие команды первыми
+    """
+    query = query.strip()
+    if not query:
+        return []
+    set_similarity_threshold(session)
+    league_of_team = and_(
+        CatalogLeague.season == CatalogTeam.season,
+        CatalogLeague.api_id == CatalogTeam.league_api_id,
+    )
+    statement = select(
+        CatalogTeam.name, CatalogLeague.name.label('league'), CatalogLeague.country,
+    ).join(CatalogLeague, league_of_team).where(
+        CatalogTeam.season == season, matches(CatalogTeam.name, query),
+    )
+    statement = statement.order_by(literal(query).op('<<->')(CatalogTeam.name))
+    rows = session.execute(statement.limit(config.CATALOG_SUGGESTIONS))
+    return [
+        {'name': row.name, 'league': row.league, 'country': row.country} for row in rows
+    ]
+
+
+def resolve_league(
+    name: str, country: str, session: Session, season: int = config.SEASON,
+) -> dict | None:
+    """Найти лигу в каталоге, а если каталог сезона еще не загружен - во внешнем апи.
+
+    Args:
+        name (str): название лиги
+        country (str): страна
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными о лиге или ничего, если лига не найдена
+    """
+    if is_filled(session, season):
+        return find_league(name, country, session, season)
+    data_league = football_api.get_data_league(name, country, season)
+    if not data_league:
+        return None
+    return {'api_id': data_league[0], 'name': name, 'country': country, 'logo': data_league[1]}
+
+
+def resolve_team(
+    name: str, league_api_id: int, session: Session, season: int = config.SEASON,
+) -> dict | None:
+    """Найти команду в каталоге, а если команды лиги еще не загружены - во внешнем апи.
+
+    Args:
+        name (str): название команды
+        league_api_id (int): api id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: данные команды в формате внешнего апи или ничего, если команда не найдена
+    """
+    if is_league_filled(league_api_id, session, season):
+        return find_team(name, league_api_id, session, season)
+    return football_api.get_data_team(name, league_api_id, season)
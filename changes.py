@@ -0,0 +1,208 @@
+"""Модуль журнала изменений (change feed).
+
+Триггеры записывают в таблицу changes каждую вставку, изменение и удаление
+команд, игроков, лиг и стадионов. Потребители забирают изменения после своего
+курсора (GET /changes?since=<курсор>), а не выгружают таблицы целиком.
+
+Курсор - пара (txid, id). Отдаются только изменения транзакций старше
+горизонта текущего снимка (pg_snapshot_xmin): они уже завершены, поэтому
+изменение транзакции, зафиксированной позже, не окажется перед курсором
+и не будет пропущено.
+
+Сжатие (``flask --app app compact-changes``) оставляет только последнее
+изменение каждой записи и удаляет изменения старше CHANGES_RETENTION.
+Курсор старше удаленных изменений устаревает: потребитель получает 410
+и выгружает таблицы заново.
+"""
+from collections import defaultdict
+from types import MappingProxyType
+
+from sqlalchemy import BigInteger, String, cast, func, select, text, tuple_
+from sqlalchemy.orm import Session
+
+import config
+from models import Change, ChangeHorizon, League, Player, Stadium, Team
+
+ENTITIES = MappingProxyType({
+    'team': Team,
+    'player': Player,
+    'league': League,
+    'stadium': Stadium,
+})
+DELETE = 'delete'
+HORIZON_ID = 1
+CURSOR_SEPARATOR = '-'
+SNAPSHOT_XMIN = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), String), BigInteger)
+DROP_SUPERSEDED = text("""
+    DELETE FROM changes AS old USING changes AS newer
+    WHERE newer.entity = old.entity AND newer.entity_id = old.entity_id
+        AND (newer.txid, newer.id) > (old.txid, old.id)
+        AND newer.txid < CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint)
+""")
+DROP_EXPIRED = text("""
+    WITH expired AS (
+        DELETE FROM changes
+        WHERE changed_at < now() - CAST(:retention AS interval)
+            AND txid < CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint)
+        RETURNING txid, id
+    ),
+    last_expired AS (
+        SELECT txid, id FROM expired ORDER BY txid DESC, id DESC LIMIT 1
+    ),
+    horizon AS (
+        UPDATE change_horizon
+        SET txid = last_expired.txid, change_id = last_expired.id
+        FROM last_expired
+        WHERE change_horizon.id = :horizon_id
+            AND (change_horizon.txid, change_horizon.change_id)
+                < (last_expired.txid, last_expired.id)
+        RETURNING change_horizon.id
+    )
+    SELECT count(*) FROM expired
+""")
+
+
+class StaleCursor(Exception):
+    """Исключение: изменения после курсора уже удалены из журнала."""
+
+
+def format_cursor(txid: int, change_id: int) -> str:
+    """Собрать курсор из id транзакции и номера изменения.
+
+    Args:
+        txid (int): id транзакции
+        change_id (int): номер изменения
+
+    Returns:
+        str: курсор
+    """
+    return f'{txid}{CURSOR_SEPARATOR}{change_id}'
+
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    """Разобрать курсор.
+
+    Args:
+        cursor (str): курсор
+
+    Returns:
+        tuple[int, int]: id транзакции и номер изменения
+
+    Raises:
+        ValueError: курсор в неверном формате
+    """
+    txid, separator, change_id = cursor.partition(CURSOR_SEPARATOR)
+    if not separator:
+        raise ValueError(cursor)
+    return int(txid), int(change_id)
+
+
+def current_cursor(session: Session) -> str:
+    """Курсор текущего момента: после него будут все еще не отданные изменения.
+
+    Args:
+        session (Session): сессия
+
+    Returns:
+        str: курсор
+    """
+    return format_cursor(session.scalar(select(SNAPSHOT_XMIN)), 0)
+
+
+def get_records(entity_ids: dict[str, set], session: Session) -> dict:
+    """Получить текущие данные измененных записей.
+
+    Args:
+        entity_ids (dict[str, set]): id записей по сущностям
+        session (Session): сессия
+
+    Returns:
+        dict: данные записей по id (удаленных записей нет)
+    """
+    records = {}
+    for entity, obj_ids in entity_ids.items():
+        model_class = ENTITIES[entity]
+        statement = select(model_class.__table__).where(model_class.id.in_(obj_ids))
+        for row in session.execute(statement).mappings():
+            records[row['id']] = dict(row)
+    return records
+
+
+def serialize(rows: list[Change], session: Session) -> list[dict]:
+    """Подготовить изменения к выдаче вместе с текущими данными записей.
+
+    Args:
+        rows (list[Change]): изменения
+        session (Session): сессия
+
+    Returns:
+        list[dict]: изменения; у вставок и изменений есть данные записи
+    """
+    entity_ids = defaultdict(set)
+    for upserted in rows:
+        if upserted.operation != DELETE:
+            entity_ids[upserted.entity].add(upserted.entity_id)
+    records = get_records(entity_ids, session)
+    return [
+        {
+            'entity': change.entity,
+            'id': str(change.entity_id),
+            'operation': change.operation,
+            'data': None if change.operation == DELETE else records.get(change.entity_id),
+        }
+        for change in rows
+    ]
+
+
+def get_changes(since: str | None, session: Session, limit: int = config.CHANGES_PAGE) -> dict:
+    """Получить изменения после курсора.
+
+    Без курсора возвращает только курсор текущего момента: потребитель
+    запоминает его, выгружает таблицы целиком и дальше забирает изменения.
+    Вставка и изменение содержат текущие данные записи (None, если запись
+    уже удалена - ее удаление придет следующим).
+
+    Args:
+        since (str | None): курсор
+        session (Session): сессия
+        limit (int): наибольшее число изменений (не больше config.CHANGES_PAGE)
+
+    Returns:
+        dict: изменения, курсор для следующего запроса и есть ли еще изменения
+
+    Raises:
+        StaleCursor: изменения после курсора удалены по сроку хранения
+    """
+    if since is None:
+        return {'changes': [], 'cursor': current_cursor(session), 'has_more': False}
+    position = parse_cursor(since)
+    limit = max(1, min(limit, config.CHANGES_PAGE))
+    statement = select(Change).where(
+        tuple_(Change.txid, Change.id) > position, Change.txid < SNAPSHOT_XMIN,
+    ).order_by(Change.txid, Change.id)
+    rows = session.scalars(statement.limit(limit + 1)).all()
+    horizon = session.get(ChangeHorizon, HORIZON_ID)
+    if position < (horizon.txid, horizon.change_id):
+        raise StaleCursor(since)
+    page = rows[:limit]
+    return {
+        'changes': serialize(page, session),
+        'cursor': format_cursor(page[-1].txid, page[-1].id) if page else since,
+        'has_more': len(rows) > limit,
+    }
+
+
+def compact(session: Session, retention: str = config.CHANGES_RETENTION) -> tuple[int, int]:
+    """Сжать журнал: удалить изменения, замененные более поздними, и изменения старше срока.
+
+    Args:
+        session (Session): сессия
+        retention (str): срок хранения (интервал Postgres, например '7 days')
+
+    Returns:
+        tuple[int, int]: число удаленных замененных и устаревших изменений
+    """
+    superseded = session.execute(DROP_SUPERSEDED).rowcount
+    expired = session.scalar(DROP_EXPIRED, {'retention': retention, 'horizon_id': HORIZON_ID})
+    session.commit()
+    return superseded, expired
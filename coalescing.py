@@ -0,0 +1,175 @@
+"""Модуль группировки одиночных вставок (group commit).
+
+Одновременные запросы на создание записи одной модели в воркере собираются
+в течение config.COALESCE_WINDOW секунд (или пока не наберется
+config.COALESCE_MAX_BATCH записей) и вставляются одной транзакцией
+с одним многострочным INSERT и одним fsync. Первый запрос группы (лидер)
+выполняет вставку в своей сессии со сроком самого долгого запроса группы,
+остальные ждут результат не дольше своего срока. Каждый запрос получает
+свой id или ничего, если его запись нарушает ограничение.
+
+Группировка рассчитана на потоки воркера gthread: в асинхронном режиме
+ожидание заблокировало бы цикл событий, поэтому там записи вставляются по одной.
+"""
+import threading
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+import config
+import deadlines
+
+
+class Pending:
+    """Запись, ожидающая вставки в составе группы."""
+
+    def __init__(self, record) -> None:
+        """Инициализация ожидающей записи.
+
+        Args:
+            record (_type_): объект модели
+        """
+        self.record = record
+        self.deadline = deadlines.current.get()
+        self.done = threading.Event()
+        self.obj_id: UUID | None = None
+        self.error: Exception | None = None
+
+
+class Batch:
+    """Группа записей, собираемая лидером."""
+
+    def __init__(self) -> None:
+        """Инициализация пустой группы."""
+        self.pending: list[Pending] = []
+        self.full = threading.Event()
+
+    def deadline(self) -> deadlines.Deadline | None:
+        """Самый поздний срок запросов группы: вставка не должна прерываться раньше него.
+
+        Returns:
+            deadlines.Deadline | None: срок или ничего, если у какого-то запроса нет срока
+        """
+        if any(pending.deadline is None for pending in self.pending):
+            return None
+        return max(
+            (pending.deadline for pending in self.pending),
+            key=lambda deadline: deadline.expires_at,
+        )
+
+
+class Coalescer:
+    """Группировка одиночных вставок одной модели в потоках воркера."""
+
+    def __init__(self, insert: Callable, window: float, max_batch: int) -> None:
+        """Инициализация группировки.
+
+        Args:
+            insert (Callable): вставка группы объектов, возвращает id или ничего для каждого
+            window (float): сколько секунд лидер собирает группу
+            max_batch (int): наибольший размер группы
+        """
+        self.insert = insert
+        self.window = window
+        self.max_batch = max_batch
+        self._batch = Batch()
+        self._lock = threading.Lock()
+
+    def submit(self, record, session: Session) -> UUID | None:
+        """Вставить объект в составе группы.
+
+        Заполненная группа закрывается, и следующий запрос становится лидером
+        новой группы. Остальные запросы ждут результат не дольше своего срока.
+
+        Args:
+            record (_type_): объект модели
+            session (Session): сессия (используется, если запрос стал лидером группы)
+
+        Returns:
+            UUID | None: id или ничего, если запись нарушает ограничение
+
+        Raises:
+            error: ошибка вставки всей группы (например, недоступна база данных)
+        """
+        pending = Pending(record)
+        with self._lock:
+            batch = self._batch
+            batch.pending.append(pending)
+            is_leader = len(batch.pending) == 1
+            if len(batch.pending) >= self.max_batch:
+                self._batch = Batch()
+                batch.full.set()
+        if is_leader:
+            batch.full.wait(self.window)
+            self._flush(batch, session)
+        else:
+            self._wait(batch, pending)
+        if pending.error:
+            raise pending.error
+        return pending.obj_id
+
+    def _wait(self, batch: Batch, pending: Pending) -> None:
+        """Дождаться вставки записи лидером группы.
+
+        Если срок истек, пока группа еще собирается, запись выходит из группы.
+        Если лидер уже забрал группу, запись будет вставлена, поэтому запрос ждет
+        результат вставки: ее ограничивает срок группы, не меньший срока запроса.
+
+        Args:
+            batch (Batch): группа записи
+            pending (Pending): ожидающая запись
+
+        Raises:
+            DeadlineExceeded: срок истек раньше, чем лидер забрал группу
+        """
+        remaining = None if pending.deadline is None else max(pending.deadline.remaining(), 0)
+        if pending.done.wait(remaining):
+            return
+        with self._lock:
+            withdrawn = self._batch is batch
+            if withdrawn:
+                batch.pending.remove(pending)
+        if withdrawn:
+            raise deadlines.DeadlineExceeded(deadlines.DB)
+        pending.done.wait()
+
+    def _flush(self, batch: Batch, session: Session) -> None:
+        """Закрыть группу и вставить ее, разбудив ожидающие запросы.
+
+        Вставка выполняется в новой транзакции сессии лидера со сроком самого
+        долгого запроса группы, чтобы короткий срок лидера не прервал вставку
+        записей остальных запросов.
+
+        Args:
+            batch (Batch): группа лидера
+            session (Session): сессия лидера группы
+        """
+        with self._lock:
+            if self._batch is batch:
+                self._batch = Batch()
+        records = [pending.record for pending in batch.pending]
+        session.commit()
+        token = deadlines.current.set(batch.deadline())
+        try:
+            for inserted, obj_id in zip(batch.pending, self.insert(records, session)):
+                inserted.obj_id = obj_id
+        except Exception as error:
+            for failed in batch.pending:
+                failed.error = error
+        finally:
+            deadlines.current.reset(token)
+            for finished in batch.pending:
+                finished.done.set()
+
+
+def create_coalescer(insert: Callable) -> Coalescer:
+    """Создать группировку вставок с настройками из config.
+
+    Args:
+        insert (Callable): вставка группы объектов
+
+    Returns:
+        Coalescer: группировка вставок
+    """
+    return Coalescer(insert, config.COALESCE_WINDOW, config.COALESCE_MAX_BATCH)
@@ -0,0 +1,297 @@
+"""Модуль сжатия ответов: gzip, а при установленных brotli и zstandard - br и zstd.
+
+Кодировка выбирается по Accept-Encoding клиента (при равном q - в порядке
+zstd, br, gzip). Ответ получает слабый ETag - хэш несжатого тела, общий для
+всех кодировок, - и на If-None-Match с тем же ETag сервер отвечает 304 без тела.
+
+Сжатые байты больших ответов кэшируются в памяти воркера по ETag и кодировке,
+поэтому повторный запрос тех же данных не сжимается заново. Ответ больше
+COMPRESS_STREAM_SIZE при первом сжатии отдается потоком: клиент получает
+первые сжатые байты, пока сжимается остальное тело.
+"""
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from importlib import import_module
+from importlib.util import find_spec
+from types import MappingProxyType
+from typing import Iterator
+
+from werkzeug.datastructures import Accept, ETags
+
+import config
+
+GZIP_WBITS = 31
+ETAG_BYTES = 16
+
+
+def import_optional(name: str):
+    """Импортировать необязательный модуль.
+
+    Args:
+        name (str): название модуля
+
+    Returns:
+        _type_: модуль или ничего, если он не установлен
+    """
+    return import_module(name) if find_spec(name) else None
+
+
+brotli = import_optional('brotli')
+zstandard = import_optional('zstandard')
+
+
+class BrotliCompressor:
+    """Потоковый компрессор brotli с интерфейсом zlib (compress и flush)."""
+
+    def __init__(self) -> None:
+        """Инициализация компрессора."""
+        self._compressor = brotli.Compressor(quality=config.COMPRESS_LEVELS['br'])
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Сжать часть тела.
+
+        Args:
+            chunk (bytes): часть тела
+
+        Returns:
+            bytes: сжатые байты (могут быть пустыми, пока компрессор копит данные)
+        """
+        return self._compressor.process(chunk)
+
+    def flush(self) -> bytes:
+        """Завершить поток.
+
+        Returns:
+            bytes: оставшиеся сжатые байты
+        """
+        return self._compressor.finish()
+
+
+def create_gzip():
+    """Создать потоковый компрессор gzip.
+
+    Returns:
+        _type_: компрессор zlib с заголовком gzip
+    """
+    return zlib.compressobj(config.COMPRESS_LEVELS['gzip'], zlib.DEFLATED, GZIP_WBITS)
+
+
+def create_zstd():
+    """Создать потоковый компрессор zstd.
+
+    Returns:
+        _type_: компрессор zstandard
+    """
+    return zstandard.ZstdCompressor(level=config.COMPRESS_LEVELS['zstd']).compressobj()
+
+
+# кодировка, модуль и фабрика компрессора; порядок - предпочтение сервера при равном q
+ENCODERS = (
+    ('zstd', zstandard, create_zstd),
+    ('br', brotli, BrotliCompressor),
+    ('gzip', zlib, create_gzip),
+)
+COMPRESSORS = MappingProxyType({
+    encoding: factory for encoding, module, factory in ENCODERS if module
+})
+
+
+class CompressedCache:
+    """Сжатые байты ответов (LRU с ограничением по размеру)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        """Инициализация кэша.
+
+        Args:
+            max_bytes (int): наибольший суммарный размер сжатых ответов
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> bytes | None:
+        """Получить сжатый ответ.
+
+        Args:
+            key (tuple[str, str]): ETag и кодировка
+
+        Returns:
+            bytes | None: сжатые байты или ничего, если ответа нет в кэше
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: tuple[str, str], payload: bytes) -> None:
+        """Запомнить сжатый ответ, вытеснив самые давние.
+
+        Args:
+            key (tuple[str, str]): ETag и кодировка
+            payload (bytes): сжатые байты
+        """
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            replaced = self._entries.pop(key, b'')
+            self._entries[key] = payload
+            self.size += len(payload) - len(replaced)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+compressed = CompressedCache(config.COMPRESS_CACHE_MAX_BYTES)
+
+
+def negotiate(accept: Accept) -> str | None:
+    """Выбрать кодировку по заголовку Accept-Encoding.
+
+    Args:
+        accept (Accept): кодировки, которые принимает клиент
+
+    Returns:
+        str | None: кодировка или ничего, если клиент не принимает ни одну из доступных
+    """
+    accepted = [encoding for encoding in COMPRESSORS if accept.quality(encoding)]
+    return max(accepted, key=accept.quality, default=None)
+
+
+def is_compressible(response, endpoint: str | None) -> bool:
+    """Сжимать ли ответ: успешный, текстовый, еще не сжатый и не из config.COMPRESS_EXEMPT.
+
+    Страницы, где рядом с секретом (CSRF токеном) выводятся данные запроса,
+    не сжимаются: по размеру сжатого ответа можно подобрать секрет (BREACH).
+
+    Args:
+        response (_type_): ответ Flask или Quart
+        endpoint (str | None): название обработчика (с префиксом blueprint или без)
+
+    Returns:
+        bool: True, если ответ можно сжать
+    """
+    view = (endpoint or '').rsplit('.', 1)[-1]
+    return (
+        view not in config.COMPRESS_EXEMPT
+        and response.status_code == config.OK
+        and response.mimetype in config.COMPRESS_TYPES
+        and 'Content-Encoding' not in response.headers
+    )
+
+
+def etag_of(body: bytes) -> str:
+    """Посчитать ETag тела ответа.
+
+    Args:
+        body (bytes): несжатое тело ответа
+
+    Returns:
+        str: хэш тела
+    """
+    return hashlib.blake2b(body, digest_size=ETAG_BYTES).hexdigest()
+
+
+def not_modified(response, body: bytes, if_none_match: ETags) -> bool:
+    """Поставить ответу слабый ETag и ответить 304, если у клиента то же тело.
+
+    Args:
+        response (_type_): ответ Flask или Quart
+        body (bytes): несжатое тело ответа
+        if_none_match (ETags): ETag из заголовка If-None-Match
+
+    Returns:
+        bool: True, если ответ заменен на 304 без тела
+    """
+    etag = etag_of(body)
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    if not if_none_match.contains_weak(etag):
+        return False
+    response.status_code = config.NOT_MODIFIED
+    response.set_data(b'')
+    response.headers.pop('Content-Length', None)
+    return True
+
+
+def compress_chunks(body: bytes, encoding: str) -> Iterator[bytes]:
+    """Сжать тело частями по COMPRESS_CHUNK байт.
+
+    Args:
+        body (bytes): несжатое тело
+        encoding (str): кодировка
+
+    Yields:
+        Iterator[bytes]: сжатые части
+    """
+    compressor = COMPRESSORS[encoding]()
+    view = memoryview(body)
+    for start in range(0, len(body), config.COMPRESS_CHUNK):
+        chunk = compressor.compress(view[start:start + config.COMPRESS_CHUNK])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def stream(body: bytes, encoding: str, key: tuple[str, str]) -> Iterator[bytes]:
+    """Отдавать сжатые части по мере сжатия и сохранить ответ в кэш в конце.
+
+    Если клиент отключился раньше, ответ в кэш не попадает.
+
+    Args:
+        body (bytes): несжатое тело
+        encoding (str): кодировка
+        key (tuple[str, str]): ETag и кодировка
+
+    Yields:
+        Iterator[bytes]: сжатые части
+    """
+    chunks = []
+    for chunk in compress_chunks(body, encoding):
+        chunks.append(chunk)
+        yield chunk
+    compressed.put(key, b''.join(chunks))
+
+
+def encode(body: bytes, encoding: str, etag: str, streaming: bool) -> bytes | Iterator[bytes]:
+    """Сжать тело ответа или взять сжатые байты из кэша.
+
+    Args:
+        body (bytes): несжатое тело
+        encoding (str): кодировка
+        etag (str): ETag ответа
+        streaming (bool): можно ли отдать большой ответ потоком
+
+    Returns:
+        bytes | Iterator[bytes]: сжатое тело или поток сжатых частей
+    """
+    if len(body) < config.COMPRESS_CACHE_MIN_SIZE:
+        return b''.join(compress_chunks(body, encoding))
+    key = (etag, encoding)
+    payload = compressed.get(key)
+    if payload is not None:
+        return payload
+    if streaming and len(body) >= config.COMPRESS_STREAM_SIZE:
+        return stream(body, encoding, key)
+    payload = b''.join(compress_chunks(body, encoding))
+    compressed.put(key, payload)
+    return payload
+
+
+def set_payload(response, payload: bytes | Iterator[bytes], encoding: str) -> None:
+    """Заменить тело ответа сжатым.
+
+    Args:
+        response (_type_): ответ Flask или Quart
+        payload (bytes | Iterator[bytes]): сжатое тело или поток сжатых частей (только Flask)
+        encoding (str): кодировка
+    """
+    response.headers['Content-Encoding'] = encoding
+    if isinstance(payload, bytes):
+        response.set_data(payload)
+        return
+    response.response = payload
+    response.headers.pop('Content-Length', None)
@@ -1,14 +1,136 @@
 """Config."""
+from os import environ
+from types import MappingProxyType
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
 OK = 200
 CREATED = 201
 NO_CONTENT = 204
+NOT_MODIFIED = 304
 BAD_REQUEST = 400
+UNAUTHORIZED = 401
 FORBIDDEN = 403
 SERVER_ERROR = 500
 NOT_FOUND = 404
 NOT_ALLOWED = 405
 ACCEPTED = 202
+GONE = 410
+SERVICE_UNAVAILABLE = 503
+GATEWAY_TIMEOUT = 504
 
-FOOTBALL_URL = 'https://v3.football.api-sports.io'
+PG_USER = environ.get('PG_USER')
+PG_PASSWORD = environ.get('PG_PASSWORD')
+PG_HOST = environ.get('PG_HOST')
+PG_PORT = environ.get('PG_PORT')
+PG_DBNAME = environ.get('PG_DBNAME')
+
+FOOTBALL_URL = environ.get('FOOTBALL_URL', 'https://v3.football.api-sports.io')
 FOOTBALL_HEADER = 'x-rapidapi-key'
-SEASON = 2023
+FOOTBALL_TIMEOUT = 10
+# предохранитель внешнего api (breaker.py): сбоев подряд, секунд до пробы, одновременных проб
+FOOTBALL_BREAKER_FAILURES = int(environ.get('FOOTBALL_BREAKER_FAILURES', '5'))
+FOOTBALL_BREAKER_RESET = float(environ.get('FOOTBALL_BREAKER_RESET', '30'))
+FOOTBALL_BREAKER_PROBES = 1
+FOOTBALL_STALE_ENTRIES = 256
+SEASON = int(environ.get('SEASON', '2023'))
+SEASON_LOCK_TIMEOUT = '2s'
+CATALOG_SUGGESTIONS = 10
+CATALOG_SIMILARITY = 0.4
+# загрузка каталога: запросов команд за запуск и пауза между запросами (лимиты тарифа апи)
+CATALOG_MAX_CALLS = int(environ.get('CATALOG_MAX_CALLS', '20'))
+CATALOG_CALL_INTERVAL = float(environ.get('CATALOG_CALL_INTERVAL', '6'))
+
+# бюджет: (одновременных запросов, мест в очереди, секунд ожидания в очереди)
+ADMISSION_BUDGETS = MappingProxyType({
+    'read': (
+        int(environ.get('ADMISSION_READ_LIMIT', '8')),
+        int(environ.get('ADMISSION_READ_QUEUE', '16')),
+        2,
+    ),
+    'write': (
+        int(environ.get('ADMISSION_WRITE_LIMIT', '4')),
+        int(environ.get('ADMISSION_WRITE_QUEUE', '8')),
+        5,
+    ),
+    'ingest': (
+        int(environ.get('ADMISSION_INGEST_LIMIT', '2')),
+        int(environ.get('ADMISSION_INGEST_QUEUE', '2')),
+        10,
+    ),
+    'image': (
+        int(environ.get('ADMISSION_IMAGE_LIMIT', '4')),
+        int(environ.get('ADMISSION_IMAGE_QUEUE', '8')),
+        5,
+    ),
+})
+ADMISSION_INGEST = frozenset(('add_team',))
+# маршруты со своим бюджетом: обработчик -> бюджет (прокси изображений не занимает места чтения)
+ADMISSION_ROUTES = MappingProxyType({'image': 'image'})
+# служебные страницы /admin (admin.py) подключаются, только если задан токен
+ADMIN_TOKEN = environ.get('ADMIN_TOKEN')
+ADMISSION_EXEMPT = frozenset((
+    'admission_counters', 'football_counters', 'deadline_counters', 'profile_summary',
+    'profile_stacks', 'static',
+))
+ADMISSION_SPARE_THREADS = 2
+
+# крайний срок запроса в секундах по бюджетам допуска и отдельным маршрутам (deadlines.py),
+# 0 - без срока; срок включает ожидание в очереди допуска
+DEADLINES = MappingProxyType({
+    'read': float(environ.get('DEADLINE_READ', '5')),
+    'write': float(environ.get('DEADLINE_WRITE', '10')),
+    'ingest': float(environ.get('DEADLINE_INGEST', '30')),
+    'image': float(environ.get('DEADLINE_IMAGE', '15')),
+})
+DEADLINE_ROUTES = MappingProxyType({'bulk_delete_model': 30.0})
+
+# группировка одновременных вставок в одну транзакцию (coalescing.py)
+WRITE_COALESCE = environ.get('WRITE_COALESCE', '0') == '1'
+COALESCE_WINDOW = float(environ.get('COALESCE_WINDOW', '0.002'))
+COALESCE_MAX_BATCH = int(environ.get('COALESCE_MAX_BATCH', '64'))
+
+CHANGES_PAGE = 1000
+CHANGES_RETENTION = environ.get('CHANGES_RETENTION', '7 days')
+
+# выборочное профилирование запросов (profiling.py), 0 - выключено
+PROFILE_EVERY = int(environ.get('PROFILE_EVERY', '0'))
+PROFILE_STACK_INTERVAL = float(environ.get('PROFILE_STACK_INTERVAL', '0'))
+PROFILE_DIR = environ.get('PROFILE_DIR')
+PROFILE_FRAMES = 1
+PROFILE_TOP = 10
+
+# сжатие ответов (compression.py): уровни кодировок, пороги размера тела и кэш сжатых байтов
+COMPRESS = environ.get('COMPRESS', '1') == '1'
+COMPRESS_LEVELS = MappingProxyType({'zstd': 3, 'br': 5, 'gzip': 6})
+COMPRESS_TYPES = frozenset(('application/json', 'text/html', 'text/plain'))
+# страницы с секретом (CSRF токен) и введенными пользователем данными не сжимаются (BREACH)
+COMPRESS_EXEMPT = frozenset(('add_team',))
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_CACHE_MIN_SIZE = 16384
+COMPRESS_STREAM_SIZE = 262144
+COMPRESS_CHUNK = 65536
+COMPRESS_CACHE_MAX_BYTES = int(environ.get('COMPRESS_CACHE_MAX_BYTES', '67108864'))
+
+CACHE_CHANNEL = 'reference_changed'
+CACHE_LISTEN_TIMEOUT = 5
+CACHE_RECONNECT_DELAY = 1
+
+IMAGE_PROXY_HOSTS = frozenset(
+    environ.get('IMAGE_PROXY_HOSTS', 'media.api-sports.io,cdn.enjore.com,i.postimg.cc').split(','),
+)
+IMAGE_CACHE_DIR = environ.get('IMAGE_CACHE_DIR', 'image_cache')
+IMAGE_CACHE_MAX_BYTES = int(environ.get('IMAGE_CACHE_MAX_BYTES', '209715200'))
+IMAGE_CACHE_EVICT_TO = 0.9
+IMAGE_CACHE_RESCAN_FILES = 256
+IMAGE_MAX_DOWNLOAD = 5 * 1024 * 1024
+IMAGE_TIMEOUT = 10
+IMAGE_MAX_REDIRECTS = 3
+IMAGE_QUALITY = 85
+IMAGE_MAX_AGE = 31536000
+IMAGE_PREFETCH_WORKERS = 4
+THUMBNAIL_SIZE = 128
+THUMBNAIL_SIZE_LARGE = 300
+THUMBNAIL_SIZES = frozenset((THUMBNAIL_SIZE, THUMBNAIL_SIZE_LARGE))
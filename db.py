@@ -1,15 +1,22 @@
 """Модуль для работы с базой данных."""
 
-import os
+import functools
 from typing import Callable
 from uuid import UUID
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, select
+from sqlalchemy import Engine, create_engine, delete, literal, select, text
 from sqlalchemy.exc import DataError, IntegrityError, ProgrammingError
 from sqlalchemy.orm import Session, exc
 
-from football_api import get_data_league, get_data_team, get_team_roster
+import cache
+import catalog
+import coalescing
+import config
+import documents
+import images
+import seasons
+import stats
+from football_api import get_team_roster
 from models import League, Player, Stadium, Team
 
 
@@ -19,36 +26,102 @@ def get_db_url() -> str:
     Returns:
         str: данные для подключения к базе данных
     """
-    load_dotenv()
-    pg_vars = 'PG_USER', 'PG_PASSWORD', 'PG_HOST', 'PG_PORT', 'PG_DBNAME'
-    credentials = [os.environ.get(pg_var) for pg_var in pg_vars]
-    return 'postgresql+psycopg2://{0}:{1}@{2}:{3}/{4}'.format(*credentials)
+    return 'postgresql+psycopg2://{0}:{1}@{2}:{3}/{4}'.format(
+        config.PG_USER, config.PG_PASSWORD, config.PG_HOST, config.PG_PORT, config.PG_DBNAME,
+    )
+
+
+@functools.cache
+def get_engine() -> Engine:
+    """Получить движок базы данных, создав его при первом обращении.
+
+    Returns:
+        Engine: движок базы данных
+    """
+    return create_engine(get_db_url(), echo=False)
+
+
+def get_session() -> Session:
+    """Открыть сессию базы данных.
+
+    Returns:
+        Session: сессия
+    """
+    return Session(get_engine())
+
+
+def dispose_engine() -> None:
+    """Забыть соединения пула, унаследованные от родительского процесса.
 
+    Вызывается в воркере после fork (gunicorn --preload): соединения родителя
+    не закрываются, чтобы не оборвать их у других процессов, а новые
+    соединения воркер открывает сам.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
 
-engine = create_engine(get_db_url(), echo=False)
 
+def find_league(name: str, country: str, session: Session) -> dict | None:
+    """Найти лигу по названию и стране.
 
-def add_league_api(name: str, country: str, session: Session) -> League | None:
-    """Добавить лигу с использованием внешнего апи.
+    Args:
+        name (str): название лиги
+        country (str): страна
+        session (Session): сессия
+
+    Returns:
+        dict | None: словарь с данными о лиге или ничего, если лига не найдена
+    """
+    return cache.leagues.find((name, country), session)
+
+
+def save_league(name: str, country: str, data_league: tuple, session: Session) -> dict:
+    """Сохранить лигу, полученную из внешнего апи.
 
     Args:
         name (str): название лиги
         country (str): страна
+        data_league (tuple): api id и логотип лиги
         session (Session): сессия
 
     Returns:
-        League | None: объект класса Лига или ничего, если не получилось добавить.
+        dict: словарь с данными о лиге
     """
-    league = session.scalar(select(League).where(League.name == name, League.country == country))
+    league = League(name=name, country=country, logo=data_league[1], api_id=data_league[0])
+    session.add(league)
+    session.flush()
+    stats.refresh_for(League, [league.id], session)
+    session.commit()
+    league = cache.leagues.get(league.id, session)
+    images.prefetch([league['logo']])
+    return league
+
+
+def add_league_api(
+    name: str, country: str, session: Session, season: int = config.SEASON,
+) -> dict | None:
+    """Добавить лигу, найденную в каталоге (или во внешнем апи, если каталог не загружен).
+
+    Args:
+        name (str): название лиги
+        country (str): страна
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными о лиге или ничего, если не получилось добавить.
+    """
+    league = find_league(name, country, session)
     if league:
         return league
-    data_league = get_data_league(name, country)
-    if data_league:
-        league = League(name=name, country=country, logo=data_league[1], api_id=data_league[0])
-        session.add(league)
-        session.commit()
+    found = catalog.resolve_league(name, country, session, season)
+    if not found:
+        return None
+    league = find_league(found['name'], found['country'], session)
+    if league:
         return league
-    return None
+    data_league = found['api_id'], found['logo']
+    return save_league(found['name'], found['country'], data_league, session)
 
 
 def add_stadium_api(venue: dict, session: Session) -> UUID:
@@ -61,11 +134,9 @@ def add_stadium_api(venue: dict, session: Session) -> UUID:
     Returns:
         UUID: id стадиона
     """
-    stadium = session.scalar(select(Stadium).where(
-        Stadium.name == venue['name'], Stadium.address == venue['address'],
-    ))
+    stadium = cache.stadiums.find((venue['name'], venue['address']), session)
     if stadium:
-        return stadium.id
+        return stadium['id']
     stadium = Stadium(
         name=venue['name'],
         address=venue['address'],
@@ -79,69 +150,232 @@ def add_stadium_api(venue: dict, session: Session) -> UUID:
     return stadium.id
 
 
-def add_players_api(team_id: Team, api_id: int, session: Session):
+def save_players(
+    team_id: UUID, roster: list[dict], session: Session, season: int = config.SEASON,
+):
+    """Сохранить игроков команды.
+
+    Args:
+        team_id (UUID): id команды
+        roster (list[dict]): список словарей с данными об игроках
+        session (Session): сессия
+        season (int): сезон команды
+    """
+    players = [Player(**player, team_id=team_id, season=season) for player in roster]
+    session.add_all(players)
+    session.flush()
+    stats.refresh_for(Team, [team_id], session)
+    session.commit()
+    images.prefetch(
+        [player['photo'] for player in roster if player.get('photo')], images.ALL_SIZES,
+    )
+
+
+def add_players_api(team_id: UUID, api_id: int, session: Session, season: int = config.SEASON):
     """Добавить игроков с использованием внешнего апи.
 
     Args:
-        team_id (Team): id команды
+        team_id (UUID): id команды
         api_id (int): api id команды
         session (Session): сессия
+        season (int): сезон команды
     """
-    roster = get_team_roster(api_id)
-    players = [Player(**player, team_id=team_id) for player in roster]
-    session.add_all(players)
+    save_players(team_id, get_team_roster(api_id, season), session, season)
+
+
+def find_team(
+    name: str, league_id: UUID, session: Session, season: int = config.SEASON,
+) -> UUID | None:
+    """Найти команду лиги в сезоне по названию.
+
+    Args:
+        name (str): название команды
+        league_id (UUID): id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        UUID | None: id команды или ничего, если команда не найдена
+    """
+    return session.scalar(select(Team.id).where(
+        Team.name == name, Team.league_id == league_id, Team.season == season,
+    ))
+
+
+def save_team(
+    team_json: dict, league_id: UUID, session: Session, season: int = config.SEASON,
+) -> UUID:
+    """Сохранить команду и ее стадион, полученные из внешнего апи.
+
+    Args:
+        team_json (dict): словарь с данными о команде
+        league_id (UUID): id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        UUID: id команды
+    """
+    stadium_id = add_stadium_api(team_json['venue'], session)
+    team = Team(
+        name=team_json['team']['name'], founded=team_json['team']['founded'], season=season,
+        logo=team_json['team']['logo'], league_id=league_id, stadium_id=stadium_id,
+    )
+    session.add(team)
+    session.flush()
+    stats.refresh_for(Team, [team.id], session)
     session.commit()
+    images.prefetch([team_json['team']['logo']])
+    images.prefetch([team_json['venue']['image']], images.LARGE_SIZES)
+    return team.id
 
 
-def add_team_api(name: str, league: str, country: str, session: Session) -> UUID | None:
-    """Добавить команду с использованием внешнего апи.
+def add_found_team(
+    team_json: dict, league_id: UUID, session: Session, season: int = config.SEASON,
+) -> UUID:
+    """Добавить найденную команду с составом, если ее еще нет в базе.
+
+    Args:
+        team_json (dict): данные команды в формате внешнего апи
+        league_id (UUID): id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        UUID: id команды
+    """
+    team_id = find_team(team_json['team']['name'], league_id, session, season)
+    if team_id:
+        return team_id
+    seasons.add_season(season, session)
+    team_id = save_team(team_json, league_id, session, season)
+    add_players_api(team_id, team_json['team']['id'], session, season)
+    return team_id
+
+
+def add_team_api(
+    name: str, league: str, country: str, session: Session, season: int = config.SEASON,
+) -> UUID | None:
+    """Добавить команду: лига и команда ищутся в каталоге, из внешнего апи берется только состав.
 
     Args:
         name (str): название команды
         league (str): название лиги
         country (str): страна
         session (Session): сессия
+        season (int): сезон
 
     Returns:
         UUID | None: id команды или ничего, если не получилось добавить
     """
-    league = add_league_api(league, country, session)
+    league = add_league_api(league, country, session, season)
     if not league:
         return None
-    team = session.scalar(select(Team).where(Team.name == name, Team.league == league))
-    if team:
-        return team.id
-    team_json = get_data_team(name, league.api_id)
+    team_id = find_team(name, league['id'], session, season)
+    if team_id:
+        return team_id
+    team_json = catalog.resolve_team(name, league['api_id'], session, season)
     if team_json:
-        stadium_id = add_stadium_api(team_json['venue'], session)
-        team = Team(
-            name=team_json['team']['name'], founded=team_json['team']['founded'],
-            logo=team_json['team']['logo'], league_id=league.id, stadium_id=stadium_id,
-        )
-        session.add(team)
-        session.commit()
-        add_players_api(team.id, team_json['team']['id'], session)
-        return team.id
+        return add_found_team(team_json, league['id'], session, season)
     return None
 
 
-def delete_empty_relations(model_id: str, model_class, session: Session):
-    """Удалить пустые связи.
+DELETE_TEAMS = text("""
+    WITH deleted_teams AS (
+        DELETE FROM teams WHERE id = ANY(CAST(:team_ids AS uuid[]))
+        RETURNING id, stadium_id, league_id
+    ),
+    orphan_stadiums AS (
+        DELETE FROM stadiums
+        WHERE id IN (SELECT stadium_id FROM deleted_teams) AND NOT EXISTS (
+            SELECT 1 FROM teams
+            WHERE teams.stadium_id = stadiums.id AND teams.id NOT IN (SELECT id FROM deleted_teams)
+        )
+        RETURNING id
+    ),
+    orphan_leagues AS (
+        DELETE FROM leagues
+        WHERE id IN (SELECT league_id FROM deleted_teams) AND NOT EXISTS (
+            SELECT 1 FROM teams
+            WHERE teams.league_id = leagues.id AND teams.id NOT IN (SELECT id FROM deleted_teams)
+        )
+        RETURNING id
+    )
+    SELECT 'teams', id FROM deleted_teams
+    UNION ALL SELECT 'stadiums', id FROM orphan_stadiums
+    UNION ALL SELECT 'leagues', id FROM orphan_leagues
+""")
+
+
+def delete_rows(
+    model_class, obj_ids: list[UUID], session: Session, prune_orphans: bool = True,
+) -> list[tuple]:
+    """Удалить записи одним запросом (без commit).
+
+    Игроки, команды и статистика удаляются базой данных каскадно (ON DELETE CASCADE).
+    Вместе с командами удаляются стадионы и лиги, в которых не осталось команд
+    (если prune_orphans).
 
     Args:
-        model_id (str): id модели
         model_class (_type_): класс модели
+        obj_ids (list[UUID]): id записей
         session (Session): сессия
+        prune_orphans (bool): удалить опустевшие стадионы и лиги вместе с командами
+
+    Returns:
+        list[tuple]: название таблицы и id каждой удаленной записи
     """
-    if not model_id:
-        return
-    if model_class == Stadium:
-        teams = session.scalars(select(Team).where(Team.stadium_id == model_id)).all()
-    else:
-        teams = session.scalars(select(Team).where(Team.league_id == model_id)).all()
-    if not teams:
-        session.delete(session.scalar(select(model_class).where(model_class.id == model_id)))
+    if model_class == Team and prune_orphans:
+        return session.execute(
+            DELETE_TEAMS, {'team_ids': [str(obj_id) for obj_id in obj_ids]},
+        ).all()
+    statement = delete(model_class).where(model_class.id.in_(obj_ids)).returning(
+        literal(model_class.__tablename__), model_class.id,
+    )
+    return session.execute(statement).all()
+
+
+def create_bulk_delete(model_class, prune_orphans: bool = True) -> Callable:
+    """Создать метод для удаления нескольких записей.
+
+    Args:
+        model_class (_type_): класс модели
+        prune_orphans (bool): удалять опустевшие стадионы и лиги вместе с командами
+
+    Returns:
+        Callable: функция для удаления записей
+    """
+    def delete_objs(obj_ids: list, session: Session) -> int | None:
+        """Удалить объекты.
+
+        Args:
+            obj_ids (list): id записей
+            session (Session): сессия
+
+        Returns:
+            int | None: число удаленных записей или ничего, если записи не найдены или ошибка
+        """
+        try:
+            obj_ids = [UUID(str(obj_id)) for obj_id in obj_ids]
+        except ValueError:
+            return None
+        team_ids, league_ids = stats.affected(model_class, obj_ids, session)
+        deleted = delete_rows(model_class, obj_ids, session, prune_orphans)
+        stats.refresh(session, team_ids, league_ids)
         session.commit()
+        for table, deleted_id in deleted:
+            cache.invalidate_row(table, deleted_id)
+        deleted_count = sum(row[0] == model_class.__tablename__ for row in deleted)
+        return deleted_count or None
+    return delete_objs
+
+
+bulk_delete_league = create_bulk_delete(League)
+bulk_delete_stadium = create_bulk_delete(Stadium)
+bulk_delete_player = create_bulk_delete(Player)
+bulk_delete_team = create_bulk_delete(Team)
+# Архивирование сезона убирает только команды: стадионы и лиги нужны другим сезонам.
+archive_teams = create_bulk_delete(Team, prune_orphans=False)
 
 
 def create_delete(model_class) -> Callable:
@@ -153,6 +387,8 @@ def create_delete(model_class) -> Callable:
     Returns:
         Callable: функция для удаления записи
     """
+    delete_objs = create_bulk_delete(model_class)
+
     def delete_obj(obj_id: UUID, session: Session) -> int | None:
         """Удалить объект.
 
@@ -163,18 +399,7 @@ def create_delete(model_class) -> Callable:
         Returns:
             int | None: 1 или ничего, если запись не найдена или ошибка
         """
-        try:
-            data_obj = session.scalar(select(model_class).where(model_class.id == obj_id))
-            if not data_obj:
-                return None
-            session.delete(data_obj)
-            session.commit()
-            if model_class == Team:
-                delete_empty_relations(data_obj.stadium_id, Stadium, session)
-                delete_empty_relations(data_obj.league_id, League, session)
-            return 1
-        except DataError:
-            return None
+        return delete_objs([obj_id], session)
     return delete_obj
 
 
@@ -184,6 +409,124 @@ delete_player = create_delete(Player)
 delete_team = create_delete(Team)
 
 
+def insert_savepoint(record, session: Session) -> UUID | None:
+    """Вставить объект в своей точке сохранения.
+
+    Args:
+        record (_type_): объект модели
+        session (Session): сессия
+
+    Returns:
+        UUID | None: id или ничего, если запись нарушает ограничение
+    """
+    try:
+        with session.begin_nested():
+            session.add(record)
+    except (IntegrityError, ProgrammingError, DataError):
+        return None
+    return record.id
+
+
+def create_insert_batch(model_class) -> Callable:
+    """Создать метод для вставки группы записей одной транзакцией.
+
+    Args:
+        model_class (_type_): класс модели
+
+    Returns:
+        Callable: функция для вставки группы записей
+    """
+    def insert_batch(records: list, session: Session) -> list[UUID | None]:
+        """Вставить группу объектов одним многострочным INSERT.
+
+        Если запись группы нарушает ограничение, транзакция откатывается
+        и объекты вставляются по одному в точках сохранения, чтобы ошибка
+        досталась только своему запросу. Если для записи не нашлось секции
+        сезона, секция сначала пересоздается.
+
+        Args:
+            records (list): объекты модели
+            session (Session): сессия
+
+        Returns:
+            list[UUID | None]: id или ничего для каждого объекта
+        """
+        try:
+            session.add_all(records)
+            session.flush()
+        except (IntegrityError, ProgrammingError, DataError) as error:
+            session.rollback()
+            if isinstance(error, IntegrityError) and seasons.is_missing_partition(error):
+                for season in sorted({record.season for record in records}):
+                    seasons.restore_season(season, session)
+            obj_ids = [insert_savepoint(record, session) for record in records]
+        else:
+            obj_ids = [record.id for record in records]
+        stats.refresh_for(model_class, [obj_id for obj_id in obj_ids if obj_id], session)
+        session.commit()
+        return obj_ids
+    return insert_batch
+
+
+def prepare_season(model_class, data_obj: dict, session: Session) -> dict | None:
+    """Дополнить данные команды или игрока сезоном и создать секцию сезона.
+
+    Игрок без сезона получает сезон своей команды: ключ (team_id, season)
+    ссылается на команду, и сезон по умолчанию подходит только командам
+    текущего сезона. Секция игроков сезона создается, если процесс еще
+    не знает о ней.
+
+    Args:
+        model_class (_type_): класс модели
+        data_obj (dict): словарь, с данными о объекте
+        session (Session): сессия
+
+    Returns:
+        dict | None: данные объекта с сезоном или ничего, если сезон или команда некорректны
+    """
+    if 'season' not in model_class.__table__.columns:
+        return data_obj
+    season = data_obj.get('season')
+    try:
+        if season is None and model_class == Player and data_obj.get('team_id'):
+            team_id = UUID(str(data_obj['team_id']))
+            season = session.scalar(select(Team.season).where(Team.id == team_id))
+        season = config.SEASON if season is None else int(season)
+    except (ValueError, TypeError):
+        return None
+    seasons.ensure_season(season, session)
+    return {**data_obj, 'season': season}
+
+
+def insert_obj(model_class, data_obj: dict, session: Session) -> UUID | None:
+    """Вставить объект и пересчитать статистику.
+
+    Args:
+        model_class (_type_): класс модели
+        data_obj (dict): словарь, с данными о объекте
+        session (Session): сессия
+
+    Returns:
+        UUID | None: id или ничего, если не получилось создать объект
+
+    Raises:
+        IntegrityError: для строки не нашлось секции сезона
+    """
+    try:
+        rec = model_class(**data_obj)
+        session.add(rec)
+        session.flush()
+        stats.refresh_for(model_class, [rec.id], session)
+        session.commit()
+    except IntegrityError as error:
+        if seasons.is_missing_partition(error):
+            raise
+        return None
+    except (ProgrammingError, DataError):
+        return None
+    return rec.id
+
+
 def create_add(model_class) -> Callable:
     """Создать метод для добавления записи.
 
@@ -203,24 +546,75 @@ def create_add(model_class) -> Callable:
         Returns:
             UUID | None: id или ничего, если не получилось создать объект
         """
+        data_obj = prepare_season(model_class, data_obj, session)
+        if data_obj is None:
+            return None
         try:
-            rec = model_class(**data_obj)
-            session.add(rec)
-            session.commit()
-            return rec.id
+            return insert_obj(model_class, data_obj, session)
         except IntegrityError:
-            return None
-        except ProgrammingError:
-            return None
-        except DataError:
-            return None
+            seasons.restore_season(data_obj['season'], session)
+        return insert_obj(model_class, data_obj, session)
     return create_obj
 
 
-create_league = create_add(League)
-create_stadium = create_add(Stadium)
-create_player = create_add(Player)
-create_team = create_add(Team)
+def create_coalesced_add(model_class) -> Callable:
+    """Создать метод для добавления записи в составе группы одновременных вставок.
+
+    Args:
+        model_class (_type_): класс модели
+
+    Returns:
+        Callable: функция для добавления записи
+    """
+    coalescer = coalescing.create_coalescer(create_insert_batch(model_class))
+
+    def create_coalesced(data_obj: dict, session: Session) -> UUID | None:
+        """Создать объект в составе группы одновременных вставок.
+
+        Args:
+            data_obj (dict): словарь, с данными о объекте
+            session (Session): сессия
+
+        Returns:
+            UUID | None: id или ничего, если не получилось создать объект
+        """
+        data_obj = prepare_season(model_class, data_obj, session)
+        if data_obj is None:
+            return None
+        return coalescer.submit(model_class(**data_obj), session)
+    return create_coalesced
+
+
+create_insert = create_coalesced_add if config.WRITE_COALESCE else create_add
+create_league = create_insert(League)
+create_stadium = create_insert(Stadium)
+create_player = create_insert(Player)
+create_team = create_insert(Team)
+
+
+def get_primary_key(model_class, obj_id: UUID, session: Session) -> dict:
+    """Получить значения первичного ключа записи по id.
+
+    У игроков первичный ключ включает сезон (ключ секционирования), поэтому
+    игрок меняет сезон только вместе со своей командой.
+
+    Args:
+        model_class (_type_): класс модели
+        obj_id (UUID): id записи
+        session (Session): сессия
+
+    Returns:
+        dict: значения столбцов первичного ключа
+
+    Raises:
+        StaleDataError: запись не найдена
+    """
+    columns = model_class.__table__.primary_key.columns
+    statement = select(*columns).where(model_class.id == obj_id)
+    row = session.execute(statement).mappings().first()
+    if not row:
+        raise exc.StaleDataError(obj_id)
+    return dict(row)
 
 
 def create_update(model_class) -> Callable:
@@ -246,15 +640,20 @@ def create_update(model_class) -> Callable:
             data_obj['stadium_id'] = data_obj['stadium_id'] if data_obj['stadium_id'] else None
         if 'league_id' in data_obj.keys():
             data_obj['league_id'] = data_obj['league_id'] if data_obj['league_id'] else None
+        if 'season' in data_obj:
+            data_obj = prepare_season(model_class, data_obj, session)
+            if data_obj is None:
+                return None
+        obj_id = data_obj['id']
         try:
-            session.bulk_update_mappings(model_class, [{'id': data_obj['id'], **data_obj}])
+            primary_key = get_primary_key(model_class, obj_id, session)
+            before = stats.affected(model_class, [obj_id], session)
+            session.bulk_update_mappings(model_class, [{**data_obj, **primary_key}])
+            stats.refresh_for(model_class, [obj_id], session, before)
             session.commit()
-            return data_obj['id']
-        except DataError:
-            return None
-        except exc.StaleDataError:
-            return None
-        except IntegrityError:
+            cache.invalidate(model_class, obj_id)
+            return obj_id
+        except (DataError, exc.StaleDataError, IntegrityError):
             return None
     return update_obj
 
@@ -291,10 +690,12 @@ def create_get(model_class) -> Callable:
     return get_obj
 
 
-get_league = create_get(League)
-get_stadium = create_get(Stadium)
+get_league = cache.leagues.get
+get_stadium = cache.stadiums.get
 get_player = create_get(Player)
 get_team = create_get(Team)
+get_team_document = documents.get_team_document
+get_team_document_json = documents.get_team_document_json
 
 
 def create_get_all(model_class) -> Callable:
@@ -306,16 +707,22 @@ def create_get_all(model_class) -> Callable:
     Returns:
         Callable: функция для получения данных о записи
     """
-    def get_all_obj(session: Session) -> list:
-        """Получить все записи модели.
+    is_seasonal = 'season' in model_class.__table__.columns
+
+    def get_all_obj(session: Session, season: int = config.SEASON) -> list:
+        """Получить все записи модели (команды и игроков - только за сезон).
 
         Args:
             session (Session): сессия
+            season (int): сезон
 
         Returns:
             list: список объектов класса команда
         """
-        model_values = [mod_val.__dict__ for mod_val in session.scalars(select(model_class))]
+        statement = select(model_class)
+        if is_seasonal:
+            statement = statement.where(model_class.season == season)
+        model_values = [mod_val.__dict__ for mod_val in session.scalars(statement)]
         for mod_val in model_values:
             mod_val.pop('_sa_instance_state', None)
             for keys, value_field in mod_val.items():
@@ -331,19 +738,23 @@ get_all_league = create_get_all(League)
 get_all_player = create_get_all(Player)
 
 
-def get_players_of_team(team_id, session: Session) -> list[dict]:
+def get_players_of_team(team_id, session: Session, season: int | None = None) -> list[dict]:
     """получить игроков команды.
 
     Args:
         team_id (_type_): id команды
         session (Session): сессия
+        season (int | None): сезон команды, чтобы читать только его секцию
 
     Returns:
         list[dict]: список словарей с данными об игроках или ничего,
         если у команды нет игроко или ошибка
     """
     try:
-        players = session.scalars(select(Player).where(Player.team_id == team_id))
+        statement = select(Player).where(Player.team_id == team_id)
+        if season is not None:
+            statement = statement.where(Player.season == season)
+        players = session.scalars(statement)
     except DataError:
         return None
     if players:
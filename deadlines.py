@@ -0,0 +1,247 @@
+"""Модуль крайних сроков запросов (deadlines).
+
+У запроса есть бюджет времени: по маршруту (config.DEADLINE_ROUTES) или по
+бюджету допуска (config.DEADLINES: чтение, запись, добавление через внешнее апи).
+Срок начинается до ожидания в очереди допуска, хранится в contextvar и
+распространяется на все, что делает запрос:
+
+- каждая транзакция базы данных получает statement_timeout и lock_timeout, равные
+  оставшемуся времени (SET LOCAL через set_config), а после истечения срока
+  запросы в базу данных не отправляются;
+- вызовы внешнего апи и скачивание изображений получают таймаут не больше
+  оставшегося времени.
+
+Истечение срока выбрасывает DeadlineExceeded с этапом (db, football, image),
+приложение отвечает 504. Вне запроса (команды flask, фоновые потоки) срока нет
+и таймауты не меняются. Обработчики событий SQLAlchemy регистрируются при
+импорте модуля для всех движков и сессий, в том числе asyncio.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.orm import Session
+
+import admission
+import config
+
+DB = 'db'
+QUERY_CANCELED = '57014'
+LOCK_NOT_AVAILABLE = '55P03'
+TIMEOUT_CODES = frozenset((QUERY_CANCELED, LOCK_NOT_AVAILABLE))
+MS_IN_SECOND = 1000
+SET_TIMEOUTS = text(
+    "SELECT set_config('statement_timeout', :timeout, true), "
+    + "set_config('lock_timeout', :timeout, true)",
+)
+
+
+class DeadlineExceeded(Exception):
+    """Исключение: крайний срок запроса истек."""
+
+    def __init__(self, stage: str) -> None:
+        """Инициализация исключения.
+
+        Args:
+            stage (str): этап, на котором истек срок (db, football, image)
+        """
+        super().__init__(f'Истек крайний срок запроса, этап: {stage}')
+        self.stage = stage
+
+
+class Deadline:
+    """Крайний срок запроса."""
+
+    def __init__(self, route: str, seconds: float) -> None:
+        """Инициализация срока.
+
+        Args:
+            route (str): метод и обработчик запроса
+            seconds (float): бюджет времени запроса в секундах
+        """
+        self.route = route
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Сколько секунд осталось до срока.
+
+        Returns:
+            float: секунды (отрицательные, если срок истек)
+        """
+        return self.expires_at - time.monotonic()
+
+
+class DeadlineCounters:
+    """Счетчики запросов со сроком и прерванных по сроку (для воркера)."""
+
+    def __init__(self) -> None:
+        """Инициализация счетчиков."""
+        self.counts = Counter(started=0, exceeded=0)
+        self.stages = Counter()
+        self.routes = Counter()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Учесть запрос со сроком."""
+        with self._lock:
+            self.counts['started'] += 1
+
+    def exceed(self, route: str, stage: str) -> None:
+        """Учесть запрос, прерванный по сроку.
+
+        Args:
+            route (str): метод и обработчик запроса
+            stage (str): этап, на котором истек срок
+        """
+        with self._lock:
+            self.counts['exceeded'] += 1
+            self.stages[stage] += 1
+            self.routes[route] += 1
+
+    def counters(self) -> dict:
+        """Получить счетчики.
+
+        Returns:
+            dict: число запросов со сроком и прерванных по этапам и маршрутам
+        """
+        with self._lock:
+            return {**self.counts, 'stages': dict(self.stages), 'routes': dict(self.routes)}
+
+
+current: ContextVar[Deadline | None] = ContextVar('deadline', default=None)
+metrics = DeadlineCounters()
+
+
+def seconds_for(endpoint: str | None, method: str) -> float:
+    """Бюджет времени запроса по обработчику и методу.
+
+    Args:
+        endpoint (str | None): название обработчика (с префиксом blueprint или без)
+        method (str): http метод
+
+    Returns:
+        float: секунды (0 - без срока)
+    """
+    view = (endpoint or '').rsplit('.', 1)[-1]
+    name = admission.budget_name(endpoint, method)
+    return config.DEADLINE_ROUTES.get(view, config.DEADLINES[name] if name else 0)
+
+
+def start(endpoint: str | None, method: str) -> None:
+    """Начать срок запроса в текущем контексте.
+
+    Args:
+        endpoint (str | None): название обработчика
+        method (str): http метод
+    """
+    seconds = seconds_for(endpoint, method)
+    view = (endpoint or '').rsplit('.', 1)[-1]
+    current.set(Deadline(f'{method} {view}', seconds) if seconds else None)
+    if seconds:
+        metrics.start()
+
+
+def finish() -> None:
+    """Убрать срок запроса из текущего контекста (поток воркера обслуживает следующие запросы)."""
+    current.set(None)
+
+
+def check(stage: str) -> float | None:
+    """Проверить срок запроса перед очередным этапом.
+
+    Args:
+        stage (str): этап
+
+    Returns:
+        float | None: оставшиеся секунды или ничего, если у запроса нет срока
+
+    Raises:
+        DeadlineExceeded: срок истек
+    """
+    deadline = current.get()
+    if deadline is None:
+        return None
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(stage)
+    return remaining
+
+
+def timeout(default: float, stage: str) -> float:
+    """Таймаут внешнего вызова: не больше оставшегося до срока времени.
+
+    Args:
+        default (float): таймаут без срока
+        stage (str): этап
+
+    Returns:
+        float: таймаут в секундах
+    """
+    remaining = check(stage)
+    return default if remaining is None else min(default, remaining)
+
+
+def expired() -> bool:
+    """Истек ли срок запроса.
+
+    Returns:
+        bool: True, если у запроса есть срок и он истек
+    """
+    deadline = current.get()
+    return deadline is not None and deadline.remaining() <= 0
+
+
+def record(error: DeadlineExceeded) -> None:
+    """Учесть прерванный по сроку запрос в счетчиках воркера.
+
+    Args:
+        error (DeadlineExceeded): исключение срока
+    """
+    deadline = current.get()
+    metrics.exceed(deadline.route if deadline else '', error.stage)
+
+
+@event.listens_for(Session, 'after_begin')
+def set_timeouts(session: Session, transaction, connection) -> None:
+    """Ограничить запросы и ожидание блокировок транзакции оставшимся временем.
+
+    Args:
+        session (Session): сессия
+        transaction (_type_): транзакция сессии
+        connection (_type_): соединение транзакции
+    """
+    remaining = check(DB)
+    if remaining is not None:
+        connection.execute(SET_TIMEOUTS, {'timeout': str(math.ceil(remaining * MS_IN_SECOND))})
+
+
+@event.listens_for(Engine, 'before_cursor_execute', named=True)
+def check_before_execute(**kwargs) -> None:
+    """Не отправлять запрос в базу данных после истечения срока.
+
+    Args:
+        kwargs: аргументы события before_cursor_execute
+    """
+    check(DB)
+
+
+@event.listens_for(Engine, 'handle_error')
+def translate_timeout(context) -> None:
+    """Заменить отмену запроса по statement_timeout или lock_timeout на DeadlineExceeded.
+
+    Ошибка заменяется, только если срок запроса истек: lock_timeout, поставленный
+    самим запросом (например, при создании секции сезона), остается ошибкой базы данных.
+
+    Args:
+        context (_type_): контекст ошибки SQLAlchemy
+
+    Raises:
+        DeadlineExceeded: запрос отменен, потому что истек срок
+    """
+    code = getattr(context.original_exception, 'pgcode', None)
+    if code in TIMEOUT_CODES and expired():
+        raise DeadlineExceeded(DB) from context.original_exception
@@ -0,0 +1,109 @@
+"""Модуль документов команд (денормализованная модель чтения).
+
+Документ команды - строка team_documents с командой, лигой, стадионом
+и составом сезона в одном JSONB. Документы пересчитываются вместе со
+статистикой (stats.refresh) в той же транзакции, что и запись в базу данных,
+поэтому страница команды - это выборка одной строки по первичному ключу без
+соединений. Удаленные команды удаляются из team_documents каскадно.
+
+Перед пересчетом строки документов блокируются: пересчет идет уже после
+фиксации одновременных транзакций, изменивших ту же команду, и не теряет их
+игроков. ``flask --app app rebuild-documents`` пересчитывает все документы.
+"""
+from uuid import UUID
+
+from sqlalchemy import Text, cast, select, text
+from sqlalchemy.orm import Session
+
+from models import Team, TeamDocument
+
+REFRESH_DOCUMENTS = text("""
+    INSERT INTO team_documents (team_id, document)
+    SELECT
+        teams.id,
+        jsonb_build_object(
+            'team', to_jsonb(teams),
+            'league', to_jsonb(leagues),
+            'stadium', to_jsonb(stadiums),
+            'players', (
+                SELECT COALESCE(jsonb_agg(to_jsonb(players) ORDER BY players.id), '[]')
+                FROM players
+                WHERE players.team_id = teams.id AND players.season = teams.season
+            )
+        )
+    FROM teams
+    LEFT JOIN leagues ON leagues.id = teams.league_id
+    LEFT JOIN stadiums ON stadiums.id = teams.stadium_id
+    WHERE teams.id = ANY(CAST(:team_ids AS uuid[]))
+        OR teams.league_id = ANY(CAST(:league_ids AS uuid[]))
+    ON CONFLICT (team_id) DO UPDATE SET document = EXCLUDED.document
+""")
+
+LOCK_DOCUMENTS = text("""
+    SELECT team_documents.team_id
+    FROM team_documents JOIN teams ON teams.id = team_documents.team_id
+    WHERE teams.id = ANY(CAST(:team_ids AS uuid[]))
+        OR teams.league_id = ANY(CAST(:league_ids AS uuid[]))
+    ORDER BY team_documents.team_id
+    FOR UPDATE OF team_documents
+""")
+
+
+def refresh(session: Session, team_ids: set, league_ids: set | tuple = ()) -> None:
+    """Пересчитать документы команд (без commit, в текущей транзакции).
+
+    Args:
+        session (Session): сессия
+        team_ids (set): id команд
+        league_ids (set | tuple): id лиг, документы всех команд которых пересчитываются
+    """
+    if not team_ids and not league_ids:
+        return
+    document_params = {
+        'team_ids': [str(team_id) for team_id in team_ids],
+        'league_ids': [str(league_id) for league_id in league_ids],
+    }
+    session.execute(LOCK_DOCUMENTS, document_params)
+    session.execute(REFRESH_DOCUMENTS, document_params)
+
+
+def rebuild(session: Session) -> int:
+    """Пересчитать документы всех команд.
+
+    Args:
+        session (Session): сессия
+
+    Returns:
+        int: число документов
+    """
+    team_ids = set(session.scalars(select(Team.id)))
+    refresh(session, team_ids)
+    session.commit()
+    return len(team_ids)
+
+
+def get_team_document(team_id: UUID, session: Session) -> dict | None:
+    """Получить документ команды.
+
+    Args:
+        team_id (UUID): id команды
+        session (Session): сессия
+
+    Returns:
+        dict | None: команда, лига, стадион и игроки или ничего, если команда не найдена
+    """
+    return session.scalar(select(TeamDocument.document).where(TeamDocument.team_id == team_id))
+
+
+def get_team_document_json(team_id: UUID, session: Session) -> str | None:
+    """Получить документ команды готовым JSON, без разбора и повторной сериализации.
+
+    Args:
+        team_id (UUID): id команды
+        session (Session): сессия
+
+    Returns:
+        str | None: JSON документа или ничего, если команда не найдена
+    """
+    statement = select(cast(TeamDocument.document, Text)).where(TeamDocument.team_id == team_id)
+    return session.scalar(statement)
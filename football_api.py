@@ -1,12 +1,24 @@
-"""Модуль для работы с внешним api."""
+"""Модуль для работы с внешним api.
+
+Вызовы внешнего api идут через предохранитель (breaker.py), общий для
+синхронного и асинхронного клиента процесса: после FOOTBALL_BREAKER_FAILURES
+сбоев подряд (ошибка соединения, таймаут, ответ 5xx или 429) запросы
+к внешнему api сразу отклоняются, пока не пройдет пробный запрос. Поиск лиги,
+команды и состава (stale_ok) при сбое отдает последний успешный ответ.
+Таймаут вызова не больше оставшегося до крайнего срока запроса времени (deadlines.py),
+вызов, прерванный по сроку, предохранитель не учитывает.
+"""
+from functools import cache
 from os import environ
 
 import requests
-from dotenv import load_dotenv
 
 import config
+import deadlines
+from breaker import CircuitBreaker, CircuitOpen, LastGood
 
-load_dotenv()
+TOO_MANY_REQUESTS = 429
+FOOTBALL = 'football'
 
 
 class ForeignApiError(Exception):
@@ -19,10 +31,64 @@ class ForeignApiError(Exception):
             status_code (int): статус код
         """
         super().__init__(f'Ошибка запроса внешнего апи, код ошибки: {status_code}')
+        self.status_code = status_code
 
 
-def get_data(path: str, options: dict) -> dict:
-    """Получить данные.
+def is_outage(error: Exception) -> bool | None:
+    """Считать ли исключение сбоем внешнего api, а не ошибкой запроса.
+
+    Args:
+        error (Exception): исключение вызова внешнего api
+
+    Returns:
+        bool | None: True для ошибок соединения, таймаутов и ответов 5xx или 429,
+            None для вызова, прерванного по крайнему сроку запроса
+    """
+    if isinstance(error, deadlines.DeadlineExceeded):
+        return None
+    if isinstance(error, ForeignApiError):
+        return error.status_code >= config.SERVER_ERROR or error.status_code == TOO_MANY_REQUESTS
+    return True
+
+
+breaker = CircuitBreaker(
+    config.FOOTBALL_BREAKER_FAILURES,
+    config.FOOTBALL_BREAKER_RESET,
+    config.FOOTBALL_BREAKER_PROBES,
+    is_outage,
+)
+last_good = LastGood(config.FOOTBALL_STALE_ENTRIES)
+
+
+@cache
+def get_client() -> requests.Session:
+    """Получить http клиент, общий для всех запросов процесса.
+
+    Создается при первом запросе, а не при импорте, и переиспользует соединения.
+
+    Returns:
+        requests.Session: http клиент
+    """
+    client = requests.Session()
+    client.headers[config.FOOTBALL_HEADER] = environ.get('FOOTBAll_KEY', '')
+    return client
+
+
+def stale_key(path: str, options: dict) -> tuple:
+    """Ключ запроса в кэше последних успешных ответов.
+
+    Args:
+        path (str): путь
+        options (dict): параметры
+
+    Returns:
+        tuple: путь и отсортированные параметры
+    """
+    return path, tuple(sorted(options.items()))
+
+
+def fetch(path: str, options: dict) -> dict:
+    """Запросить данные у внешнего api.
 
     Args:
         path (str): путь
@@ -30,63 +96,97 @@ def get_data(path: str, options: dict) -> dict:
 
     Raises:
         ForeignApiError: ошибка внешнего api
+        requests.Timeout: таймаут соединения, а срок запроса еще не истек
 
     Returns:
         dict: словарь с данными
     """
     url = f'{config.FOOTBALL_URL}{path}'
-    headers = {config.FOOTBALL_HEADER: environ.get('FOOTBAll_KEY')}
-    response = requests.get(url, headers=headers, params=options, timeout=10)
+    timeout = deadlines.timeout(config.FOOTBALL_TIMEOUT, FOOTBALL)
+    try:
+        response = get_client().get(url, params=options, timeout=timeout)
+    except requests.Timeout:
+        deadlines.check(FOOTBALL)
+        raise
     if response.status_code != config.OK:
         raise ForeignApiError(response.status_code)
     return response.json()
 
 
-def get_data_league(name: str, country: str) -> tuple[str] | None:
-    """Получить данные лиги.
+def get_data(path: str, options: dict, stale_ok: bool = False) -> dict:
+    """Получить данные.
 
     Args:
+        path (str): путь
+        options (dict): параметры
+        stale_ok (bool): при сбое отдать последний успешный ответ на этот запрос
+
+    Raises:
+        ForeignApiError: ошибка внешнего api
+        CircuitOpen: предохранитель разомкнут, а последнего ответа нет
+        requests.RequestException: ошибка соединения или таймаут, а последнего ответа нет
+
+    Returns:
+        dict: словарь с данными
+    """
+    deadlines.check(FOOTBALL)
+    key = stale_key(path, options)
+    try:
+        with breaker.call():
+            response_data = fetch(path, options)
+    except (ForeignApiError, CircuitOpen, requests.RequestException):
+        stale = last_good.get(key) if stale_ok else None
+        if stale is None:
+            raise
+        return stale
+    if stale_ok:
+        last_good.put(key, response_data)
+    return response_data
+
+
+def find_league(league_data: dict, name: str, country: str) -> tuple[str] | None:
+    """Найти лигу в ответе внешнего api.
+
+    Args:
+        league_data (dict): ответ внешнего api
         name (str): название
         country (str): страна
 
     Returns:
         tuple[str] | None: кортеж с данными или ничего, если совпадений не найдено
     """
-    league_data = get_data('/leagues', {'season': config.SEASON})['response']
-    for league in league_data:
+    for league in league_data['response']:
         if league['league']['name'] == name and league['country']['name'] == country:
             return league['league']['id'], league['league']['logo']
     return None
 
 
-def get_data_team(name: str, league_api_id: int) -> dict | None:
-    """Получить данные команды.
+def find_team(team_data: dict, name: str) -> dict | None:
+    """Найти команду в ответе внешнего api.
 
     Args:
+        team_data (dict): ответ внешнего api
         name (str): название
-        league_api_id (int): api id лиги
 
     Returns:
         dict | None: словарь с данными или ничего, если совпадений не найдено
     """
-    team_data = get_data('/teams', {'league': league_api_id, 'season': config.SEASON})['response']
-    for team in team_data:
+    for team in team_data['response']:
         name_team = team['team']['name']
         if name_team == name:
             return team
     return None
 
 
-def get_team_roster(team_api_id: int) -> list[dict]:
-    """Получить состав команды.
+def parse_roster(roster_data: dict) -> list[dict]:
+    """Разобрать состав команды из ответа внешнего api.
 
     Args:
-        team_api_id (int): api id команды
+        roster_data (dict): ответ внешнего api
 
     Returns:
         list[dict]: список словарей с данными об игроках
     """
-    roster_data = get_data('/players/squads', {'team': team_api_id})
     list_of_players = roster_data['response'][0]['players']
     res = []
     for player in list_of_players:
@@ -97,3 +197,124 @@ def get_team_roster(team_api_id: int) -> list[dict]:
             player_data[key] = val_player
         res.append(player_data)
     return res
+
+
+def parse_season_players(players_data: dict) -> list[dict]:
+    """Разобрать игроков команды за сезон из ответа внешнего api (/players).
+
+    Args:
+        players_data (dict): ответ внешнего api
+
+    Returns:
+        list[dict]: список словарей с данными об игроках в формате состава
+    """
+    res = []
+    for player_stats in players_data['response']:
+        player = player_stats['player']
+        games = player_stats['statistics'][0]['games'] if player_stats['statistics'] else {}
+        res.append({
+            'name': player['name'],
+            'age': player['age'],
+            'number': games.get('number'),
+            'position': games.get('position'),
+            'photo': player['photo'],
+        })
+    return res
+
+
+def get_leagues(season: int = config.SEASON) -> list[dict]:
+    """Получить все лиги сезона.
+
+    Args:
+        season (int): сезон
+
+    Returns:
+        list[dict]: список словарей с данными о лигах
+    """
+    return get_data('/leagues', {'season': season})['response']
+
+
+def get_teams(league_api_id: int, season: int = config.SEASON) -> list[dict]:
+    """Получить все команды лиги в сезоне.
+
+    Args:
+        league_api_id (int): api id лиги
+        season (int): сезон
+
+    Returns:
+        list[dict]: список словарей с данными о командах и их стадионах
+    """
+    return get_data('/teams', {'league': league_api_id, 'season': season})['response']
+
+
+def get_data_league(
+    name: str, country: str, season: int = config.SEASON,
+) -> tuple[str] | None:
+    """Получить данные лиги.
+
+    Args:
+        name (str): название
+        country (str): страна
+        season (int): сезон
+
+    Returns:
+        tuple[str] | None: кортеж с данными или ничего, если совпадений не найдено
+    """
+    league_data = get_data('/leagues', {'season': season}, stale_ok=True)
+    return find_league(league_data, name, country)
+
+
+def get_data_team(name: str, league_api_id: int, season: int = config.SEASON) -> dict | None:
+    """Получить данные команды.
+
+    Args:
+        name (str): название
+        league_api_id (int): api id лиги
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь с данными или ничего, если совпадений не найдено
+    """
+    team_data = get_data(
+        '/teams', {'league': league_api_id, 'season': season}, stale_ok=True,
+    )
+    return find_team(team_data, name)
+
+
+def get_season_roster(team_api_id: int, season: int) -> list[dict]:
+    """Получить игроков команды за прошедший сезон (постранично).
+
+    Args:
+        team_api_id (int): api id команды
+        season (int): сезон
+
+    Returns:
+        list[dict]: список словарей с данными об игроках
+    """
+    res = []
+    page = 1
+    while True:
+        options = {'team': team_api_id, 'season': season, 'page': page}
+        players_data = get_data('/players', options, stale_ok=True)
+        res.extend(parse_season_players(players_data))
+        if page >= players_data['paging']['total']:
+            return res
+        page += 1
+
+
+def get_team_roster(team_api_id: int, season: int = config.SEASON) -> list[dict]:
+    """Получить состав команды.
+
+    Текущий состав отдает /players/squads, а игроков прошедших сезонов - /players.
+
+    Args:
+        team_api_id (int): api id команды
+        season (int): сезон
+
+    Returns:
+        list[dict]: список словарей с данными об игроках
+    """
+    if season != config.SEASON:
+        return get_season_roster(team_api_id, season)
+    roster_data = get_data('/players/squads', {'team': team_api_id}, stale_ok=True)
+    return parse_roster(roster_data)
@@ -0,0 +1,26 @@
+"""Настройки gunicorn.
+
+Приложение загружается один раз в мастер-процессе и наследуется воркерами
+через fork, поэтому воркеры стартуют без повторного импорта модулей.
+
+Воркеры gthread обрабатывают запросы в потоках: лишние запросы ждут
+в ограниченных очередях бюджетов (admission.py) или сразу получают 503,
+а не копятся в очереди соединений воркера. Асинхронный режим задает
+--worker-class uvicorn в script.sh.
+"""
+import admission
+import db
+
+preload_app = True
+worker_class = 'gthread'
+threads = admission.worker_threads()
+
+
+def post_fork(server, worker) -> None:
+    """Сбросить пул соединений, унаследованный воркером от мастер-процесса.
+
+    Args:
+        server (_type_): арбитр gunicorn
+        worker (_type_): воркер
+    """
+    db.dispose_engine()
@@ -0,0 +1,295 @@
+"""Модуль прокси изображений с кэшем миниатюр на диске.
+
+Каждое изображение (логотип, фото игрока, фото стадиона) скачивается один раз,
+уменьшается до нужного размера и хранится в IMAGE_CACHE_DIR. Размер каталога
+ограничен, при переполнении удаляются давно не запрошенные миниатюры (LRU по mtime).
+Воркер ведет оценку размера каталога и сканирует его только при превышении
+предела или после IMAGE_CACHE_RESCAN_FILES сохраненных миниатюр (другие воркеры
+тоже пишут в каталог).
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+import requests
+from PIL import Image, UnidentifiedImageError
+
+import config
+import deadlines
+
+IMAGE = 'image'
+ALL_SIZES = (config.THUMBNAIL_SIZE, config.THUMBNAIL_SIZE_LARGE)
+LARGE_SIZES = (config.THUMBNAIL_SIZE_LARGE,)
+
+
+class CacheUsage:
+    """Оценка размера каталога миниатюр этого воркера."""
+
+    def __init__(self) -> None:
+        """Инициализация оценки (размер неизвестен до первого сканирования)."""
+        self.total: int | None = None
+        self.stored = 0
+        self._lock = threading.Lock()
+
+    def add(self, file_size: int) -> bool:
+        """Учесть сохраненную миниатюру.
+
+        Args:
+            file_size (int): размер файла
+
+        Returns:
+            bool: True, если каталог нужно просканировать и при необходимости очистить
+        """
+        with self._lock:
+            if self.total is None or self.stored >= config.IMAGE_CACHE_RESCAN_FILES:
+                return True
+            self.total += file_size
+            self.stored += 1
+            return self.total > config.IMAGE_CACHE_MAX_BYTES
+
+    def reset(self, total: int) -> None:
+        """Запомнить размер каталога после сканирования.
+
+        Args:
+            total (int): размер каталога
+        """
+        with self._lock:
+            self.total = total
+            self.stored = 0
+
+
+usage = CacheUsage()
+_prefetch_pool = ThreadPoolExecutor(config.IMAGE_PREFETCH_WORKERS, thread_name_prefix='images')
+
+
+class ImageError(Exception):
+    """Класс ошибки получения изображения."""
+
+    def __init__(self, url: str) -> None:
+        """Инициализация ошибки.
+
+        Args:
+            url (str): ссылка на изображение
+        """
+        super().__init__(f'Не удалось получить изображение: {url}')
+
+
+def is_allowed(url: str) -> bool:
+    """Проверить, что изображение можно скачивать через прокси.
+
+    Args:
+        url (str): ссылка на изображение
+
+    Returns:
+        bool: True, если схема http(s) и хост в списке разрешенных
+    """
+    parsed = urlparse(url)
+    return parsed.scheme in {'http', 'https'} and parsed.hostname in config.IMAGE_PROXY_HOSTS
+
+
+def thumbnail_path(url: str, size: int) -> Path:
+    """Получить путь к миниатюре в кэше.
+
+    Args:
+        url (str): ссылка на изображение
+        size (int): размер миниатюры
+
+    Returns:
+        Path: путь к файлу миниатюры
+    """
+    digest = hashlib.sha256(f'{size}:{url}'.encode()).hexdigest()
+    return Path(config.IMAGE_CACHE_DIR, f'{digest}.webp')
+
+
+def open_image(url: str, timeout: float) -> requests.Response:
+    """Начать скачивание изображения, проверяя каждое перенаправление.
+
+    Перенаправления не выполняются автоматически: разрешенный хост не должен
+    перенаправить прокси на внутренний адрес.
+
+    Args:
+        url (str): ссылка на изображение
+        timeout (float): таймаут в секундах
+
+    Raises:
+        ImageError: перенаправление на неразрешенный хост или слишком много перенаправлений
+
+    Returns:
+        requests.Response: ответ с непрочитанным телом
+    """
+    for _ in range(config.IMAGE_MAX_REDIRECTS + 1):
+        response = requests.get(url, stream=True, timeout=timeout, allow_redirects=False)
+        if not response.is_redirect:
+            return response
+        response.close()
+        url = urljoin(url, response.headers['Location'])
+        if not is_allowed(url):
+            raise ImageError(url)
+    raise ImageError(url)
+
+
+def download(url: str) -> bytes:
+    """Скачать изображение, не больше IMAGE_MAX_DOWNLOAD байт.
+
+    Таймаут не больше оставшегося до крайнего срока запроса времени.
+
+    Args:
+        url (str): ссылка на изображение
+
+    Raises:
+        ImageError: ошибка получения изображения
+
+    Returns:
+        bytes: содержимое изображения
+    """
+    timeout = deadlines.timeout(config.IMAGE_TIMEOUT, IMAGE)
+    try:
+        with open_image(url, timeout) as response:
+            if response.status_code != config.OK:
+                raise ImageError(url)
+            image_bytes = response.raw.read(config.IMAGE_MAX_DOWNLOAD + 1, decode_content=True)
+    except requests.RequestException as error:
+        raise ImageError(url) from error
+    if len(image_bytes) > config.IMAGE_MAX_DOWNLOAD:
+        raise ImageError(url)
+    return image_bytes
+
+
+def make_thumbnail(image_bytes: bytes, size: int) -> bytes:
+    """Уменьшить изображение.
+
+    Args:
+        image_bytes (bytes): содержимое изображения
+        size (int): максимальные ширина и высота
+
+    Returns:
+        bytes: миниатюра в формате webp
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.thumbnail((size, size))
+        thumbnail = io.BytesIO()
+        image.save(thumbnail, 'WEBP', quality=config.IMAGE_QUALITY)
+    return thumbnail.getvalue()
+
+
+def store_thumbnail(url: str, size: int, path: Path) -> None:
+    """Скачать изображение и сохранить миниатюру в кэш.
+
+    Файл пишется во временный файл и атомарно переименовывается, поэтому
+    воркеры, одновременно скачивающие одно изображение, не мешают друг другу.
+
+    Args:
+        url (str): ссылка на изображение
+        size (int): размер миниатюры
+        path (Path): путь к файлу миниатюры
+
+    Raises:
+        ImageError: ошибка получения изображения
+    """
+    image_bytes = download(url)
+    try:
+        thumbnail = make_thumbnail(image_bytes, size)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as error:
+        raise ImageError(url) from error
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp_file:
+        tmp_file.write(thumbnail)
+        tmp_name = tmp_file.name
+    os.replace(tmp_name, path)
+    if usage.add(len(thumbnail)):
+        evict()
+
+
+def get_thumbnail(url: str, size: int) -> Path:
+    """Получить миниатюру из кэша, скачав изображение при промахе.
+
+    Args:
+        url (str): ссылка на изображение
+        size (int): размер миниатюры
+
+    Returns:
+        Path: путь к файлу миниатюры
+    """
+    path = thumbnail_path(url, size)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        store_thumbnail(url, size, path)
+    return path
+
+
+def cached_files() -> list[tuple[float, int, str]]:
+    """Получить файлы кэша.
+
+    Returns:
+        list[tuple[float, int, str]]: время последнего обращения, размер и путь каждого файла
+    """
+    files = []
+    for entry in os.scandir(config.IMAGE_CACHE_DIR):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    return files
+
+
+def evict() -> None:
+    """Удалить давно не запрошенные миниатюры, если кэш больше IMAGE_CACHE_MAX_BYTES."""
+    files = cached_files()
+    total = sum(file_size for _, file_size, _ in files)
+    if total > config.IMAGE_CACHE_MAX_BYTES:
+        total = remove_oldest(files, total)
+    usage.reset(total)
+
+
+def remove_oldest(files: list[tuple[float, int, str]], total: int) -> int:
+    """Удалять самые давние миниатюры, пока кэш не уменьшится до IMAGE_CACHE_EVICT_TO.
+
+    Args:
+        files (list[tuple[float, int, str]]): файлы кэша
+        total (int): размер кэша
+
+    Returns:
+        int: размер кэша после удаления
+    """
+    for _, file_size, file_path in sorted(files):
+        if total <= config.IMAGE_CACHE_MAX_BYTES * config.IMAGE_CACHE_EVICT_TO:
+            break
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            continue
+        total -= file_size
+    return total
+
+
+def prefetch_one(url: str, size: int) -> None:
+    """Скачать миниатюру в кэш, игнорируя ошибки.
+
+    Args:
+        url (str): ссылка на изображение
+        size (int): размер миниатюры
+    """
+    try:
+        get_thumbnail(url, size)
+    except ImageError:
+        return
+
+
+def prefetch(urls: list[str], sizes: tuple[int, ...] = (config.THUMBNAIL_SIZE,)) -> None:
+    """Скачать миниатюры в фоне, чтобы первая загрузка страниц не ждала внешние сервера.
+
+    Args:
+        urls (list[str]): ссылки на изображения
+        sizes (tuple[int, ...]): размеры миниатюр
+    """
+    for url in urls:
+        if url and is_allowed(url):
+            for size in sizes:
+                _prefetch_pool.submit(prefetch_one, url, size)
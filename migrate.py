@@ -0,0 +1,89 @@
+"""Применение миграций перед запуском сервера.
+
+Ревизии читаются из файлов миграций без импорта alembic и SQLAlchemy, а текущая
+ревизия базы - одним запросом через psycopg2. Если база данных уже на последней
+ревизии, скрипт сразу завершается, иначе запускает ``alembic upgrade head``.
+"""
+import ast
+import os
+import sys
+from pathlib import Path
+
+from psycopg2 import connect, errors
+
+import config
+
+VERSIONS_DIR = Path('migrations', 'versions')
+REVISION_FIELDS = frozenset(('revision', 'down_revision'))
+
+
+def read_revision(path: Path) -> dict:
+    """Прочитать ревизию и предыдущие ревизии из файла миграции.
+
+    Args:
+        path (Path): путь к файлу миграции
+
+    Returns:
+        dict: значения revision и down_revision
+    """
+    revision = {}
+    for node in ast.parse(path.read_text(encoding='utf-8')).body:
+        if isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        elif isinstance(node, ast.Assign):
+            targets = node.targets
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in REVISION_FIELDS:
+                revision[target.id] = ast.literal_eval(node.value)
+    return revision
+
+
+def get_script_heads() -> set[str]:
+    """Получить последние ревизии из каталога миграций.
+
+    Returns:
+        set[str]: ревизии, на которые не ссылается ни одна другая миграция
+    """
+    revisions = set()
+    down_revisions = set()
+    for path in VERSIONS_DIR.glob('*.py'):
+        revision = read_revision(path)
+        revisions.add(revision['revision'])
+        down_revision = revision.get('down_revision') or ()
+        if isinstance(down_revision, str):
+            down_revision = (down_revision,)
+        down_revisions.update(down_revision)
+    return revisions - down_revisions
+
+
+def get_current_heads() -> set[str]:
+    """Получить ревизии, на которых находится база данных.
+
+    Returns:
+        set[str]: ревизии из таблицы alembic_version
+    """
+    connection = connect(
+        user=config.PG_USER, password=config.PG_PASSWORD,
+        host=config.PG_HOST, port=config.PG_PORT, dbname=config.PG_DBNAME,
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT version_num FROM alembic_version')
+            return {row[0] for row in cursor.fetchall()}
+    except errors.UndefinedTable:
+        return set()
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    """Применить миграции, если база данных не на последней ревизии."""
+    if get_current_heads() == get_script_heads():
+        return
+    os.execv(sys.executable, [sys.executable, '-m', 'alembic', 'upgrade', 'head'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""notify reference changes
+
+Revision ID: a16bf09fbb2d
+Revises: b4e7ebe86c8b
+Create Date: 2026-10-19 02:27:12.268709
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a16bf09fbb2d'
+down_revision = 'b4e7ebe86c8b'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('leagues', 'stadiums')
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE FUNCTION notify_reference_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                PERFORM pg_notify('reference_changed', TG_TABLE_NAME || ':*');
+            ELSE
+                PERFORM pg_notify(
+                    'reference_changed', TG_TABLE_NAME || ':' || COALESCE(NEW.id, OLD.id)
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_reference_change()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_change()
+        """)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER {table}_notify_truncate ON {table}')
+        op.execute(f'DROP TRIGGER {table}_notify_change ON {table}')
+    op.execute('DROP FUNCTION notify_reference_change()')
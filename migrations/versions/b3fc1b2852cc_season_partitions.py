@@ -0,0 +1,115 @@
+"""season partitions
+
+Revision ID: b3fc1b2852cc
+Revises: dfaf3d306c63
+Create Date: 2026-10-19 03:08:30.687378
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3fc1b2852cc'
+down_revision = 'dfaf3d306c63'
+branch_labels = None
+depends_on = None
+
+# all rows loaded before seasons were introduced belong to this season
+FIRST_SEASON = 2023
+PLAYER_COLUMNS = 'id, name, age, number, position, photo, team_id'
+
+
+def player_columns() -> list:
+    return [
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('age', sa.Integer(), nullable=True),
+        sa.Column('number', sa.Integer(), nullable=True),
+        sa.Column('position', sa.String(), nullable=True),
+        sa.Column('photo', sa.String(), nullable=True),
+        sa.Column('team_id', sa.Uuid(), nullable=False),
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.CheckConstraint('length(name) < 80 and length(position) < 40 and length(photo) < 500'),
+        sa.CheckConstraint('number > 0 and age > 0', name='number_age_positive'),
+    ]
+
+
+def rename_players(new_name: str) -> None:
+    op.rename_table('players', new_name)
+    op.execute(f'ALTER INDEX players_pkey RENAME TO {new_name}_pkey')
+    op.execute(f'ALTER INDEX ix_players_team_id RENAME TO ix_{new_name}_team_id')
+    op.execute(f'ALTER TABLE {new_name} RENAME CONSTRAINT players_check TO {new_name}_check')
+
+
+def upgrade() -> None:
+    op.add_column('teams', sa.Column(
+        'season', sa.Integer(), nullable=False, server_default=str(FIRST_SEASON),
+    ))
+    op.alter_column('teams', 'season', server_default=None)
+    op.create_index(op.f('ix_teams_season'), 'teams', ['season'], unique=False)
+    op.drop_constraint('team_unique_name_founded', 'teams', type_='unique')
+    op.create_unique_constraint(
+        'team_unique_name_founded_season', 'teams', ['name', 'founded', 'season'],
+    )
+    op.create_unique_constraint('team_unique_id_season', 'teams', ['id', 'season'])
+
+    op.add_column('league_stats', sa.Column(
+        'season', sa.Integer(), nullable=False, server_default=str(FIRST_SEASON),
+    ))
+    op.alter_column('league_stats', 'season', server_default=None)
+    op.drop_constraint('league_stats_pkey', 'league_stats', type_='primary')
+    op.create_primary_key('league_stats_pkey', 'league_stats', ['league_id', 'season'])
+
+    rename_players('players_unpartitioned')
+    op.create_table('players',
+    *player_columns(),
+    sa.Column('season', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(
+        ['team_id', 'season'], ['teams.id', 'teams.season'],
+        name='players_team_id_season_fkey', ondelete='CASCADE', onupdate='CASCADE',
+    ),
+    sa.PrimaryKeyConstraint('id', 'season', name='players_pkey'),
+    sa.UniqueConstraint(
+        'name', 'age', 'number', 'season', name='player_unique_name_age_number_season',
+    ),
+    postgresql_partition_by='LIST (season)',
+    )
+    op.create_index(op.f('ix_players_team_id'), 'players', ['team_id'], unique=False)
+    op.execute(
+        f'CREATE TABLE players_{FIRST_SEASON} PARTITION OF players FOR VALUES IN ({FIRST_SEASON})',
+    )
+    op.execute(f"""
+        INSERT INTO players ({PLAYER_COLUMNS}, season)
+        SELECT {PLAYER_COLUMNS}, (SELECT teams.season FROM teams WHERE teams.id = team_id)
+        FROM players_unpartitioned
+    """)
+    op.drop_table('players_unpartitioned')
+
+
+def downgrade() -> None:
+    # a single-season schema keeps only the first season
+    op.execute(f'DELETE FROM teams WHERE season <> {FIRST_SEASON}')
+
+    rename_players('players_partitioned')
+    op.create_table('players',
+    *player_columns(),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name', 'age', 'number', name='player_unique_name_age_number'),
+    )
+    op.create_index(op.f('ix_players_team_id'), 'players', ['team_id'], unique=False)
+    op.execute(
+        f'INSERT INTO players ({PLAYER_COLUMNS}) SELECT {PLAYER_COLUMNS} FROM players_partitioned',
+    )
+    op.drop_table('players_partitioned')
+
+    op.execute(f'DELETE FROM league_stats WHERE season <> {FIRST_SEASON}')
+    op.drop_constraint('league_stats_pkey', 'league_stats', type_='primary')
+    op.drop_column('league_stats', 'season')
+    op.create_primary_key('league_stats_pkey', 'league_stats', ['league_id'])
+
+    op.drop_constraint('team_unique_id_season', 'teams', type_='unique')
+    op.drop_constraint('team_unique_name_founded_season', 'teams', type_='unique')
+    op.create_unique_constraint('team_unique_name_founded', 'teams', ['name', 'founded'])
+    op.drop_index(op.f('ix_teams_season'), table_name='teams')
+    op.drop_column('teams', 'season')
@@ -1,9 +1,18 @@
 """Модуль для моделей таблиц в базе данных."""
 
-from uuid import UUID, uuid4
+import secrets
+import time
+from datetime import datetime
+from uuid import UUID
 
-from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import CheckConstraint, ForeignKey, ForeignKeyConstraint, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.schema import Identity, PrimaryKeyConstraint
+from sqlalchemy.sql import func, text
+from sqlalchemy.types import BigInteger
+
+import config
 
 
 class Base(DeclarativeBase):
@@ -17,10 +26,36 @@ DEFAULT_IMAGE_PLAYER = 'https://media.api-sports.io/football/players/330612.png'
 DEFAULT_IMAGE_STADIUM = 'https://i.postimg.cc/fbWZrq56/121675725.webp'
 
 
+UUID7_VERSION = 0x7000
+UUID7_VARIANT = 0x8000000000000000
+NS_IN_MS = 1000000
+RAND_A_BITS = 12
+RAND_B_BITS = 62
+VERSION_BITS = 4
+LOW_BITS = 64
+
+
+def uuid7() -> UUID:
+    """Сгенерировать UUID версии 7 (RFC 9562).
+
+    Первые 48 бит - время в миллисекундах, поэтому новые записи попадают в конец
+    индекса первичного ключа, а не в случайные страницы, как uuid4. Формат
+    совместим с uuid4: столбцы остаются типа uuid, старые id не меняются.
+
+    Returns:
+        UUID: идентификатор, упорядоченный по времени создания
+    """
+    timestamp_ms = time.time_ns() // NS_IN_MS
+    rand_a = secrets.randbits(RAND_A_BITS)
+    rand_b = secrets.randbits(RAND_B_BITS)
+    high = (timestamp_ms << (RAND_A_BITS + VERSION_BITS)) | UUID7_VERSION | rand_a
+    return UUID(int=(high << LOW_BITS) | UUID7_VARIANT | rand_b)
+
+
 class UUIDMixin:
     """Класс миксин для поля: id."""
 
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid7)
 
 
 class League(UUIDMixin, Base):
@@ -34,7 +69,7 @@ class League(UUIDMixin, Base):
     api_id: Mapped[int] = mapped_column(nullable=True)
 
     teams: Mapped[list['Team']] = relationship(
-        back_populates='league', cascade='all, delete-orphan',
+        back_populates='league', cascade='all, delete-orphan', passive_deletes=True,
     )
 
     __table_args__ = (
@@ -50,18 +85,24 @@ class Team(UUIDMixin, Base):
 
     name: Mapped[str]
     founded: Mapped[int]
+    season: Mapped[int] = mapped_column(default=config.SEASON, index=True)
     logo: Mapped[str] = mapped_column(nullable=True, default=DEFAULT_IMAGE_CLUB)
-    stadium_id: Mapped[UUID] = mapped_column(ForeignKey('stadiums.id'), nullable=True)
-    league_id: Mapped[UUID] = mapped_column(ForeignKey('leagues.id'), nullable=True)
+    stadium_id: Mapped[UUID] = mapped_column(
+        ForeignKey('stadiums.id', ondelete='CASCADE'), nullable=True, index=True,
+    )
+    league_id: Mapped[UUID] = mapped_column(
+        ForeignKey('leagues.id', ondelete='CASCADE'), nullable=True, index=True,
+    )
 
     league: Mapped['League'] = relationship(back_populates='teams')
     players: Mapped[list['Player']] = relationship(
-        back_populates='team', cascade='all, delete-orphan',
+        back_populates='team', cascade='all, delete-orphan', passive_deletes=True,
     )
     stadium: Mapped['Stadium'] = relationship(back_populates='teams')
 
     __table_args__ = (
-        UniqueConstraint('name', 'founded', name='team_unique_name_founded'),
+        UniqueConstraint('name', 'founded', 'season', name='team_unique_name_founded_season'),
+        UniqueConstraint('id', 'season', name='team_unique_id_season'),
         CheckConstraint('length(name) < 80 and length(logo) < 500'),
         CheckConstraint("founded <= (date_part('year', now()))", name='founded_not_future'),
     )
@@ -80,7 +121,7 @@ class Stadium(UUIDMixin, Base):
     image: Mapped[str] = mapped_column(nullable=True, default=DEFAULT_IMAGE_STADIUM)
 
     teams: Mapped[list['Team']] = relationship(
-        back_populates='stadium', cascade='all, delete-orphan',
+        back_populates='stadium', cascade='all, delete-orphan', passive_deletes=True,
     )
 
     __table_args__ = (
@@ -92,7 +133,12 @@ class Stadium(UUIDMixin, Base):
 
 
 class Player(UUIDMixin, Base):
-    """Класс для таблицы: игроки."""
+    """Класс для таблицы: игроки.
+
+    Таблица секционирована по сезону (LIST): запросы с условием на сезон читают
+    только его секцию, а старый сезон отключается от таблицы (DETACH PARTITION)
+    без удаления строк. Сезон игрока совпадает с сезоном его команды.
+    """
 
     __tablename__ = 'players'
 
@@ -101,14 +147,135 @@ class Player(UUIDMixin, Base):
     number: Mapped[int] = mapped_column(nullable=True)
     position: Mapped[str] = mapped_column(nullable=True)
     photo: Mapped[str] = mapped_column(nullable=True, default=DEFAULT_IMAGE_PLAYER)
-    team_id: Mapped[UUID] = mapped_column(ForeignKey('teams.id'))
+    team_id: Mapped[UUID] = mapped_column(index=True)
+    season: Mapped[int] = mapped_column(primary_key=True, default=config.SEASON)
 
     team: Mapped['Team'] = relationship(back_populates='players')
 
     __table_args__ = (
-        UniqueConstraint('name', 'age', 'number', name='player_unique_name_age_number'),
+        PrimaryKeyConstraint('id', 'season', name='players_pkey'),
+        ForeignKeyConstraint(
+            ['team_id', 'season'], ['teams.id', 'teams.season'],
+            name='players_team_id_season_fkey', ondelete='CASCADE', onupdate='CASCADE',
+        ),
+        UniqueConstraint(
+            'name', 'age', 'number', 'season', name='player_unique_name_age_number_season',
+        ),
         CheckConstraint(
             'length(name) < 80 and length(position) < 40 and length(photo) < 500',
         ),
         CheckConstraint('number > 0 and age > 0', name='number_age_positive'),
+        {'postgresql_partition_by': 'LIST (season)'},
+    )
+
+
+class TeamStats(Base):
+    """Класс для таблицы: статистика команд (пересчитывается при записи)."""
+
+    __tablename__ = 'team_stats'
+
+    team_id: Mapped[UUID] = mapped_column(
+        ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True,
+    )
+    squad_size: Mapped[int] = mapped_column(default=0)
+    average_age: Mapped[float] = mapped_column(nullable=True)
+    positions: Mapped[dict] = mapped_column(JSONB, default=dict)
+    stadium_capacity: Mapped[int] = mapped_column(nullable=True)
+
+
+class TeamDocument(Base):
+    """Класс для таблицы: документ команды с лигой, стадионом и составом (для чтения)."""
+
+    __tablename__ = 'team_documents'
+
+    team_id: Mapped[UUID] = mapped_column(
+        ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True,
     )
+    document: Mapped[dict] = mapped_column(JSONB)
+
+
+class LeagueStats(Base):
+    """Класс для таблицы: статистика лиг по сезонам (пересчитывается при записи)."""
+
+    __tablename__ = 'league_stats'
+
+    league_id: Mapped[UUID] = mapped_column(
+        ForeignKey('leagues.id', ondelete='CASCADE'), primary_key=True,
+    )
+    season: Mapped[int] = mapped_column(primary_key=True)
+    team_count: Mapped[int] = mapped_column(default=0)
+    squad_size: Mapped[int] = mapped_column(default=0)
+    average_age: Mapped[float] = mapped_column(nullable=True)
+    positions: Mapped[dict] = mapped_column(JSONB, default=dict)
+    stadium_capacity: Mapped[int] = mapped_column(default=0)
+
+
+class CatalogLeague(Base):
+    """Класс для таблицы: каталог лиг внешнего апи (обновляется командой refresh-catalog)."""
+
+    __tablename__ = 'catalog_leagues'
+
+    season: Mapped[int] = mapped_column(primary_key=True)
+    api_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+    country: Mapped[str]
+    logo: Mapped[str] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        Index(
+            'ix_catalog_leagues_name_trgm', 'name',
+            postgresql_using='gist', postgresql_ops={'name': 'gist_trgm_ops'},
+        ),
+    )
+
+
+class CatalogTeam(Base):
+    """Класс для таблицы: каталог команд внешнего апи (обновляется командой refresh-catalog)."""
+
+    __tablename__ = 'catalog_teams'
+
+    season: Mapped[int] = mapped_column(primary_key=True)
+    league_api_id: Mapped[int] = mapped_column(primary_key=True)
+    api_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+    team_json: Mapped[dict] = mapped_column(JSONB)
+
+    __table_args__ = (
+        Index(
+            'ix_catalog_teams_name_trgm', 'name',
+            postgresql_using='gist', postgresql_ops={'name': 'gist_trgm_ops'},
+        ),
+    )
+
+
+class Change(Base):
+    """Класс для таблицы: журнал изменений команд, игроков, лиг и стадионов.
+
+    Заполняется триггерами. Курсор изменения - пара (txid, id): id транзакции
+    и номер записи в журнале.
+    """
+
+    __tablename__ = 'changes'
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, server_default=text('CAST(CAST(pg_current_xact_id() AS text) AS bigint)'),
+    )
+    entity: Mapped[str]
+    entity_id: Mapped[UUID]
+    operation: Mapped[str]
+    changed_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_changes_txid_id', 'txid', 'id'),
+    )
+
+
+class ChangeHorizon(Base):
+    """Класс для таблицы: курсор последнего изменения, удаленного из журнала по сроку хранения."""
+
+    __tablename__ = 'change_horizon'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    txid: Mapped[int] = mapped_column(BigInteger, default=0)
+    change_id: Mapped[int] = mapped_column(BigInteger, default=0)
@@ -0,0 +1,234 @@
+"""Модуль выборочного профилирования запросов: память, выделения и стеки.
+
+Включается настройкой PROFILE_EVERY: профилируется каждый N-й запрос воркера
+(и не больше одного одновременно). Для такого запроса tracemalloc считает
+пиковую память, число выделенных блоков и места с наибольшими выделениями,
+а при PROFILE_STACK_INTERVAL > 0 отдельный поток снимает стек обработчика
+для flame graph (формат collapsed stacks: flamegraph.pl, speedscope).
+
+tracemalloc учитывает выделения всего процесса, поэтому выделения
+одновременных запросов других потоков попадают в замер. Если профилирование
+выключено, обработчики запросов не регистрируются.
+"""
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from itertools import count
+from pathlib import Path
+
+import config
+
+BYTES_IN_KB = 1024
+REQUEST_KEY = 'profiling.active'
+IGNORED_FILES = (tracemalloc.__file__, __file__)
+
+
+class StackSampler(threading.Thread):
+    """Поток, снимающий стек профилируемого потока через равные промежутки."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        """Инициализация потока.
+
+        Args:
+            thread_id (int): id профилируемого потока
+            interval (float): промежуток между снимками в секундах
+        """
+        super().__init__(name='profiling-stacks', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        """Снимать стеки, пока не будет вызван stop."""
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame:
+                code = frame.f_code
+                frames.append(':'.join((Path(code.co_filename).name, code.co_name)))
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def stop(self) -> Counter:
+        """Остановить поток.
+
+        Returns:
+            Counter: число снимков каждого стека
+        """
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+
+class RouteProfile:
+    """Накопленный профиль одного маршрута."""
+
+    def __init__(self) -> None:
+        """Инициализация профиля."""
+        self.totals = Counter(samples=0, peak_kb=0, blocks=0)
+        self.max_peak_kb = 0
+        self.sites = Counter()
+        self.stacks = Counter()
+
+    def add(self, sample: dict, stacks: Counter) -> None:
+        """Добавить замер запроса.
+
+        Args:
+            sample (dict): замер памяти запроса
+            stacks (Counter): снимки стеков запроса
+        """
+        self.totals['samples'] += 1
+        self.totals['peak_kb'] += sample['peak_kb']
+        self.totals['blocks'] += sample['blocks']
+        self.max_peak_kb = max(self.max_peak_kb, sample['peak_kb'])
+        for site in sample['top']:
+            self.sites[site['site']] += site['kb']
+        self.stacks.update(stacks)
+
+    def summary(self) -> dict:
+        """Сводка профиля.
+
+        Returns:
+            dict: число замеров, средняя и наибольшая пиковая память, среднее число блоков
+                и места с наибольшими выделениями (сумма по замерам)
+        """
+        samples = self.totals['samples']
+        return {
+            'samples': samples,
+            'peak_kb_avg': round(self.totals['peak_kb'] / samples, 1),
+            'peak_kb_max': self.max_peak_kb,
+            'blocks_avg': round(self.totals['blocks'] / samples),
+            'top': [
+                {'site': site, 'kb': round(kb, 1)}
+                for site, kb in self.sites.most_common(config.PROFILE_TOP)
+            ],
+        }
+
+
+class Profiler:
+    """Выборочный профилировщик запросов воркера."""
+
+    def __init__(self, every: int, stack_interval: float, directory: str | None) -> None:
+        """Инициализация профилировщика.
+
+        Args:
+            every (int): профилировать каждый N-й запрос (0 - выключено)
+            stack_interval (float): промежуток между снимками стека (0 - без стеков)
+            directory (str | None): каталог для файлов замеров (None - только в памяти)
+        """
+        self.every = every
+        self.stack_interval = stack_interval
+        self.directory = Path(directory) if directory else None
+        self.routes: dict[str, RouteProfile] = {}
+        self._requests = count(1)
+        self._active = threading.Lock()
+        self._sampler: StackSampler | None = None
+
+    def start(self) -> bool:
+        """Начать профилирование запроса, если он попал в выборку.
+
+        Returns:
+            bool: True, если запрос профилируется
+        """
+        if next(self._requests) % self.every or not self._active.acquire(blocking=False):
+            return False
+        tracemalloc.start(config.PROFILE_FRAMES)
+        if self.stack_interval:
+            self._sampler = StackSampler(threading.get_ident(), self.stack_interval)
+            self._sampler.start()
+        return True
+
+    def finish(self, route: str) -> dict:
+        """Закончить профилирование запроса и сохранить замер.
+
+        Args:
+            route (str): маршрут запроса
+
+        Returns:
+            dict: замер памяти запроса
+        """
+        stacks = self._sampler.stop() if self._sampler else Counter()
+        self._sampler = None
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._active.release()
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(inclusive=False, filename_pattern=name) for name in IGNORED_FILES],
+        )
+        statistics = snapshot.statistics('lineno')
+        sample = {
+            'route': route,
+            'peak_kb': round(peak / BYTES_IN_KB, 1),
+            'blocks': sum(stat.count for stat in statistics),
+            'top': [
+                {'site': str(stat.traceback), 'kb': stat.size / BYTES_IN_KB, 'count': stat.count}
+                for stat in statistics[:config.PROFILE_TOP]
+            ],
+        }
+        self.routes.setdefault(route, RouteProfile()).add(sample, stacks)
+        if self.directory:
+            self.dump(sample, stacks)
+        return sample
+
+    def dump(self, sample: dict, stacks: Counter) -> None:
+        """Дописать замер в файлы воркера: memory-<pid>.jsonl и stacks-<pid>.txt.
+
+        Args:
+            sample (dict): замер памяти запроса
+            stacks (Counter): снимки стеков запроса
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        with open(self.directory / f'memory-{pid}.jsonl', 'a') as memory_file:
+            memory_file.writelines((json.dumps(sample, ensure_ascii=False), '\n'))
+        if stacks:
+            with open(self.directory / f'stacks-{pid}.txt', 'a') as stacks_file:
+                stacks_file.write(collapse(sample['route'], stacks))
+
+    def summary(self) -> dict:
+        """Сводка профилей по маршрутам.
+
+        Returns:
+            dict: сводка каждого маршрута
+        """
+        return {route: profile.summary() for route, profile in self.routes.items()}
+
+    def collapsed_stacks(self) -> str:
+        """Накопленные стеки всех маршрутов в формате collapsed stacks.
+
+        Returns:
+            str: строки вида "маршрут;кадр;кадр число"
+        """
+        return ''.join(
+            collapse(route, profile.stacks) for route, profile in self.routes.items()
+        )
+
+
+def collapse(route: str, stacks: Counter) -> str:
+    """Записать стеки в формате collapsed stacks с маршрутом в корне.
+
+    Args:
+        route (str): маршрут
+        stacks (Counter): число снимков каждого стека
+
+    Returns:
+        str: строки вида "маршрут;кадр;кадр число"
+    """
+    return ''.join(
+        f'{route};{stack} {samples}\n' for stack, samples in stacks.most_common()
+    )
+
+
+def create_profiler() -> Profiler:
+    """Создать профилировщик с настройками из config.
+
+    Returns:
+        Profiler: профилировщик
+    """
+    return Profiler(config.PROFILE_EVERY, config.PROFILE_STACK_INTERVAL, config.PROFILE_DIR)
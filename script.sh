@@ -1,5 +1,9 @@
 #!/bin/bash
 
-alembic upgrade head
+python3 migrate.py
 
-exec python3 -m gunicorn --bind 0.0.0.0:5000 --workers=4 app:app
\ No newline at end of file
+if [ "$SERVER_MODE" = "async" ]; then
+    exec python3 -m gunicorn -c gunicorn.conf.py --bind 0.0.0.0:5000 --workers=4 --worker-class uvicorn.workers.UvicornWorker async_app:app
+fi
+
+exec python3 -m gunicorn -c gunicorn.conf.py --bind 0.0.0.0:5000 --workers=4 'app:create_app()'
@@ -0,0 +1,164 @@
+"""Модуль сезонов: секции таблицы игроков и архивирование прошедших сезонов.
+
+Игроки каждого сезона хранятся в своей секции players_<сезон>. Секция нового
+сезона создается при первом добавлении его команды или командой
+``flask --app app add-season``. Прошедший сезон архивируется без массового
+DELETE: секция отключается от таблицы (DETACH PARTITION CONCURRENTLY)
+и переносится в схему archive вместе с копией команд сезона.
+"""
+from sqlalchemy import Connection, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import config
+from models import Team
+
+PARTITION_PREFIX = 'players_'
+ARCHIVE_SCHEMA = 'archive'
+PARTITIONS = text("""
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = CAST('players' AS regclass)
+""")
+LOCK_TIMEOUT = text("SELECT set_config('lock_timeout', :timeout, true)")
+CHECK_VIOLATION = '23514'
+
+# сезоны, секции которых процесс уже создал или нашел
+known_seasons: set[int] = set()
+
+
+def partition_name(season: int) -> str:
+    """Получить название секции игроков сезона.
+
+    Args:
+        season (int): сезон
+
+    Returns:
+        str: название секции
+    """
+    season_number = int(season)
+    return f'{PARTITION_PREFIX}{season_number}'
+
+
+def get_seasons(session: Session) -> list[int]:
+    """Получить сезоны, секции которых подключены к таблице игроков.
+
+    Args:
+        session (Session): сессия
+
+    Returns:
+        list[int]: сезоны по возрастанию
+    """
+    names = session.scalars(PARTITIONS)
+    return sorted(int(name.removeprefix(PARTITION_PREFIX)) for name in names)
+
+
+def add_season(season: int, session: Session) -> bool:
+    """Создать секцию игроков сезона, если ее еще нет.
+
+    Создание секции ненадолго блокирует таблицу игроков, поэтому ожидание
+    блокировки ограничено config.SEASON_LOCK_TIMEOUT.
+
+    Args:
+        season (int): сезон
+        session (Session): сессия
+
+    Returns:
+        bool: True, если секция создана, False, если она уже была
+    """
+    if season in get_seasons(session):
+        return False
+    partition = partition_name(season)
+    season_number = int(season)
+    session.execute(LOCK_TIMEOUT, {'timeout': config.SEASON_LOCK_TIMEOUT})
+    session.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {partition} PARTITION OF players '
+        + f'FOR VALUES IN ({season_number})',
+    ))
+    session.commit()
+    return True
+
+
+def ensure_season(season: int, session: Session) -> None:
+    """Создать секцию игроков сезона, если процесс еще не знает о ней.
+
+    Секции проверяются в базе данных один раз за процесс, поэтому вставки
+    не делают лишнего запроса и commit.
+
+    Args:
+        season (int): сезон
+        session (Session): сессия
+    """
+    if season not in known_seasons:
+        add_season(season, session)
+        known_seasons.add(season)
+
+
+def is_missing_partition(error: IntegrityError) -> bool:
+    """Отклонена ли вставка, потому что нет секции игроков сезона.
+
+    Args:
+        error (IntegrityError): ошибка вставки
+
+    Returns:
+        bool: True, если для строки не нашлось секции
+    """
+    code = getattr(error.orig, 'pgcode', None)
+    return code == CHECK_VIOLATION and 'no partition' in str(error.orig)
+
+
+def restore_season(season: int, session: Session) -> None:
+    """Пересоздать секцию сезона после вставки, которой не нашлось секции.
+
+    Секцию могла отключить команда archive-season другого процесса.
+
+    Args:
+        season (int): сезон
+        session (Session): сессия
+    """
+    session.rollback()
+    add_season(season, session)
+    known_seasons.add(season)
+
+
+def archive_season(season: int, connection: Connection, drop: bool = False) -> list:
+    """Отключить секцию игроков сезона и убрать сезон из рабочих таблиц.
+
+    Секция отключается без блокировки чтения и записи других сезонов
+    (DETACH PARTITION CONCURRENTLY), поэтому соединение должно быть
+    в режиме AUTOCOMMIT. Удаление игроков сезона записывается в журнал
+    изменений, так как у отключенной секции нет триггеров. Затем секция
+    и копия команд сезона переносятся в схему archive (или секция удаляется,
+    если drop), а команды сезона удаляются из рабочих таблиц вместе
+    со статистикой: их игроки уже не в таблице, поэтому удаляется лишь
+    несколько строк. Стадионы и лиги остаются, их используют другие сезоны.
+
+    Args:
+        season (int): сезон
+        connection (Connection): соединение в режиме AUTOCOMMIT
+        drop (bool): удалить секцию, а не переносить в архив
+
+    Returns:
+        list: id команд сезона, которые нужно удалить из рабочих таблиц
+    """
+    partition = partition_name(season)
+    connection.execute(text(f'ALTER TABLE players DETACH PARTITION {partition} CONCURRENTLY'))
+    connection.execute(text(
+        'INSERT INTO changes (entity, entity_id, operation) '
+        + f"SELECT 'player', id, 'delete' FROM {partition}",
+    ))
+    if drop:
+        connection.execute(text(f'DROP TABLE {partition}'))
+    else:
+        connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}'))
+        connection.execute(text(
+            f'ALTER TABLE {partition} DROP CONSTRAINT IF EXISTS players_team_id_season_fkey',
+        ))
+        connection.execute(text(f'ALTER TABLE {partition} SET SCHEMA {ARCHIVE_SCHEMA}'))
+        season_number = int(season)
+        archive_teams = f'{ARCHIVE_SCHEMA}.teams_{season_number}'
+        connection.execute(
+            text(f'CREATE TABLE {archive_teams} AS SELECT * FROM teams WHERE season = :season'),
+            {'season': season},
+        )
+    return list(connection.scalars(select(Team.id).where(Team.season == season)))
@@ -0,0 +1,44 @@
+// Автодополнение формы добавления команды из каталога внешнего апи.
+// При выборе команды подставляются ее лига и страна, при выборе лиги - страна.
+(function () {
+  const DELAY_MS = 150;
+  const script = document.currentScript;
+
+  function bind(input, url, fill) {
+    const datalist = document.getElementById(input.getAttribute('list'));
+    let found = [];
+    let timer = null;
+
+    input.addEventListener('input', function () {
+      const picked = found.find(function (item) { return item.name === input.value; });
+      if (picked) {
+        fill(picked);
+        return;
+      }
+      clearTimeout(timer);
+      timer = setTimeout(async function () {
+        const query = new URLSearchParams({q: input.value, season: season.value});
+        const response = await fetch(url + '?' + query);
+        found = await response.json();
+        datalist.replaceChildren(...found.map(function (item) {
+          const option = document.createElement('option');
+          option.value = item.name;
+          option.label = item.league ? item.league + ', ' + item.country : item.country;
+          return option;
+        }));
+      }, DELAY_MS);
+    });
+  }
+
+  const name = document.getElementById('name');
+  const league = document.getElementById('league');
+  const country = document.getElementById('country');
+  const season = document.getElementById('season');
+  bind(name, script.dataset.teamsUrl, function (team) {
+    league.value = team.league;
+    country.value = team.country;
+  });
+  bind(league, script.dataset.leaguesUrl, function (found) {
+    country.value = found.country;
+  });
+})();
@@ -0,0 +1,257 @@
+"""Модуль предрассчитанной статистики команд и лиг.
+
+Строки team_stats и league_stats пересчитываются только для затронутых команд
+и лиг в той же транзакции, что и запись в базу данных, поэтому чтение
+статистики - это выборка одной строки по первичному ключу. Вместе со
+статистикой пересчитываются документы затронутых команд (documents.py).
+
+Перед пересчетом строки затронутых команд и лиг блокируются (FOR NO KEY UPDATE,
+по порядку id): одновременные пересчеты одной команды идут друг за другом,
+и второй видит игроков, записанных первым. Такая блокировка не конфликтует
+с FOR KEY SHARE, которую берут проверки внешних ключей при вставке игроков и команд.
+"""
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+import config
+import documents
+from models import League, LeagueStats, Player, Stadium, Team, TeamStats
+
+REFRESH_TEAMS = text("""
+    INSERT INTO team_stats (team_id, squad_size, average_age, positions, stadium_capacity)
+    SELECT
+        teams.id,
+        (
+            SELECT count(*) FROM players
+            WHERE players.team_id = teams.id AND players.season = teams.season
+        ),
+        (
+            SELECT avg(players.age) FROM players
+            WHERE players.team_id = teams.id AND players.season = teams.season
+        ),
+        (
+            SELECT COALESCE(jsonb_object_agg(position, players_count), '{}')
+            FROM (
+                SELECT COALESCE(players.position, 'Unknown') AS position, count(*) AS players_count
+                FROM players WHERE players.team_id = teams.id AND players.season = teams.season
+                GROUP BY 1
+            ) AS team_positions
+        ),
+        stadiums.capacity
+    FROM teams LEFT JOIN stadiums ON stadiums.id = teams.stadium_id
+    WHERE teams.id = ANY(CAST(:team_ids AS uuid[]))
+    ON CONFLICT (team_id) DO UPDATE SET
+        squad_size = EXCLUDED.squad_size,
+        average_age = EXCLUDED.average_age,
+        positions = EXCLUDED.positions,
+        stadium_capacity = EXCLUDED.stadium_capacity
+""")
+
+REFRESH_LEAGUES = text("""
+    WITH league_teams AS (
+        SELECT
+            leagues.id AS league_id, league_seasons.season,
+            teams.id AS team_id, teams.stadium_id
+        FROM leagues
+        CROSS JOIN LATERAL (
+            SELECT teams.season FROM teams WHERE teams.league_id = leagues.id
+            UNION SELECT CAST(:season AS integer)
+        ) AS league_seasons
+        LEFT JOIN teams ON teams.league_id = leagues.id AND teams.season = league_seasons.season
+        WHERE leagues.id = ANY(CAST(:league_ids AS uuid[]))
+    ),
+    league_players AS (
+        SELECT league_teams.league_id, league_teams.season, players.age, players.position
+        FROM league_teams JOIN players
+            ON players.team_id = league_teams.team_id AND players.season = league_teams.season
+    )
+    INSERT INTO league_stats (
+        league_id, season, team_count, squad_size, average_age, positions, stadium_capacity
+    )
+    SELECT
+        league_id,
+        season,
+        count(team_id),
+        (
+            SELECT count(*) FROM league_players
+            WHERE league_players.league_id = grouped.league_id
+                AND league_players.season = grouped.season
+        ),
+        (
+            SELECT avg(league_players.age) FROM league_players
+            WHERE league_players.league_id = grouped.league_id
+                AND league_players.season = grouped.season
+        ),
+        (
+            SELECT COALESCE(jsonb_object_agg(position, players_count), '{}')
+            FROM (
+                SELECT COALESCE(league_players.position, 'Unknown') AS position,
+                    count(*) AS players_count
+                FROM league_players
+                WHERE league_players.league_id = grouped.league_id
+                    AND league_players.season = grouped.season
+                GROUP BY 1
+            ) AS league_positions
+        ),
+        (
+            SELECT COALESCE(sum(stadiums.capacity), 0) FROM stadiums
+            WHERE stadiums.id IN (
+                SELECT league_teams.stadium_id FROM league_teams
+                WHERE league_teams.league_id = grouped.league_id
+                    AND league_teams.season = grouped.season
+            )
+        )
+    FROM league_teams AS grouped
+    GROUP BY league_id, season
+    ON CONFLICT (league_id, season) DO UPDATE SET
+        team_count = EXCLUDED.team_count,
+        squad_size = EXCLUDED.squad_size,
+        average_age = EXCLUDED.average_age,
+        positions = EXCLUDED.positions,
+        stadium_capacity = EXCLUDED.stadium_capacity
+""")
+
+LOCK_TEAMS = text("""
+    SELECT id FROM teams WHERE id = ANY(CAST(:team_ids AS uuid[]))
+    ORDER BY id
+    FOR NO KEY UPDATE
+""")
+
+LOCK_LEAGUES = text("""
+    SELECT id FROM leagues WHERE id = ANY(CAST(:league_ids AS uuid[]))
+    ORDER BY id
+    FOR NO KEY UPDATE
+""")
+
+PRUNE_LEAGUES = text("""
+    DELETE FROM league_stats
+    WHERE league_id = ANY(CAST(:league_ids AS uuid[])) AND season <> :season AND NOT EXISTS (
+        SELECT 1 FROM teams
+        WHERE teams.league_id = league_stats.league_id AND teams.season = league_stats.season
+    )
+""")
+
+
+def affected(model_class, obj_ids: list, session: Session) -> tuple[set, set]:
+    """Найти команды и лиги, статистика которых зависит от записей.
+
+    Вызывается до изменения (старые связи) и после него (новые связи).
+
+    Args:
+        model_class (_type_): класс модели
+        obj_ids (list): id записей
+        session (Session): сессия
+
+    Returns:
+        tuple[set, set]: id команд и id лиг
+    """
+    obj_ids = [obj_id for obj_id in obj_ids if obj_id]
+    if model_class == League:
+        return set(), set(obj_ids)
+    if model_class == Player:
+        condition = Team.id.in_(select(Player.team_id).where(Player.id.in_(obj_ids)))
+    elif model_class == Stadium:
+        condition = Team.stadium_id.in_(obj_ids)
+    else:
+        condition = Team.id.in_(obj_ids)
+    rows = session.execute(select(Team.id, Team.league_id).where(condition)).all()
+    return {row.id for row in rows}, {row.league_id for row in rows if row.league_id}
+
+
+def refresh(session: Session, team_ids: set, league_ids: set) -> None:
+    """Пересчитать статистику команд и лиг и документы команд (без commit, в текущей транзакции).
+
+    Статистика лиги считается по каждому сезону, в котором у нее есть команды,
+    и по текущему сезону config.SEASON. Команды блокируются раньше лиг,
+    поэтому одновременные пересчеты не блокируют друг друга по кругу.
+
+    Args:
+        session (Session): сессия
+        team_ids (set): id команд
+        league_ids (set): id лиг
+    """
+    team_params = {'team_ids': [str(team_id) for team_id in team_ids]}
+    league_params = {
+        'league_ids': [str(league_id) for league_id in league_ids], 'season': config.SEASON,
+    }
+    if team_ids:
+        session.execute(LOCK_TEAMS, team_params)
+    if league_ids:
+        session.execute(LOCK_LEAGUES, league_params)
+    if team_ids:
+        session.execute(REFRESH_TEAMS, team_params)
+    if league_ids:
+        session.execute(REFRESH_LEAGUES, league_params)
+        session.execute(PRUNE_LEAGUES, league_params)
+    documents.refresh(session, team_ids)
+
+
+def refresh_for(model_class, obj_ids: list, session: Session, before: tuple | None = None):
+    """Пересчитать статистику и документы, зависящие от записей, с учетом связей до изменения.
+
+    Изменение лиги пересчитывает документы всех ее команд: в них есть данные лиги.
+
+    Args:
+        model_class (_type_): класс модели
+        obj_ids (list): id записей
+        session (Session): сессия
+        before (tuple | None): результат affected до изменения
+    """
+    team_ids, league_ids = affected(model_class, obj_ids, session)
+    if before:
+        team_ids |= before[0]
+        league_ids |= before[1]
+    refresh(session, team_ids, league_ids)
+    if model_class == League:
+        documents.refresh(session, set(), {obj_id for obj_id in obj_ids if obj_id})
+
+
+def get_team_stats(team_id: UUID, session: Session) -> dict | None:
+    """Получить статистику команды.
+
+    Args:
+        team_id (UUID): id команды
+        session (Session): сессия
+
+    Returns:
+        dict | None: словарь со статистикой или ничего, если команда не найдена
+    """
+    row = session.get(TeamStats, team_id)
+    if not row:
+        return None
+    return {
+        'team_id': str(row.team_id),
+        'squad_size': row.squad_size,
+        'average_age': row.average_age,
+        'positions': row.positions,
+        'stadium_capacity': row.stadium_capacity,
+    }
+
+
+def get_league_stats(
+    league_id: UUID, session: Session, season: int = config.SEASON,
+) -> dict | None:
+    """Получить статистику лиги за сезон.
+
+    Args:
+        league_id (UUID): id лиги
+        session (Session): сессия
+        season (int): сезон
+
+    Returns:
+        dict | None: словарь со статистикой или ничего, если лига не найдена
+    """
+    row = session.get(LeagueStats, (league_id, season))
+    if not row:
+        return None
+    return {
+        'league_id': str(row.league_id),
+        'season': row.season,
+        'team_count': row.team_count,
+        'squad_size': row.squad_size,
+        'average_age': row.average_age,
+        'positions': row.positions,
+        'stadium_capacity': row.stadium_capacity,
+    }
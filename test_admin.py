@@ -0,0 +1,32 @@
+"""Модуль тестов доступа к служебным страницам."""
+
+import secrets
+
+import pytest
+
+import config
+from app import create_app
+
+TOKEN = secrets.token_urlsafe()
+PATH = '/admin/deadlines'
+
+
+@pytest.mark.parametrize(('token', 'headers', 'status'), (
+    (None, {'Authorization': f'Bearer {TOKEN}'}, config.NOT_FOUND),
+    (TOKEN, {}, config.UNAUTHORIZED),
+    (TOKEN, {'Authorization': 'Bearer wrong'}, config.UNAUTHORIZED),
+    (TOKEN, {'Authorization': TOKEN}, config.UNAUTHORIZED),
+    (TOKEN, {'Authorization': f'Bearer {TOKEN}'}, config.OK),
+))
+def test_admin_token(monkeypatch, token: str | None, headers: dict, status: int):
+    """Тест: служебные страницы есть только при ADMIN_TOKEN и открываются только с ним.
+
+    Args:
+        monkeypatch (_type_): фикстура pytest
+        token (str | None): ADMIN_TOKEN
+        headers (dict): заголовки запроса
+        status (int): ожидаемый статус
+    """
+    monkeypatch.setattr(config, 'ADMIN_TOKEN', token)
+    response = create_app().test_client().get(PATH, headers=headers)
+    assert response.status_code == status
@@ -0,0 +1,91 @@
+"""Модуль тестов контроля допуска запросов."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import admission
+
+QUEUE_TIMEOUT = 1
+SHORT_TIMEOUT = 0.05
+POLL_INTERVAL = 0.01
+
+
+def wait_until(predicate) -> None:
+    """Подождать, пока условие не станет истинным (не больше QUEUE_TIMEOUT секунд).
+
+    Args:
+        predicate (_type_): условие
+    """
+    started = time.monotonic()
+    while not predicate() and time.monotonic() - started < QUEUE_TIMEOUT:
+        time.sleep(POLL_INTERVAL)
+
+
+def test_full_queue_sheds():
+    """Тест: при заполненной очереди запрос сразу отклоняется с Retry-After."""
+    budget = admission.Budget('test', 1, 1, QUEUE_TIMEOUT)
+    budget.acquire()
+    waiter = threading.Thread(target=budget.acquire)
+    waiter.start()
+    wait_until(lambda: budget.counts['waiting'] == 1)
+
+    shed = pytest.raises(admission.Overloaded)
+    with shed:
+        budget.acquire()
+    assert shed.excinfo.value.retry_after == QUEUE_TIMEOUT
+    budget.release()
+    waiter.join()
+    assert budget.counters()['shed'] == 1
+    assert budget.counters()['queued'] == 1
+    assert budget.counters()['active'] == 1
+
+
+def test_queue_timeout_sheds():
+    """Тест: запрос, не дождавшийся места в очереди, отклоняется."""
+    budget = admission.Budget('test', 1, 1, SHORT_TIMEOUT)
+    budget.acquire()
+    with pytest.raises(admission.Overloaded):
+        budget.acquire()
+    assert budget.counters()['waiting'] == 0
+    assert budget.counters()['shed'] == 1
+
+
+async def release_each(budget: admission.AsyncBudget, count: int) -> None:
+    """Освобождать места по одному, давая ожидающим их занять.
+
+    Args:
+        budget (admission.AsyncBudget): бюджет
+        count (int): число мест
+    """
+    for _ in range(count):
+        await budget.release()
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def test_async_budget_admits_waiters():
+    """Тест: асинхронный бюджет пропускает всех ожидающих по мере освобождения мест."""
+    async def scenario():
+        budget = admission.AsyncBudget('test', 1, 2, QUEUE_TIMEOUT)
+        await budget.acquire()
+        waiters = [asyncio.create_task(budget.acquire()) for _ in range(2)]
+        await asyncio.sleep(POLL_INTERVAL)
+        with pytest.raises(admission.Overloaded):
+            await budget.acquire()
+        await release_each(budget, len(waiters))
+        await asyncio.gather(*waiters)
+        return budget.counters()
+
+    counters = asyncio.run(scenario())
+    assert counters['admitted'] == 3
+    assert counters['shed'] == 1
+
+
+def test_route_budget():
+    """Тест: прокси изображений занимает места своего бюджета, а не бюджета чтения."""
+    assert admission.budget_name('pages.image', 'GET') == 'image'
+    assert admission.budget_name('pages.get_model_all', 'GET') == 'read'
+    assert admission.budget_name('add_team', 'POST') == 'ingest'
+    assert admission.budget_name('pages.admission_counters', 'GET') is None
@@ -0,0 +1,75 @@
+"""Модуль тестов асинхронного JSON api без базы данных."""
+
+import asyncio
+
+import httpx
+import pytest
+
+import async_db
+import config
+from async_app import app, parse_team_request
+
+BAD_TEAM_BODIES = (
+    'null',
+    '[]',
+    '{"league": "Premier League", "country": "England"}',
+    '{"name": 1, "league": "Premier League", "country": "England"}',
+    '{"name": "Arsenal", "league": "Premier League", "country": "England", "season": "abc"}',
+    'abc',
+)
+
+
+async def post_add_team(body: str) -> int:
+    """Отправить запрос добавления команды.
+
+    Args:
+        body (str): тело запроса
+
+    Returns:
+        int: статус ответа
+    """
+    response = await app.test_client().post(
+        '/add_team', data=body, headers={'Content-Type': 'application/json'},
+    )
+    return response.status_code
+
+
+@pytest.mark.parametrize('body', BAD_TEAM_BODIES)
+def test_add_team_bad_body(body: str):
+    """Тест: некорректное тело запроса добавления команды - 400, а не 500.
+
+    Args:
+        body (str): тело запроса
+    """
+    assert asyncio.run(post_add_team(body)) == config.BAD_REQUEST
+
+
+def test_team_request_season():
+    """Тест: сезон по умолчанию - текущий, строка с числом принимается."""
+    team = {'name': 'Arsenal', 'league': 'Premier League', 'country': 'England'}
+    assert parse_team_request(team)[-1] == config.SEASON
+    assert parse_team_request({**team, 'season': str(config.SEASON)})[-1] == config.SEASON
+
+
+async def unreachable_api(*args, **kwargs) -> None:
+    """Внешнее api недоступно: ошибка соединения.
+
+    Args:
+        args: позиционные аргументы add_team_api
+        kwargs: именованные аргументы add_team_api
+
+    Raises:
+        ConnectError: ошибка соединения
+    """
+    raise httpx.ConnectError('connection refused')
+
+
+def test_add_team_transport_error(monkeypatch):
+    """Тест: ошибка соединения с внешним api - тот же ответ, что и ошибка внешнего api.
+
+    Args:
+        monkeypatch (_type_): фикстура pytest
+    """
+    monkeypatch.setattr(async_db, 'add_team_api', unreachable_api)
+    body = '{"name": "Arsenal", "league": "Premier League", "country": "England"}'
+    assert asyncio.run(post_add_team(body)) == config.SERVER_ERROR
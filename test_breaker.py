@@ -0,0 +1,281 @@
+"""Модуль тестов предохранителя и кэша последних успешных ответов."""
+
+import asyncio
+
+import pytest
+
+import breaker
+import deadlines
+import football_api
+
+FAILURES = 2
+RESET_TIMEOUT = 10
+PROBES = 1
+STALE_ENTRIES = 2
+SERVER_ERROR = 503
+TOO_MANY_REQUESTS = 429
+NOT_FOUND = 404
+PATH = '/teams'
+OPTIONS = {'league': 1, 'season': 2023}
+TEAMS = {'response': [{'team': {'name': 'abc'}}]}
+
+
+class Outage(Exception):
+    """Сбой внешнего сервиса в тестах."""
+
+
+class Clock:
+    """Часы time.monotonic, которые идут только по команде теста."""
+
+    def __init__(self) -> None:
+        """Инициализация часов."""
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        """Текущее время.
+
+        Returns:
+            float: секунды
+        """
+        return self.now
+
+
+def is_failure(error: Exception) -> bool | None:
+    """Сбой ли исключение: Outage - сбой, DeadlineExceeded - прерванный вызов, остальное - нет.
+
+    Args:
+        error (Exception): исключение вызова
+
+    Returns:
+        bool | None: сбой или ничего, если вызов прерван клиентом
+    """
+    if isinstance(error, deadlines.DeadlineExceeded):
+        return None
+    return isinstance(error, Outage)
+
+
+@pytest.fixture(name='clock')
+def fixture_clock(monkeypatch) -> Clock:
+    """Часы предохранителя под управлением теста.
+
+    Args:
+        monkeypatch (_type_): фикстура pytest
+
+    Returns:
+        Clock: часы
+    """
+    fake_clock = Clock()
+    monkeypatch.setattr(breaker.time, 'monotonic', fake_clock)
+    return fake_clock
+
+
+@pytest.fixture(name='circuit')
+def fixture_circuit(clock: Clock) -> breaker.CircuitBreaker:
+    """Предохранитель с тестовыми часами.
+
+    Args:
+        clock (Clock): часы
+
+    Returns:
+        breaker.CircuitBreaker: предохранитель
+    """
+    return breaker.CircuitBreaker(FAILURES, RESET_TIMEOUT, PROBES, is_failure)
+
+
+def call(circuit: breaker.CircuitBreaker, error: BaseException | None = None) -> None:
+    """Вызвать сервис через предохранитель.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        error (BaseException | None): исключение вызова или ничего для успешного вызова
+
+    Raises:
+        error: исключение вызова
+    """
+    with circuit.call():
+        if error is not None:
+            raise error
+
+
+def fail(circuit: breaker.CircuitBreaker, error: BaseException) -> None:
+    """Вызвать сервис через предохранитель, вызов заканчивается исключением.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        error (BaseException): исключение вызова
+    """
+    with pytest.raises(type(error)):
+        call(circuit, error)
+
+
+def open_circuit(circuit: breaker.CircuitBreaker, clock: Clock) -> None:
+    """Разомкнуть предохранитель сбоями и дождаться пробных запросов.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        clock (Clock): часы
+    """
+    for _ in range(FAILURES):
+        fail(circuit, Outage())
+    clock.now += RESET_TIMEOUT
+
+
+def test_transitions(circuit: breaker.CircuitBreaker, clock: Clock):
+    """Тест: сбои размыкают предохранитель, после reset_timeout успешная проба замыкает его.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        clock (Clock): часы
+    """
+    fail(circuit, Outage())
+    assert circuit.state == breaker.CLOSED
+    fail(circuit, Outage())
+    assert circuit.state == breaker.OPEN
+
+    shed = pytest.raises(breaker.CircuitOpen)
+    with shed:
+        call(circuit)
+    assert shed.excinfo.value.retry_after == RESET_TIMEOUT
+
+    clock.now += RESET_TIMEOUT
+    call(circuit)
+    assert circuit.state == breaker.CLOSED
+    assert circuit.counters()['opened'] == 1
+    assert circuit.counters()['rejected'] == 1
+
+
+def test_failed_probe_reopens(circuit: breaker.CircuitBreaker, clock: Clock):
+    """Тест: сбой пробного запроса снова размыкает предохранитель.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        clock (Clock): часы
+    """
+    open_circuit(circuit, clock)
+    fail(circuit, Outage())
+    assert circuit.state == breaker.OPEN
+    assert circuit.remaining() == RESET_TIMEOUT
+
+
+def test_probe_limit(circuit: breaker.CircuitBreaker, clock: Clock):
+    """Тест: пока пробные места заняты, остальные запросы отклоняются.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        clock (Clock): часы
+    """
+    open_circuit(circuit, clock)
+    with circuit.call():
+        assert circuit.state == breaker.HALF_OPEN
+        with pytest.raises(breaker.CircuitOpen):
+            call(circuit)
+    assert circuit.state == breaker.CLOSED
+    assert circuit.counters()['probing'] == 0
+
+
+@pytest.mark.parametrize('error', (
+    deadlines.DeadlineExceeded(football_api.FOOTBALL),
+    asyncio.CancelledError(),
+))
+def test_abandoned_probe(circuit: breaker.CircuitBreaker, clock: Clock, error: BaseException):
+    """Тест: прерванная проба освобождает место, не размыкая и не замыкая предохранитель.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+        clock (Clock): часы
+        error (BaseException): исключение прерванного вызова
+    """
+    open_circuit(circuit, clock)
+    fail(circuit, error)
+    assert circuit.state == breaker.HALF_OPEN
+    assert circuit.counters()['probing'] == 0
+    assert circuit.counters()['abandoned'] == 1
+    call(circuit)
+    assert circuit.state == breaker.CLOSED
+
+
+def test_client_errors_keep_closed(circuit: breaker.CircuitBreaker):
+    """Тест: ошибки запроса (не сбои сервиса) не размыкают предохранитель.
+
+    Args:
+        circuit (breaker.CircuitBreaker): предохранитель
+    """
+    for _ in range(FAILURES):
+        fail(circuit, ValueError())
+    assert circuit.state == breaker.CLOSED
+    assert circuit.counters()['failures'] == 0
+
+
+@pytest.mark.parametrize(('error', 'outage'), (
+    (football_api.ForeignApiError(NOT_FOUND), False),
+    (football_api.ForeignApiError(SERVER_ERROR), True),
+    (football_api.ForeignApiError(TOO_MANY_REQUESTS), True),
+    (football_api.requests.ConnectionError(), True),
+    (deadlines.DeadlineExceeded(football_api.FOOTBALL), None),
+))
+def test_is_outage(error: Exception, outage: bool | None):
+    """Тест: 4xx - ошибка запроса, 5xx, 429 и ошибки соединения - сбой, срок - прерванный вызов.
+
+    Args:
+        error (Exception): исключение вызова внешнего api
+        outage (bool | None): ожидаемая классификация
+    """
+    assert football_api.is_outage(error) is outage
+
+
+def test_last_good_eviction():
+    """Тест: кэш последних ответов хранит не больше max_entries, вытесняя самый старый."""
+    last_good = breaker.LastGood(STALE_ENTRIES)
+    for key in range(STALE_ENTRIES + 1):
+        last_good.put(key, {'key': key})
+    assert last_good.get(0) is None
+    assert last_good.get(STALE_ENTRIES) == {'key': STALE_ENTRIES}
+    assert last_good.counters() == {
+        'entries': STALE_ENTRIES, 'stored': STALE_ENTRIES + 1, 'served': 1,
+    }
+
+
+def fetch_teams(path: str, options: dict) -> dict:
+    """Ответ внешнего api на поиск команд.
+
+    Args:
+        path (str): путь
+        options (dict): параметры
+
+    Returns:
+        dict: словарь с данными
+    """
+    return TEAMS
+
+
+def fetch_outage(path: str, options: dict) -> dict:
+    """Внешнее api недоступно.
+
+    Args:
+        path (str): путь
+        options (dict): параметры
+
+    Raises:
+        ForeignApiError: ответ 503
+    """
+    raise football_api.ForeignApiError(SERVER_ERROR)
+
+
+def test_stale_fallback(monkeypatch, clock: Clock):
+    """Тест: при сбое внешнего api поиск отдает последний успешный ответ.
+
+    Args:
+        monkeypatch (_type_): фикстура pytest
+        clock (Clock): часы
+    """
+    circuit = breaker.CircuitBreaker(FAILURES, RESET_TIMEOUT, PROBES, football_api.is_outage)
+    monkeypatch.setattr(football_api, 'breaker', circuit)
+    monkeypatch.setattr(football_api, 'last_good', breaker.LastGood(STALE_ENTRIES))
+    monkeypatch.setattr(football_api, 'fetch', fetch_teams)
+    assert football_api.get_data(PATH, OPTIONS, stale_ok=True) == TEAMS
+
+    monkeypatch.setattr(football_api, 'fetch', fetch_outage)
+    assert football_api.get_data(PATH, OPTIONS, stale_ok=True) == TEAMS
+    with pytest.raises(football_api.ForeignApiError):
+        football_api.get_data(PATH, OPTIONS)
+    assert circuit.state == breaker.OPEN
@@ -0,0 +1,120 @@
+"""Модуль тестов группировки одиночных вставок."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import coalescing
+import deadlines
+
+LONG_WINDOW = 0.3
+SHORT_DEADLINE = 0.05
+MAX_BATCH = 2
+POLL_INTERVAL = 0.01
+
+
+class FakeSession:
+    """Сессия без базы данных: группировке нужен только commit."""
+
+    def commit(self) -> None:
+        """Завершить транзакцию (ничего не делает)."""
+
+
+class FakeInsert:
+    """Вставка группы, запоминающая группы и сроки, с которыми их вставляли."""
+
+    def __init__(self, delay: float = 0) -> None:
+        """Инициализация вставки.
+
+        Args:
+            delay (float): сколько секунд длится вставка группы
+        """
+        self.delay = delay
+        self.batches: list[list] = []
+        self.deadlines: list = []
+        self._lock = threading.Lock()
+
+    def __call__(self, records: list, session: FakeSession) -> list:
+        """Вставить группу.
+
+        Args:
+            records (list): записи
+            session (FakeSession): сессия
+
+        Returns:
+            list: "id" каждой записи (сама запись)
+        """
+        with self._lock:
+            self.batches.append(list(records))
+            self.deadlines.append(deadlines.current.get())
+        time.sleep(self.delay)
+        return list(records)
+
+
+def submit(coalescer: coalescing.Coalescer, record, seconds: float = 0):
+    """Вставить запись в составе группы со сроком запроса.
+
+    Args:
+        coalescer (coalescing.Coalescer): группировка
+        record (_type_): запись
+        seconds (float): срок запроса (0 - без срока)
+
+    Returns:
+        _type_: id записи
+    """
+    deadlines.current.set(deadlines.Deadline('POST test', seconds) if seconds else None)
+    return coalescer.submit(record, FakeSession())
+
+
+def test_batch_is_capped():
+    """Тест: группа не больше max_batch, следующий запрос становится лидером новой группы."""
+    insert = FakeInsert()
+    coalescer = coalescing.Coalescer(insert, LONG_WINDOW, MAX_BATCH)
+    records = ['first', 'second', 'third']
+    with ThreadPoolExecutor(len(records)) as pool:
+        obj_ids = list(pool.map(lambda record: submit(coalescer, record), records))
+    assert obj_ids == records
+    assert sorted(len(batch) for batch in insert.batches) == [1, MAX_BATCH]
+
+
+def test_follower_deadline():
+    """Тест: запрос, срок которого истек в ожидании группы, выходит из нее с DeadlineExceeded."""
+    insert = FakeInsert()
+    coalescer = coalescing.Coalescer(insert, LONG_WINDOW, MAX_BATCH + 1)
+    with ThreadPoolExecutor(MAX_BATCH) as pool:
+        leader = pool.submit(submit, coalescer, 'leader')
+        time.sleep(POLL_INTERVAL)
+        follower = pool.submit(submit, coalescer, 'follower', SHORT_DEADLINE)
+        with pytest.raises(deadlines.DeadlineExceeded):
+            follower.result()
+        assert not leader.done()
+        assert leader.result() == 'leader'
+    assert insert.batches == [['leader']]
+
+
+def test_taken_follower_waits_for_insert():
+    """Тест: срок запроса истек, когда лидер уже забрал группу, - запрос получает свой id."""
+    insert = FakeInsert(delay=LONG_WINDOW)
+    coalescer = coalescing.Coalescer(insert, LONG_WINDOW, MAX_BATCH)
+    with ThreadPoolExecutor(MAX_BATCH) as pool:
+        leader = pool.submit(submit, coalescer, 'leader')
+        time.sleep(POLL_INTERVAL)
+        follower = pool.submit(submit, coalescer, 'follower', SHORT_DEADLINE)
+        assert follower.result() == 'follower'
+        assert leader.result() == 'leader'
+    assert insert.batches == [['leader', 'follower']]
+
+
+def test_batch_uses_latest_deadline():
+    """Тест: группа вставляется со сроком самого долгого запроса, а не со сроком лидера."""
+    insert = FakeInsert()
+    coalescer = coalescing.Coalescer(insert, LONG_WINDOW, MAX_BATCH)
+    with ThreadPoolExecutor(MAX_BATCH) as pool:
+        leader = pool.submit(submit, coalescer, 'leader', SHORT_DEADLINE)
+        time.sleep(POLL_INTERVAL)
+        follower = pool.submit(submit, coalescer, 'follower')
+        assert leader.result() == 'leader'
+        assert follower.result() == 'follower'
+    assert insert.deadlines == [None]
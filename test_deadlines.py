@@ -0,0 +1,53 @@
+"""Модуль тестов крайних сроков запросов."""
+
+from contextvars import Context
+from types import MappingProxyType
+
+import config
+import deadlines
+from app import create_app
+
+EXPIRED = 0.000001
+DEADLINE = 0.5
+DEFAULT_TIMEOUT = 10
+IMAGE_URL = 'https://media.api-sports.io/football/players/deadline-test.png'
+
+
+def timeouts_with_deadline() -> tuple[float, str]:
+    """Таймаут вызова со сроком запроса и этап истекшего срока.
+
+    Returns:
+        tuple[float, str]: таймаут и этап из DeadlineExceeded
+    """
+    deadlines.current.set(deadlines.Deadline('GET test', DEADLINE))
+    bounded = deadlines.timeout(DEFAULT_TIMEOUT, deadlines.DB)
+    deadlines.current.set(deadlines.Deadline('GET test', EXPIRED))
+    try:
+        deadlines.timeout(DEFAULT_TIMEOUT, deadlines.DB)
+    except deadlines.DeadlineExceeded as error:
+        return bounded, error.stage
+    return bounded, ''
+
+
+def test_timeout_bounded_by_deadline():
+    """Тест: таймаут внешнего вызова не больше оставшегося времени, после срока - исключение."""
+    bounded, stage = Context().run(timeouts_with_deadline)
+    assert bounded <= DEADLINE
+    assert stage == deadlines.DB
+    assert deadlines.timeout(DEFAULT_TIMEOUT, deadlines.DB) == DEFAULT_TIMEOUT
+
+
+def test_route_deadline_gateway_timeout(monkeypatch, tmp_path):
+    """Тест: короткий срок маршрута (DEADLINE_ROUTES) дает ответ 504 с этапом.
+
+    Args:
+        monkeypatch (_type_): фикстура pytest
+        tmp_path (_type_): фикстура pytest, пустой кэш миниатюр
+    """
+    monkeypatch.setattr(config, 'DEADLINE_ROUTES', MappingProxyType({'image': EXPIRED}))
+    monkeypatch.setattr(config, 'IMAGE_CACHE_DIR', str(tmp_path))
+    exceeded = deadlines.metrics.counters()['routes'].get('GET image', 0)
+    response = create_app().test_client().get('/image', query_string={'url': IMAGE_URL})
+    assert response.status_code == config.GATEWAY_TIMEOUT
+    assert response.json['stage'] == 'image'
+    assert deadlines.metrics.counters()['routes']['GET image'] == exceeded + 1
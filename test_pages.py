@@ -1,6 +1,7 @@
 """Модуль тестов на страницы."""
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 import requests
@@ -32,10 +33,101 @@ player_data = {
     'position': 'abc',
 }
 
+stats_league_data = {
+    'name': 'stats league',
+    'country': 'abc',
+}
+
+stats_team_data = {
+    'name': 'stats team',
+    'founded': 2000,
+}
+
+stats_player_data = {
+    'name': 'stats player',
+    'age': 20,
+    'number': 10,
+    'position': 'Defender',
+}
+
+bulk_league_data = {
+    'name': 'bulk league',
+    'country': 'abc',
+}
+
+bulk_stadium_data = {
+    'name': 'bulk stadium',
+    'address': 'abc',
+    'city': 'abc',
+    'capacity': 100,
+}
+
+bulk_teams_data = (
+    {'name': 'bulk team 1', 'founded': 2000},
+    {'name': 'bulk team 2', 'founded': 2000},
+)
+
+document_league_data = {
+    'name': 'document league',
+    'country': 'abc',
+}
+
+document_team_data = {
+    'name': 'document team',
+    'founded': 2000,
+}
+
+document_player_data = {
+    'name': 'document player',
+    'age': 21,
+    'number': 7,
+    'position': 'Attacker',
+}
+
+feed_league_data = {
+    'name': 'feed league',
+    'country': 'abc',
+}
+
+race_league_data = {
+    'name': 'race league',
+    'country': 'abc',
+}
+
+race_team_data = {
+    'name': 'race team',
+    'founded': 2000,
+}
+
+season_team_data = {
+    'name': 'season team',
+    'founded': 2000,
+}
+
+season_player_data = {
+    'name': 'season player',
+    'age': 22,
+    'number': 9,
+    'position': 'Midfielder',
+}
+
+concurrent_leagues_data = (
+    {'name': 'concurrent league 1', 'country': 'abc'},
+    {'name': 'concurrent league 2', 'country': 'abc'},
+    {'name': 'concurrent league 3', 'country': 'abc'},
+) * 2
+
+PAST_SEASON = 1999
+UPDATED_SEASON = 1997
 CREATE = 'create'
 UPDATE = 'update'
 DELETE = 'delete'
+BULK_DELETE = 'bulk_delete'
+CATALOG_KINDS = ('leagues', 'teams')
+ADMISSION_BUDGETS = ('read', 'write', 'ingest', 'image')
+RACE_PLAYERS = 16
 HEADERS = {'Content-Type': 'application/json'}
+ADMIN_HEADERS = {'Authorization': f'Bearer {config.ADMIN_TOKEN}'}
 URL = 'http://127.0.0.1:5000/'
 PATHS = ('', 'add_team', 'stadiums', 'leagues', 'players', 'teams')
 LINKS = [f'{URL}{path}' for path in PATHS]
@@ -45,6 +137,13 @@ POST_DATA = (
     ('player', player_data),
     ('stadium', stadium_data),
 )
+IMAGE_REQUESTS = (
+    ({'url': 'http://example.com/logo.png'}, config.FORBIDDEN),
+    ({'url': 'file:///etc/passwd'}, config.FORBIDDEN),
+    ({'url': 'https://media.api-sports.io/football/players/1.png', 'size': 1}, config.BAD_REQUEST),
+)
+
+admin_only = pytest.mark.skipif(not config.ADMIN_TOKEN, reason='ADMIN_TOKEN не задан')
 
 
 @pytest.mark.parametrize('link', LINKS)
@@ -131,3 +230,365 @@ def test_post_delete(model: str, model_data: dict):
         timeout=10,
     )
     assert delete_bad_req.status_code == config.BAD_REQUEST
+
+
+@pytest.mark.parametrize('query, status', IMAGE_REQUESTS)
+def test_image_proxy_rejects(query: dict, status: int):
+    """Тест отказа прокси изображений для чужих хостов и неизвестных размеров.
+
+    Args:
+        query (dict): параметры запроса
+        status (int): ожидаемый статус код
+    """
+    response = requests.get(f'{URL}image', params=query, timeout=10)
+    assert response.status_code == status
+
+
+def test_stats():
+    """Тест статистики команды и лиги после добавления игрока."""
+    league_id = requests.post(
+        f'{URL}league/{CREATE}', headers=HEADERS, data=json.dumps(stats_league_data), timeout=10,
+    ).content.decode()
+    team_id = requests.post(
+        f'{URL}team/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**stats_team_data, 'league_id': league_id}),
+        timeout=10,
+    ).content.decode()
+    requests.post(
+        f'{URL}player/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**stats_player_data, 'team_id': team_id}),
+        timeout=10,
+    )
+
+    team_stats = requests.get(f'{URL}team/{team_id}/stats', timeout=10).json()
+    assert team_stats['squad_size'] == 1
+    assert team_stats['positions'] == {stats_player_data['position']: 1}
+    league_stats = requests.get(f'{URL}league/{league_id}/stats', timeout=10).json()
+    assert league_stats['team_count'] == 1
+    assert league_stats['average_age'] == stats_player_data['age']
+    assert league_stats['season'] == config.SEASON
+
+    requests.delete(
+        f'{URL}league/{DELETE}', headers=HEADERS, data=json.dumps({'id': league_id}), timeout=10,
+    )
+    response = requests.get(f'{URL}team/{team_id}/stats', timeout=10)
+    assert response.status_code == config.NOT_FOUND
+
+
+def test_team_document():
+    """Тест документа команды: страница команды видит запись игрока и изменение лиги."""
+    league_id = requests.post(
+        f'{URL}league/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps(document_league_data),
+        timeout=10,
+    ).content.decode()
+    team_id = requests.post(
+        f'{URL}team/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**document_team_data, 'league_id': league_id}),
+        timeout=10,
+    ).content.decode()
+    requests.post(
+        f'{URL}player/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**document_player_data, 'team_id': team_id}),
+        timeout=10,
+    )
+    page = requests.get(f'{URL}team/{team_id}', timeout=10).text
+    assert document_player_data['name'] in page
+
+    renamed = {'id': league_id, 'name': 'renamed document league'}
+    renamed_body = json.dumps(renamed)
+    requests.put(f'{URL}league/{UPDATE}', headers=HEADERS, data=renamed_body, timeout=10)
+    page = requests.get(f'{URL}team/{team_id}', timeout=10).text
+    assert renamed['name'] in page
+
+    requests.delete(
+        f'{URL}league/{DELETE}', headers=HEADERS, data=json.dumps({'id': league_id}), timeout=10,
+    )
+    response = requests.get(f'{URL}team/{team_id}', timeout=10)
+    assert response.status_code == config.NOT_FOUND
+
+
+def test_bulk_delete():
+    """Тест удаления нескольких команд вместе с опустевшими стадионом и лигой."""
+    league_id = requests.post(
+        f'{URL}league/{CREATE}', headers=HEADERS, data=json.dumps(bulk_league_data), timeout=10,
+    ).content.decode()
+    stadium_id = requests.post(
+        f'{URL}stadium/{CREATE}', headers=HEADERS, data=json.dumps(bulk_stadium_data), timeout=10,
+    ).content.decode()
+    team_ids = [
+        requests.post(
+            f'{URL}team/{CREATE}',
+            headers=HEADERS,
+            data=json.dumps({**bulk_team, 'league_id': league_id, 'stadium_id': stadium_id}),
+            timeout=10,
+        ).content.decode()
+        for bulk_team in bulk_teams_data
+    ]
+    ids_body = json.dumps({'ids': team_ids})
+
+    response = requests.delete(
+        f'{URL}team/{BULK_DELETE}', headers=HEADERS, data=ids_body, timeout=10,
+    )
+    assert response.status_code == config.OK
+    assert response.content.decode() == str(len(team_ids))
+    response = requests.get(f'{URL}league/{league_id}/stats', timeout=10)
+    assert response.status_code == config.NOT_FOUND
+    stadiums = requests.get(f'{URL}stadiums', timeout=10).json()['stadiums']
+    assert stadium_id not in {stadium['id'] for stadium in stadiums}
+
+    response = requests.delete(
+        f'{URL}team/{BULK_DELETE}', headers=HEADERS, data=ids_body, timeout=10,
+    )
+    assert response.status_code == config.BAD_REQUEST
+    response = requests.delete(
+        f'{URL}coach/{BULK_DELETE}', headers=HEADERS, data=ids_body, timeout=10,
+    )
+    assert response.status_code == config.NOT_FOUND
+
+
+@pytest.mark.parametrize('body', ['[]', '"abc"', 'null', '{"ids": "abc"}'])
+def test_bulk_delete_bad_body(body: str):
+    """Тест удаления нескольких записей с телом запроса неверного вида.
+
+    Args:
+        body (str): тело запроса
+    """
+    response = requests.delete(f'{URL}team/{BULK_DELETE}', headers=HEADERS, data=body, timeout=10)
+    assert response.status_code == config.BAD_REQUEST
+
+
+@pytest.mark.parametrize('kind', CATALOG_KINDS)
+def test_catalog_suggestions(kind: str):
+    """Тест подсказок лиг и команд из каталога внешнего апи.
+
+    Args:
+        kind (str): leagues или teams
+    """
+    response = requests.get(f'{URL}catalog/{kind}', params={'q': 'united'}, timeout=10)
+    assert response.status_code == config.OK
+    assert isinstance(response.json(), list)
+    response = requests.get(f'{URL}catalog/{kind}', params={'q': ' '}, timeout=10)
+    assert not response.json()
+
+
+@admin_only
+def test_admission_counters():
+    """Тест счетчиков допуска запросов воркера."""
+    counters = requests.get(f'{URL}admin/admission', headers=ADMIN_HEADERS, timeout=10).json()
+    assert set(counters['budgets']) == set(ADMISSION_BUDGETS)
+    for budget in counters['budgets'].values():
+        assert budget['active'] <= budget['limit']
+        assert budget['waiting'] <= budget['queue_size']
+        assert budget['admitted'] >= budget['active']
+
+
+@admin_only
+def test_football_counters():
+    """Тест состояния предохранителя внешнего апи воркера."""
+    counters = requests.get(f'{URL}admin/football', headers=ADMIN_HEADERS, timeout=10).json()
+    assert counters['breaker']['state'] in {'closed', 'open', 'half_open'}
+    assert counters['breaker']['probing'] <= config.FOOTBALL_BREAKER_PROBES
+    assert counters['last_good']['entries'] <= config.FOOTBALL_STALE_ENTRIES
+
+
+@admin_only
+def test_deadline_counters():
+    """Тест счетчиков крайних сроков запросов воркера."""
+    counters = requests.get(f'{URL}admin/deadlines', headers=ADMIN_HEADERS, timeout=10).json()
+    assert counters['exceeded'] <= counters['started']
+    assert sum(counters['stages'].values()) == counters['exceeded']
+    assert sum(counters['routes'].values()) == counters['exceeded']
+
+
+@admin_only
+def test_profile_summary():
+    """Тест сводки профилирования: 404, если PROFILE_EVERY не задан, иначе профили маршрутов."""
+    response = requests.get(f'{URL}admin/profile', headers=ADMIN_HEADERS, timeout=10)
+    assert response.status_code in {config.OK, config.NOT_FOUND}
+    if response.status_code == config.OK:
+        for profile in response.json()['routes'].values():
+            assert profile['peak_kb_max'] >= profile['peak_kb_avg']
+
+
+@pytest.mark.parametrize('model', ('teams', 'players'))
+def test_season_filter(model: str):
+    """Тест выборки команд и игроков сезона, в котором нет данных.
+
+    Args:
+        model (str): teams или players
+    """
+    response = requests.get(f'{URL}{model}', params={'season': PAST_SEASON}, timeout=10)
+    assert response.status_code == config.OK
+    assert response.json() == {model: []}
+
+
+def test_player_season_from_team():
+    """Тест: игрок без сезона получает сезон своей команды, секция сезона создается."""
+    team_id = requests.post(
+        f'{URL}team/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**season_team_data, 'season': PAST_SEASON}),
+        timeout=10,
+    ).content.decode()
+    response = requests.post(
+        f'{URL}player/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**season_player_data, 'team_id': team_id}),
+        timeout=10,
+    )
+    assert response.status_code == config.CREATED
+    players = requests.get(f'{URL}players', params={'season': PAST_SEASON}, timeout=10).json()
+    assert [player['name'] for player in players['players']] == [season_player_data['name']]
+    response = requests.delete(
+        f'{URL}team/{DELETE}', headers=HEADERS, data=json.dumps({'id': team_id}), timeout=10,
+    )
+    assert response.status_code == config.NO_CONTENT
+
+
+def test_team_season_update():
+    """Тест: команда переходит в новый сезон вместе с игроками, секция сезона создается."""
+    team_id = requests.post(
+        f'{URL}team/{CREATE}', headers=HEADERS, data=json.dumps(season_team_data), timeout=10,
+    ).content.decode()
+    requests.post(
+        f'{URL}player/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**season_player_data, 'team_id': team_id}),
+        timeout=10,
+    )
+    updated = requests.put(
+        f'{URL}team/{UPDATE}',
+        headers=HEADERS,
+        data=json.dumps({'id': team_id, 'season': UPDATED_SEASON}),
+        timeout=10,
+    )
+    assert updated.status_code == config.OK
+    players = requests.get(f'{URL}players', params={'season': UPDATED_SEASON}, timeout=10).json()
+    assert [player['name'] for player in players['players']] == [season_player_data['name']]
+    requests.delete(
+        f'{URL}team/{DELETE}', headers=HEADERS, data=json.dumps({'id': team_id}), timeout=10,
+    )
+
+
+def test_concurrent_creates():
+    """Тест одновременного создания лиг: каждая лига создается ровно один раз, дубликаты - 400."""
+    with ThreadPoolExecutor(len(concurrent_leagues_data)) as pool:
+        responses = list(pool.map(
+            lambda league: requests.post(
+                f'{URL}league/{CREATE}', headers=HEADERS, data=json.dumps(league), timeout=10,
+            ),
+            concurrent_leagues_data,
+        ))
+    created = {
+        response.content.decode()
+        for response in responses
+        if response.status_code == config.CREATED
+    }
+    assert len(created) == len({league['name'] for league in concurrent_leagues_data})
+    assert all(
+        response.status_code in {config.CREATED, config.BAD_REQUEST} for response in responses
+    )
+    response = requests.delete(
+        f'{URL}league/{BULK_DELETE}', headers=HEADERS, data=json.dumps({'ids': list(created)}),
+        timeout=10,
+    )
+    assert response.status_code == config.OK
+
+
+def test_concurrent_player_stats():
+    """Тест статистики после одновременного добавления игроков в одну команду.
+
+    Запросы сверх очереди бюджета записи воркера отклоняются (503) и не учитываются.
+    """
+    league_id = requests.post(
+        f'{URL}league/{CREATE}', headers=HEADERS, data=json.dumps(race_league_data), timeout=10,
+    ).content.decode()
+    team_id = requests.post(
+        f'{URL}team/{CREATE}',
+        headers=HEADERS,
+        data=json.dumps({**race_team_data, 'league_id': league_id}),
+        timeout=10,
+    ).content.decode()
+    race_players_data = [
+        {'name': f'race player {number}', 'age': 20, 'number': number, 'team_id': team_id}
+        for number in range(1, RACE_PLAYERS + 1)
+    ]
+    with ThreadPoolExecutor(RACE_PLAYERS) as pool:
+        responses = list(pool.map(
+            lambda player: requests.post(
+                f'{URL}player/{CREATE}', headers=HEADERS, data=json.dumps(player), timeout=10,
+            ),
+            race_players_data,
+        ))
+    assert all(
+        response.status_code in {config.CREATED, config.SERVICE_UNAVAILABLE}
+        for response in responses
+    )
+    created = sum(response.status_code == config.CREATED for response in responses)
+    assert created > 1
+
+    team_stats = requests.get(f'{URL}team/{team_id}/stats', timeout=10).json()
+    assert team_stats['squad_size'] == created
+    league_stats = requests.get(f'{URL}league/{league_id}/stats', timeout=10).json()
+    assert league_stats['squad_size'] == created
+    requests.delete(
+        f'{URL}league/{DELETE}', headers=HEADERS, data=json.dumps({'id': league_id}), timeout=10,
+    )
+
+
+def test_change_feed():
+    """Тест журнала изменений: вставка и удаление лиги после курсора."""
+    cursor = requests.get(f'{URL}changes', timeout=10).json()['cursor']
+    league_id = requests.post(
+        f'{URL}league/{CREATE}', headers=HEADERS, data=json.dumps(feed_league_data), timeout=10,
+    ).content.decode()
+    requests.delete(
+        f'{URL}league/{DELETE}', headers=HEADERS, data=json.dumps({'id': league_id}), timeout=10,
+    )
+
+    feed = requests.get(f'{URL}changes', params={'since': cursor}, timeout=10).json()
+    operations = [
+        change['operation'] for change in feed['changes'] if change['id'] == league_id
+    ]
+    assert operations == ['insert', 'delete']
+    assert feed['cursor'] != cursor
+    next_cursor = feed['cursor']
+    feed = requests.get(f'{URL}changes', params={'since': next_cursor}, timeout=10).json()
+    assert league_id not in {change['id'] for change in feed['changes']}
+    response = requests.get(f'{URL}changes', params={'since': 'abc'}, timeout=10)
+    assert response.status_code == config.BAD_REQUEST
+
+
+def test_compression():
+    """Тест сжатия ответа gzip и ответа 304 на If-None-Match."""
+    response = requests.get(f'{URL}players', headers={'Accept-Encoding': 'gzip'}, timeout=10)
+    assert response.status_code == config.OK
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].startswith('W/')
+    assert 'players' in response.json()
+    etag = response.headers['ETag']
+
+    response = requests.get(
+        f'{URL}players', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}, timeout=10,
+    )
+    assert response.status_code == config.NOT_MODIFIED
+    assert not response.content
+    response = requests.get(f'{URL}players', headers={'Accept-Encoding': 'identity'}, timeout=10)
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'] == etag
+
+
+def test_no_compression_with_csrf():
+    """Тест: страница с CSRF токеном не сжимается (BREACH)."""
+    response = requests.get(
+        f'{URL}add_team', headers={'Accept-Encoding': 'gzip, br, zstd'}, timeout=10,
+    )
+    assert response.status_code == config.OK
+    assert 'csrf_token' in response.text
+    assert 'Content-Encoding' not in response.headers